@@ -2,6 +2,7 @@
 API routes for the Continuum application.
 """
 import logging
+from itertools import islice
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
@@ -110,8 +111,9 @@ async def get_knowledge_graph(limit: int = Query(100, ge=1, le=1000)):
         raise HTTPException(status_code=500, detail="Engine not initialized")
 
     try:
-        nodes = list(_engine.knowledge_graph.nodes.values())[:limit]
-        edges = list(_engine.knowledge_graph.edges.values())[:limit] if isinstance(_engine.knowledge_graph.edges, dict) else _engine.knowledge_graph.edges[:limit]
+        # islice takes the first `limit` items without copying the whole graph
+        nodes = list(islice(_engine.knowledge_graph.nodes.values(), limit))
+        edges = list(islice(_engine.knowledge_graph.edges.values(), limit)) if isinstance(_engine.knowledge_graph.edges, dict) else _engine.knowledge_graph.edges[:limit]
 
         node_responses = [
             ConceptNodeResponse(
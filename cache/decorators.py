@@ -9,7 +9,7 @@ import logging
 import asyncio
 import hashlib
 import json
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, Union
 from functools import wraps
 
 from cache.cache_manager import get_cache
@@ -48,7 +48,7 @@ def _generate_cache_key(
 
 def cache_async(
     ttl: Optional[int] = 3600,
-    prefix: str = "",
+    prefix: Union[str, Callable[[Any], str]] = "",
     condition: Optional[Callable[[Any], bool]] = None,
 ):
     """
@@ -181,7 +181,8 @@ def cache_method(
 
     Args:
         ttl: Time-to-live in seconds
-        prefix: Prefix for cache key
+        prefix: Prefix for cache key, or a callable deriving it from the
+            instance (e.g. to key on its configured model)
         condition: Optional callable to determine if result should be cached
 
     Example:
@@ -192,11 +193,15 @@ def cache_method(
                 pass
     """
 
+    def _instance_prefix(instance: Any, func: Callable) -> str:
+        key_prefix = prefix(instance) if callable(prefix) else prefix
+        return f"{instance.__class__.__name__}:{key_prefix or func.__name__}"
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def async_wrapper(self, *args, **kwargs) -> Any:
             cache = get_cache()
-            instance_prefix = f"{self.__class__.__name__}:{prefix or func.__name__}"
+            instance_prefix = _instance_prefix(self, func)
             cache_key = _generate_cache_key(
                 func.__name__, args, kwargs, instance_prefix
             )
@@ -222,7 +227,7 @@ def cache_method(
 
         def sync_wrapper(self, *args, **kwargs) -> Any:
             cache = get_cache()
-            instance_prefix = f"{self.__class__.__name__}:{prefix or func.__name__}"
+            instance_prefix = _instance_prefix(self, func)
             cache_key = _generate_cache_key(
                 func.__name__, args, kwargs, instance_prefix
             )
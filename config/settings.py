@@ -33,11 +33,19 @@ class Settings(BaseSettings):
     DATABASE_MAX_OVERFLOW: int = 10
     DATABASE_POOL_TIMEOUT: int = 30
     USE_PERSISTENT_GRAPH: bool = False  # Use database instead of in-memory graph
+    ENABLE_PGVECTOR: bool = False  # PostgreSQL only: vector search via the pgvector extension
+    PGVECTOR_INDEX: str = "hnsw"  # "hnsw" (fast queries) or "ivfflat" (fast builds/inserts)
+    PGVECTOR_EF_SEARCH: int = 100  # HNSW candidate list size per query (recall vs. latency)
+    PGVECTOR_IVFFLAT_LISTS: int = 100  # IVFFlat clusters; about sqrt(rows) once loaded
+    PGVECTOR_IVFFLAT_PROBES: int = 10  # IVFFlat clusters scanned per query (recall vs. latency)
 
     # Knowledge Graph
     KNOWLEDGE_GRAPH_MAX_NODES: int = 10000
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     EMBEDDING_DIM: int = 384
+    EMBEDDING_DEVICE: str = "auto"  # "auto", "cpu", or "cuda" (cuda runs in FP16)
+    EMBEDDING_BACKEND: str = "torch"  # "torch" or "onnx" (int8 ONNX Runtime, CPU only)
+    FACT_CHECK_DB_PATH: Optional[Path] = None  # SQLite file persisting fact checks across restarts
 
     # LLM Configuration
     LLM_PROVIDER: str = "openai"  # "openai", "anthropic", "qwen", "gemini", or "gemini-cli"
@@ -53,6 +61,8 @@ class Settings(BaseSettings):
     GEMINI_CLI_MODEL: str = "gemini-pro"
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 2000
+    LLM_RESPONSE_CACHE: bool = False  # Reuse responses for repeated/paraphrased low-temperature prompts
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.95  # Prompt cosine similarity for a paraphrase hit
 
     # Data Pipeline
     RATE_LIMIT_REQUESTS_PER_SECOND: int = 10
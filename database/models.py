@@ -1,12 +1,15 @@
 """
 SQLAlchemy models for database persistence.
 """
-from sqlalchemy import Column, String, Float, DateTime, Text, Integer, ForeignKey, Table
+from sqlalchemy import Column, DDL, JSON, String, Float, DateTime, Text, Integer, ForeignKey, Index, Table, event
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 
+from config.settings import settings
+
 Base = declarative_base()
 
 
@@ -32,7 +35,7 @@ class ConceptNodeModel(Base):
     relevance_score = Column(Float, default=0.0)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    meta_data = Column(Text, nullable=True)  # Stored as JSON string
+    meta_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
 
     # Relationships
     edges_source = relationship(
@@ -52,14 +55,104 @@ class ConceptNodeModel(Base):
         return f"<ConceptNodeModel(id={self.id}, concept={self.concept})>"
 
 
+def _pgvector_enabled(ddl, target, bind, **kw) -> bool:
+    """Whether pgvector DDL should run when the node table is created."""
+    return settings.ENABLE_PGVECTOR
+
+
+def _embedding_index_ddl() -> str:
+    """CREATE INDEX statement for the configured pgvector index type."""
+    if settings.PGVECTOR_INDEX.lower() == "ivfflat":
+        # IVFFlat clusters are fixed at build time; rebuild after bulk loads
+        return (
+            "CREATE INDEX IF NOT EXISTS ix_concept_nodes_embedding_ivfflat ON concept_nodes "
+            "USING ivfflat (embedding_vector halfvec_cosine_ops) "
+            f"WITH (lists = {int(settings.PGVECTOR_IVFFLAT_LISTS)})"
+        )
+    return (
+        "CREATE INDEX IF NOT EXISTS ix_concept_nodes_embedding_hnsw ON concept_nodes "
+        "USING hnsw (embedding_vector halfvec_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+
+
+# pgvector storage for node embeddings: a halfvec column (half the size of
+# vector, same recall for cosine search) with an HNSW or IVFFlat index. The
+# column is managed in SQL rather than mapped, so SQLite and plain
+# PostgreSQL setups are unaffected. Existing databases need the same
+# statements run by hand, with CREATE INDEX CONCURRENTLY to avoid locking a
+# populated table.
+event.listen(
+    ConceptNodeModel.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS vector").execute_if(
+        dialect="postgresql", callable_=_pgvector_enabled
+    ),
+)
+event.listen(
+    ConceptNodeModel.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE concept_nodes ADD COLUMN IF NOT EXISTS "
+        f"embedding_vector halfvec({settings.EMBEDDING_DIM})"
+    ).execute_if(dialect="postgresql", callable_=_pgvector_enabled),
+)
+event.listen(
+    ConceptNodeModel.__table__,
+    "after_create",
+    DDL(_embedding_index_ddl()).execute_if(
+        dialect="postgresql", callable_=_pgvector_enabled
+    ),
+)
+
+
+# Full-text search over concept (weight A) and content (weight B) for
+# PostgreSQL: a stored generated tsvector with a GIN index. Queries must
+# match against search_tsv itself for the index to be used.
+event.listen(
+    ConceptNodeModel.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE concept_nodes ADD COLUMN IF NOT EXISTS search_tsv tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(concept, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    ConceptNodeModel.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_concept_nodes_search_tsv "
+        "ON concept_nodes USING GIN (search_tsv)"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+# Containment queries on node metadata (meta_data @> '{...}') on PostgreSQL.
+event.listen(
+    ConceptNodeModel.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_concept_nodes_meta_data "
+        "ON concept_nodes USING GIN (meta_data jsonb_path_ops)"
+    ).execute_if(dialect="postgresql"),
+)
+
+
 class GraphEdgeModel(Base):
     """SQLAlchemy model for GraphEdge."""
 
     __tablename__ = "graph_edges"
+    # Edge lookups filter on one endpoint and optionally the relationship
+    # type; the leading column also serves endpoint-only lookups.
+    __table_args__ = (
+        Index("ix_graph_edges_source_rel", "source_id", "relationship_type"),
+        Index("ix_graph_edges_target_rel", "target_id", "relationship_type"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    source_id = Column(String, ForeignKey("concept_nodes.id"), nullable=False, index=True)
-    target_id = Column(String, ForeignKey("concept_nodes.id"), nullable=False, index=True)
+    source_id = Column(String, ForeignKey("concept_nodes.id"), nullable=False)
+    target_id = Column(String, ForeignKey("concept_nodes.id"), nullable=False)
     relationship_type = Column(String, nullable=False)
     weight = Column(Float, default=0.5)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -5,11 +5,18 @@ Provides CRUD operations for all domain entities.
 """
 
 import logging
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import insert, inspect, or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from datetime import datetime
 import json
 
+import numpy as np
+
+from config.settings import settings
+
 from database.models import (
     ConceptNodeModel,
     GraphEdgeModel,
@@ -23,6 +30,60 @@ from knowledge_graph.engine import GraphEdge
 logger = logging.getLogger(__name__)
 
 
+# Rows per statement for bulk inserts and id lookups
+BULK_BATCH_SIZE = 1000
+
+
+def _vector_literal(embedding: Sequence[float]) -> str:
+    """
+    Format an embedding as a halfvec text literal.
+
+    Values are rounded to float16 here, which is what the column stores.
+    Five significant digits identify any float16 exactly, so the literal
+    is less than half the length of full float repr with nothing lost.
+    """
+    halves = np.asarray(embedding, dtype=np.float16).ravel().tolist()
+    return "[" + ",".join(format(value, ".5g") for value in halves) + "]"
+
+
+def _batches(items: Sequence[Any]) -> Iterable[Sequence[Any]]:
+    """Split items into BULK_BATCH_SIZE slices."""
+    for start in range(0, len(items), BULK_BATCH_SIZE):
+        yield items[start:start + BULK_BATCH_SIZE]
+
+
+def _existing_ids(db: Session, model, ids: Iterable[str]) -> Set[str]:
+    """Return which of the given primary keys already exist."""
+    ids = list(ids)
+    found = set()
+    for batch in _batches(ids):
+        found.update(row[0] for row in db.query(model.id).filter(model.id.in_(batch)))
+    return found
+
+
+def _insert_skipping_existing(db: Session, model):
+    """INSERT that skips rows whose id already exists, where supported."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return pg_insert(model).on_conflict_do_nothing(index_elements=["id"])
+    if dialect == "sqlite":
+        return sqlite_insert(model).on_conflict_do_nothing(index_elements=["id"])
+    return insert(model)
+
+
+def _bulk_insert(db: Session, model, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert rows in batches with a single commit.
+
+    Rows whose id already exists are skipped instead of failing the
+    batch, which covers concurrent writers.
+    """
+    statement = _insert_skipping_existing(db, model)
+    for batch in _batches(rows):
+        db.execute(statement, list(batch))
+    db.commit()
+
+
 class ConceptNodeRepository:
     """Repository for concept nodes."""
 
@@ -35,7 +96,7 @@ class ConceptNodeRepository:
             id=node.id,
             concept=node.concept,
             content=node.content,
-            metadata=json.dumps(node.metadata) if node.metadata else None,
+            meta_data=node.metadata or None,
             created_at=node.created_at,
         )
         self.db.add(db_node)
@@ -44,17 +105,35 @@ class ConceptNodeRepository:
         logger.debug(f"Created concept node: {node.id}")
         return db_node
 
+    def create_many(self, nodes: List[ConceptNode]) -> None:
+        """Create concept nodes with batched multi-row inserts."""
+        _bulk_insert(self.db, ConceptNodeModel, [
+            {
+                "id": node.id,
+                "concept": node.concept,
+                "content": node.content,
+                "meta_data": node.metadata or None,
+                "created_at": node.created_at,
+            }
+            for node in nodes
+        ])
+        logger.debug(f"Created {len(nodes)} concept nodes")
+
+    def existing_ids(self, node_ids: Iterable[str]) -> Set[str]:
+        """Return which of the given node ids are already stored."""
+        return _existing_ids(self.db, ConceptNodeModel, node_ids)
+
     def get_by_id(self, node_id: str) -> Optional[ConceptNodeModel]:
         """Get a concept node by ID."""
         return self.db.query(ConceptNodeModel).filter(
             ConceptNodeModel.id == node_id
         ).first()
 
-    def get_by_concept(self, concept: str) -> List[ConceptNodeModel]:
-        """Get all nodes for a concept."""
+    def get_by_concept(self, concept: str, limit: Optional[int] = None) -> List[ConceptNodeModel]:
+        """Get nodes for a concept, at most limit of them when given."""
         return self.db.query(ConceptNodeModel).filter(
             ConceptNodeModel.concept == concept
-        ).all()
+        ).limit(limit).all()
 
     def list_all(self, limit: int = 100) -> List[ConceptNodeModel]:
         """List all concept nodes."""
@@ -84,6 +163,136 @@ class ConceptNodeRepository:
         """Count total nodes."""
         return self.db.query(ConceptNodeModel).count()
 
+    def has_search_column(self) -> bool:
+        """
+        Check whether concept_nodes has the search_tsv column.
+
+        Tables created before the column was added need it added by hand;
+        until then, callers should use substring_search instead.
+        """
+        try:
+            columns = inspect(self.db.get_bind()).get_columns("concept_nodes")
+        except Exception as e:
+            logger.warning(f"Could not inspect concept_nodes: {e}")
+            return False
+        return any(column["name"] == "search_tsv" for column in columns)
+
+    def substring_search(self, query: str, limit: int) -> List[ConceptNodeModel]:
+        """Search nodes whose concept or content contains query (case-insensitive)."""
+        search = f"%{query}%"
+        return self.db.query(ConceptNodeModel).filter(
+            ConceptNodeModel.concept.ilike(search) | ConceptNodeModel.content.ilike(search)
+        ).limit(limit).all()
+
+    def full_text_search(self, query: str, limit: int) -> List[ConceptNodeModel]:
+        """
+        Search nodes through the search_tsv GIN index (PostgreSQL only).
+
+        Returns:
+            Matching nodes, best ts_rank first
+        """
+        return self.db.query(ConceptNodeModel).from_statement(
+            text(
+                "SELECT concept_nodes.* FROM concept_nodes, "
+                "plainto_tsquery('english', :query) AS q "
+                "WHERE search_tsv @@ q ORDER BY ts_rank(search_tsv, q) DESC LIMIT :limit"
+            )
+        ).params(query=query, limit=limit).all()
+
+    def get_many(self, node_ids: Iterable[str]) -> Dict[str, ConceptNodeModel]:
+        """Get concept nodes by ID in one query, keyed by ID."""
+        node_ids = list(node_ids)
+        if not node_ids:
+            return {}
+        return {
+            node.id: node
+            for node in self.db.query(ConceptNodeModel).filter(
+                ConceptNodeModel.id.in_(node_ids)
+            )
+        }
+
+    def get_neighbors(
+        self, node_id: str, relationship_type: Optional[str] = None
+    ) -> List[ConceptNodeModel]:
+        """
+        Get the nodes connected to a node in one round-trip.
+
+        Outgoing and incoming edges are joined to their nodes in two halves
+        of a UNION ALL, so each side can use its own edge index. Each
+        neighbor is returned once, however many edges connect it.
+        """
+        outgoing = self.db.query(ConceptNodeModel).join(
+            GraphEdgeModel,
+            (GraphEdgeModel.target_id == ConceptNodeModel.id)
+            & (GraphEdgeModel.source_id == node_id),
+        )
+        incoming = self.db.query(ConceptNodeModel).join(
+            GraphEdgeModel,
+            (GraphEdgeModel.source_id == ConceptNodeModel.id)
+            & (GraphEdgeModel.target_id == node_id),
+        )
+        if relationship_type is not None:
+            outgoing = outgoing.filter(GraphEdgeModel.relationship_type == relationship_type)
+            incoming = incoming.filter(GraphEdgeModel.relationship_type == relationship_type)
+        return outgoing.union_all(incoming).all()
+
+    def set_embedding(self, node_id: str, embedding: Sequence[float]) -> None:
+        """Store a node's embedding in the pgvector halfvec column."""
+        self.set_embeddings([node_id], [embedding])
+
+    def set_embeddings(
+        self, node_ids: Sequence[str], embeddings: Sequence[Sequence[float]]
+    ) -> None:
+        """Store several node embeddings in one executemany and commit."""
+        self.db.execute(
+            text(
+                "UPDATE concept_nodes SET embedding_vector = "
+                f"CAST(:embedding AS halfvec({settings.EMBEDDING_DIM})) WHERE id = :id"
+            ),
+            [
+                {"embedding": _vector_literal(embedding), "id": node_id}
+                for node_id, embedding in zip(node_ids, embeddings)
+            ],
+        )
+        self.db.commit()
+
+    def nearest(
+        self, embedding: Sequence[float], limit: int, ef_search: int = 100, probes: int = 10
+    ) -> List[Tuple[ConceptNodeModel, float]]:
+        """
+        Find the nodes closest to an embedding by cosine distance.
+
+        Uses whichever HNSW or IVFFlat index exists on the halfvec column;
+        both search parameters are set so the same query suits either. The
+        query vector is cast to the column's exact type, otherwise
+        PostgreSQL cannot use the index.
+
+        Returns:
+            (node, cosine similarity) pairs, most similar first
+        """
+        halfvec = f"halfvec({settings.EMBEDDING_DIM})"
+        # SET LOCAL applies to this transaction only
+        self.db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+        self.db.execute(text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
+        rows = self.db.execute(
+            text(
+                f"SELECT id, 1 - (embedding_vector <=> CAST(:query AS {halfvec})) AS score "
+                "FROM concept_nodes WHERE embedding_vector IS NOT NULL "
+                f"ORDER BY embedding_vector <=> CAST(:query AS {halfvec}) LIMIT :limit"
+            ),
+            {"query": _vector_literal(embedding), "limit": limit},
+        ).all()
+        if not rows:
+            return []
+
+        nodes = {
+            node.id: node
+            for node in self.db.query(ConceptNodeModel).filter(
+                ConceptNodeModel.id.in_([row.id for row in rows])
+            )
+        }
+        return [(nodes[row.id], float(row.score)) for row in rows if row.id in nodes]
+
 
 class GraphEdgeRepository:
     """Repository for graph edges."""
@@ -107,6 +316,47 @@ class GraphEdgeRepository:
         logger.debug(f"Created edge: {edge.id}")
         return db_edge
 
+    def create_if_absent(self, edge: GraphEdge) -> bool:
+        """
+        Create an edge unless its id exists, in a single INSERT ... RETURNING.
+
+        Endpoint existence is left to the foreign keys: an edge to a
+        missing node raises IntegrityError.
+
+        Returns:
+            Whether the edge was inserted
+        """
+        statement = _insert_skipping_existing(self.db, GraphEdgeModel).values(
+            id=edge.id,
+            source_id=edge.source_node_id,
+            target_id=edge.target_node_id,
+            relationship_type=edge.relationship_type,
+            weight=edge.weight,
+            created_at=edge.created_at,
+        ).returning(GraphEdgeModel.id)
+        inserted = self.db.execute(statement).first() is not None
+        self.db.commit()
+        return inserted
+
+    def create_many(self, edges: List[GraphEdge]) -> None:
+        """Create edges with batched multi-row inserts."""
+        _bulk_insert(self.db, GraphEdgeModel, [
+            {
+                "id": edge.id,
+                "source_id": edge.source_node_id,
+                "target_id": edge.target_node_id,
+                "relationship_type": edge.relationship_type,
+                "weight": edge.weight,
+                "created_at": edge.created_at,
+            }
+            for edge in edges
+        ])
+        logger.debug(f"Created {len(edges)} edges")
+
+    def existing_ids(self, edge_ids: Iterable[str]) -> Set[str]:
+        """Return which of the given edge ids are already stored."""
+        return _existing_ids(self.db, GraphEdgeModel, edge_ids)
+
     def get_by_id(self, edge_id: str) -> Optional[GraphEdgeModel]:
         """Get an edge by ID."""
         return self.db.query(GraphEdgeModel).filter(
@@ -125,6 +375,43 @@ class GraphEdgeRepository:
             GraphEdgeModel.target_id == target_id
         ).all()
 
+    def get_edges_for_nodes(self, node_ids: Iterable[str]) -> List[GraphEdgeModel]:
+        """Get all edges from or to any of the given nodes in one query."""
+        node_ids = list(node_ids)
+        if not node_ids:
+            return []
+        return self.db.query(GraphEdgeModel).filter(
+            or_(
+                GraphEdgeModel.source_id.in_(node_ids),
+                GraphEdgeModel.target_id.in_(node_ids),
+            )
+        ).all()
+
+    def get_edges_within(self, center_id: str, depth: int) -> List[GraphEdgeModel]:
+        """
+        Get every edge touching a node fewer than depth hops from a center.
+
+        The traversal runs in the database as one recursive CTE. Its UNION
+        drops repeated (node, hop) pairs, so each node is expanded at most
+        once per hop count. Edges are returned once each.
+        """
+        return self.db.query(GraphEdgeModel).from_statement(
+            text(
+                "WITH RECURSIVE frontier(id, hops) AS ("
+                " SELECT CAST(:center_id AS VARCHAR), 0"
+                " UNION"
+                " SELECT CASE WHEN e.source_id = f.id THEN e.target_id ELSE e.source_id END,"
+                " f.hops + 1"
+                " FROM frontier f JOIN graph_edges e"
+                " ON e.source_id = f.id OR e.target_id = f.id"
+                " WHERE f.hops + 1 < :depth"
+                ") "
+                "SELECT graph_edges.* FROM graph_edges "
+                "WHERE source_id IN (SELECT id FROM frontier) "
+                "OR target_id IN (SELECT id FROM frontier)"
+            )
+        ).params(center_id=center_id, depth=depth).all()
+
     def list_all(self, limit: int = 100) -> List[GraphEdgeModel]:
         """List all edges."""
         return self.db.query(GraphEdgeModel).limit(limit).all()
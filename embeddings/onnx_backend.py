@@ -0,0 +1,104 @@
+"""
+ONNX Runtime backend for CPU-only embedding.
+
+Exports the Sentence Transformer to ONNX, applies dynamic int8 quantization
+to its linear layers and runs it with ONNX Runtime's graph fusions.
+Requires optimum[onnxruntime]; the quantized model is cached on disk so the
+export only happens once per model.
+"""
+import logging
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_CACHE_DIR = Path.home() / ".cache" / "continuum" / "onnx"
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+class OnnxSentenceEncoder:
+    """
+    Int8-quantized ONNX Runtime encoder with a SentenceTransformer-style API.
+
+    Embeddings are mean-pooled over the attention mask and L2-normalized,
+    matching the pooling of the sentence-transformers MiniLM/MPNet models.
+    """
+
+    def __init__(self, model_name: str, cache_dir: Path = ONNX_CACHE_DIR):
+        """
+        Load (exporting and quantizing on first use) the ONNX model.
+
+        Args:
+            model_name: Sentence Transformer model name or Hugging Face model id
+            cache_dir: Directory holding quantized models
+
+        Raises:
+            ImportError: If optimum[onnxruntime] is not installed
+        """
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        model_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        model_dir = Path(cache_dir) / model_id.replace("/", "__")
+
+        if not (model_dir / QUANTIZED_FILE_NAME).exists():
+            logger.info(f"Exporting {model_id} to int8 ONNX in {model_dir}")
+            exported = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+            quantizer = ORTQuantizer.from_pretrained(exported)
+            quantization_config = AutoQuantizationConfig.avx512_vnni(
+                is_static=False, per_channel=False
+            )
+            quantizer.quantize(save_dir=model_dir, quantization_config=quantization_config)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(model_dir)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir,
+            file_name=QUANTIZED_FILE_NAME,
+            provider="CPUExecutionProvider",
+        )
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs,
+    ) -> np.ndarray:
+        """
+        Encode one text or a list of texts.
+
+        Args:
+            sentences: Text or list of texts to encode
+            batch_size: Number of texts per forward pass
+            convert_to_numpy: Accepted for SentenceTransformer compatibility
+
+        Returns:
+            A vector for a single text, otherwise an (n_texts, dim) matrix
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                return_tensors="np",
+            )
+            token_embeddings = np.asarray(self.model(**inputs).last_hidden_state)
+
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+
+        embeddings = np.concatenate(batches)
+        return embeddings[0] if single else embeddings
@@ -4,8 +4,16 @@ Embedding service for semantic search and similarity computation.
 Uses Sentence Transformers for high-quality embeddings.
 Supports caching via the cache system for performance optimization.
 """
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import json
 import logging
-from typing import List, Optional
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
 import numpy as np
 from config.settings import settings
 from cache import cache_sync
@@ -32,8 +40,90 @@ except ImportError:
 
         return np.dot(X / X_norm, (Y / Y_norm).T)
 
+try:
+    import simsimd
+    HAS_SIMSIMD = True
+except ImportError:
+    simsimd = None
+    HAS_SIMSIMD = False
+
 logger = logging.getLogger(__name__)
 
+# Lookup table of alphanumeric ASCII code points for the fallback embedding
+_ASCII_ALNUM = np.array([chr(code).isalnum() for code in range(128)])
+
+def _run_async_in_thread(coro):
+    """Run async operation in a new event loop in a separate thread."""
+    def run_in_thread():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        future = executor.submit(run_in_thread)
+        return future.result()
+
+
+async def _gather(coros):
+    """Await a list of coroutines concurrently."""
+    return await asyncio.gather(*coros)
+
+
+def _top_k_above(
+    similarities: np.ndarray, top_k: int, threshold: float
+) -> List[tuple[int, float]]:
+    """
+    Select the top_k scores at or above threshold, best first.
+
+    Partitions once to find the k best candidates and only sorts those,
+    instead of filtering, copying and fully sorting every score.
+    """
+    k = min(top_k, similarities.shape[0])
+    if k <= 0:
+        return []
+
+    if k < similarities.shape[0]:
+        # Partition for the k largest in place of negating a full copy
+        top = np.argpartition(similarities, similarities.shape[0] - k)[-k:]
+    else:
+        top = np.arange(k)
+    top = top[np.argsort(-similarities[top])]
+
+    return [
+        (int(i), float(similarities[i]))
+        for i in top
+        if similarities[i] >= threshold
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_model(model_name: str, device: str, backend: str = "torch"):
+    """
+    Load a Sentence Transformer model once per (model, device, backend).
+
+    Every EmbeddingService built for the same model shares this instance.
+    """
+    if backend == "onnx" and device == "cpu":
+        try:
+            from embeddings.onnx_backend import OnnxSentenceEncoder
+            return OnnxSentenceEncoder(model_name)
+        except ImportError:
+            logger.warning(
+                "optimum[onnxruntime] not installed. Using the PyTorch embedding backend. "
+                "Install with: pip install optimum[onnxruntime]"
+            )
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device=device)
+    if device == "cuda":
+        # FP16 weights let the GPU use tensor cores for the matmuls
+        model.half()
+    return model
+
 
 class EmbeddingService:
     """
@@ -54,11 +144,18 @@ class EmbeddingService:
         self.embedding_dim = settings.EMBEDDING_DIM
         self.use_sentence_transformers = False
 
+        # The fallback length feature occupies a fixed slot for this dimension
+        start_idx = min(self.embedding_dim // 4, self.embedding_dim - 1)
+        self._length_slice = slice(start_idx, min(start_idx + 10, self.embedding_dim))
+        self.device = "cpu"
+
         try:
-            from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer(self.model_name)
+            self.device = self._resolve_device(settings.EMBEDDING_DEVICE)
+            self.model = _load_model(
+                self.model_name, self.device, settings.EMBEDDING_BACKEND.lower()
+            )
             self.use_sentence_transformers = True
-            logger.info(f"Embedding model loaded: {self.model_name}")
+            logger.info(f"Embedding model loaded: {self.model_name} on {self.device}")
         except ImportError:
             logger.warning(
                 "sentence-transformers not installed. Using fallback embedding service. "
@@ -71,6 +168,43 @@ class EmbeddingService:
             self.model = None
             self.use_sentence_transformers = False
 
+    @staticmethod
+    def _resolve_device(requested: str) -> str:
+        """
+        Resolve the configured embedding device.
+
+        Args:
+            requested: "auto", "cpu", or "cuda"
+
+        Returns:
+            "cuda" when requested (or auto-detected) and available, else "cpu"
+        """
+        requested = (requested or "auto").lower()
+        if requested == "cpu":
+            return "cpu"
+
+        try:
+            import torch
+            if torch.cuda.is_available():
+                return "cuda"
+        except ImportError:
+            pass
+
+        if requested == "cuda":
+            logger.warning("EMBEDDING_DEVICE=cuda but CUDA is not available. Using CPU.")
+        return "cpu"
+
+    def _inference_context(self):
+        """Return the inference context for the model's device."""
+        if self.device != "cuda":
+            return contextlib.nullcontext()
+
+        import torch
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        stack.enter_context(torch.autocast("cuda", dtype=torch.float16))
+        return stack
+
     def encode(self, text: str) -> np.ndarray:
         """
         Encode text into an embedding vector.
@@ -86,35 +220,25 @@ class EmbeddingService:
         else:
             return self._encode_uncached(text)
 
+    def _cache_key(self, text: str) -> str:
+        """Build the cache key for a text's embedding."""
+        # Digest the whole text: a truncated prefix made long texts that
+        # share their first 100 characters collide on one cached vector.
+        # blake2b is the fastest collision-resistant hash in hashlib.
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"embedding:{self.model_name}:{digest}"
+
     def _encode_with_cache(self, text: str) -> np.ndarray:
         """Encode with caching enabled."""
-        import concurrent.futures
-
         from cache import get_cache
 
         cache = get_cache()
-        cache_key = f"embedding:{self.model_name}:{text[:100]}"
+        cache_key = self._cache_key(text)
 
         # Try to get from cache (convert to list for JSON serialization)
         cached_list = None
         try:
-            # Use a thread pool to run async operations safely
-            def run_async_in_thread(coro):
-                """Run async operation in a new event loop in a separate thread."""
-                def run_in_thread():
-                    import asyncio
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        return loop.run_until_complete(coro)
-                    finally:
-                        loop.close()
-                
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_in_thread)
-                    return future.result()
-            
-            cached_list = run_async_in_thread(cache.get(cache_key))
+            cached_list = _run_async_in_thread(cache.get(cache_key))
         except Exception as e:
             logger.warning(f"Cache retrieval failed: {e}, proceeding without cache")
             
@@ -127,23 +251,7 @@ class EmbeddingService:
 
         # Store in cache as list (JSON serializable)
         try:
-            # Use same thread pool approach for cache storage
-            def run_async_in_thread(coro):
-                """Run async operation in a new event loop in a separate thread."""
-                def run_in_thread():
-                    import asyncio
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        return loop.run_until_complete(coro)
-                    finally:
-                        loop.close()
-                
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_in_thread)
-                    return future.result()
-            
-            run_async_in_thread(
+            _run_async_in_thread(
                 cache.set(
                     cache_key,
                     embedding.tolist(),
@@ -159,7 +267,8 @@ class EmbeddingService:
         """Encode without caching."""
         try:
             if self.use_sentence_transformers and self.model:
-                embedding = self.model.encode(text, convert_to_numpy=True)
+                with self._inference_context():
+                    embedding = self.model.encode(text, convert_to_numpy=True)
                 return embedding.astype(np.float32)
             else:
                 # Fallback: Simple character frequency based embedding
@@ -173,6 +282,9 @@ class EmbeddingService:
         """
         Encode multiple texts into embedding vectors.
 
+        Duplicate texts are encoded once, and cached embeddings are reused
+        when caching is enabled, so only cache misses reach the model.
+
         Args:
             texts: List of texts to encode
             batch_size: Batch size for processing
@@ -180,27 +292,89 @@ class EmbeddingService:
         Returns:
             Matrix of embedding vectors (n_samples, embedding_dim)
         """
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+
+        unique_texts = list(dict.fromkeys(texts))
+        row_of = {text: i for i, text in enumerate(unique_texts)}
+        inverse = np.fromiter((row_of[text] for text in texts), dtype=np.intp, count=len(texts))
+
+        if settings.ENABLE_CACHING:
+            unique_embeddings = self._encode_batch_with_cache(unique_texts, batch_size)
+        else:
+            unique_embeddings = self._encode_batch_uncached(unique_texts, batch_size)
+
+        return unique_embeddings[inverse]
+
+    def _encode_batch_with_cache(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Batch encode with caching enabled, sending only misses to the model."""
+        from cache import get_cache
+
+        cache = get_cache()
+        cache_keys = [self._cache_key(text) for text in texts]
+
+        cached_lists = [None] * len(texts)
+        try:
+            cached_lists = _run_async_in_thread(
+                _gather([cache.get(key) for key in cache_keys])
+            )
+        except Exception as e:
+            logger.warning(f"Cache retrieval failed: {e}, proceeding without cache")
+
+        miss_indices = [i for i, cached in enumerate(cached_lists) if cached is None]
+        if not miss_indices:
+            return np.array(cached_lists, dtype=np.float32)
+
+        computed = self._encode_batch_uncached([texts[i] for i in miss_indices], batch_size)
+
+        embeddings = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+        embeddings[miss_indices] = computed
+        for i, cached in enumerate(cached_lists):
+            if cached is not None:
+                embeddings[i] = cached
+
+        # Store misses in cache as lists (JSON serializable)
+        try:
+            _run_async_in_thread(
+                _gather([
+                    cache.set(cache_keys[i], row.tolist(), settings.CACHE_TTL_SECONDS)
+                    for i, row in zip(miss_indices, computed)
+                ])
+            )
+        except Exception as e:
+            logger.warning(f"Cache storage failed: {e}, continuing without cache")
+
+        return embeddings
+
+    def _encode_batch_uncached(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Batch encode without caching."""
         try:
             if self.use_sentence_transformers and self.model:
-                embeddings = self.model.encode(
-                    texts,
-                    batch_size=batch_size,
-                    convert_to_numpy=True,
-                )
-                return embeddings.astype(np.float32)
+                # Sort by length so each batch holds similarly sized texts and
+                # the model pads as little as possible, then restore input order
+                order = np.argsort([len(text) for text in texts], kind="stable")
+                sorted_texts = [texts[i] for i in order]
+                with self._inference_context():
+                    embeddings = self.model.encode(
+                        sorted_texts,
+                        batch_size=batch_size,
+                        convert_to_numpy=True,
+                    )
+                return embeddings[np.argsort(order)].astype(np.float32)
             else:
-                # Fallback: Generate embeddings one by one using fallback method
-                embeddings = []
-                for text in texts:
-                    embeddings.append(self._generate_fallback_embedding(text))
-                return np.array(embeddings, dtype=np.float32)
+                # Fallback: Generate embeddings using fallback method
+                return self._generate_fallback_batch(texts)
         except Exception as e:
             logger.error(f"Error batch encoding texts: {e}")
             # Use fallback on error
-            embeddings = []
-            for text in texts:
-                embeddings.append(self._generate_fallback_embedding(text))
-            return np.array(embeddings, dtype=np.float32)
+            return self._generate_fallback_batch(texts)
+
+    def _generate_fallback_batch(self, texts: List[str]) -> np.ndarray:
+        """Generate fallback embeddings for a batch of texts into one matrix."""
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            embeddings[row] = self._generate_fallback_embedding(text)
+        return embeddings
 
     def similarity(
         self, embedding1: np.ndarray, embedding2: np.ndarray
@@ -216,22 +390,60 @@ class EmbeddingService:
             Similarity score between 0 and 1
         """
         try:
-            # Ensure embeddings are 2D for cosine_similarity
-            emb1 = embedding1.reshape(1, -1) if embedding1.ndim == 1 else embedding1
-            emb2 = embedding2.reshape(1, -1) if embedding2.ndim == 1 else embedding2
-
-            sim = cosine_similarity(emb1, emb2)[0, 0]
-            return float(sim)
+            # Compare the first rows of 2D inputs, as before
+            emb1 = embedding1[0] if embedding1.ndim > 1 else embedding1
+            emb2 = embedding2[0] if embedding2.ndim > 1 else embedding2
+
+            # Direct BLAS dots avoid the pairwise-matrix machinery for one pair
+            denominator = np.sqrt(np.vdot(emb1, emb1) * np.vdot(emb2, emb2))
+            if not denominator:
+                return 0.0
+            return float(np.vdot(emb1, emb2) / denominator)
         except Exception as e:
             logger.error(f"Error computing similarity: {e}")
             return 0.0
 
+    @staticmethod
+    def normalize(embeddings: np.ndarray) -> np.ndarray:
+        """
+        L2-normalize embeddings row-wise, leaving zero vectors at zero.
+
+        Args:
+            embeddings: Embedding vector or matrix
+
+        Returns:
+            Normalized embeddings with the same shape
+        """
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        norms[norms == 0] = 1
+        return embeddings / norms
+
+    @staticmethod
+    def quantize_int8(embeddings: np.ndarray) -> np.ndarray:
+        """
+        Quantize embeddings row-wise to int8, scaling each row to span [-127, 127].
+
+        Cosine similarity ignores per-row scale, so no scale factor is kept.
+
+        Args:
+            embeddings: Embedding vector or matrix
+
+        Returns:
+            int8 embeddings with the same shape
+        """
+        peaks = np.abs(embeddings).max(axis=-1, keepdims=True)
+        peaks[peaks == 0] = 1
+        return np.round(embeddings * (127.0 / peaks)).astype(np.int8)
+
     def find_similar(
         self,
         query_embedding: np.ndarray,
         candidate_embeddings: np.ndarray,
         top_k: int = 5,
         threshold: float = 0.0,
+        normalized: bool = False,
+        use_simsimd: bool = False,
+        out: Optional[np.ndarray] = None,
     ) -> List[tuple[int, float]]:
         """
         Find the most similar embeddings to a query embedding.
@@ -241,31 +453,52 @@ class EmbeddingService:
             candidate_embeddings: Matrix of candidate embeddings
             top_k: Number of top results to return
             threshold: Minimum similarity threshold
+            normalized: Whether candidate rows are already L2-normalized
+            use_simsimd: Score with SimSIMD's SIMD cosine kernels when installed;
+                int8 candidates from quantize_int8 then use its int8 kernel.
+                Without SimSIMD, int8 candidates are upcast to float32.
+            out: Optional reusable buffer for the similarity scores, one
+                slot per candidate in the candidates' dtype (float32 for
+                int8 candidates)
 
         Returns:
             List of (index, similarity) tuples sorted by similarity
         """
         try:
-            query = (
-                query_embedding.reshape(1, -1)
-                if query_embedding.ndim == 1
-                else query_embedding
-            )
-
-            similarities = cosine_similarity(query, candidate_embeddings)[0]
-
-            # Filter by threshold
-            valid_indices = np.where(similarities >= threshold)[0]
-            valid_similarities = similarities[valid_indices]
-
-            # Sort by similarity descending
-            sorted_idx = np.argsort(-valid_similarities)[:top_k]
-            results = [
-                (int(valid_indices[i]), float(valid_similarities[i]))
-                for i in sorted_idx
-            ]
+            query = query_embedding[0] if query_embedding.ndim > 1 else query_embedding
+            if np.issubdtype(candidate_embeddings.dtype, np.floating):
+                # Match the matrix dtype so BLAS runs a single-precision
+                # gemv over float32 rows instead of upcasting a full copy
+                query = np.ascontiguousarray(query, dtype=candidate_embeddings.dtype)
+            if use_simsimd and HAS_SIMSIMD:
+                if candidate_embeddings.dtype == np.int8:
+                    # Quantize the query too so SimSIMD runs its int8 kernel
+                    query = self.quantize_int8(np.asarray(query, dtype=np.float32))
+                # SimSIMD reads the matrix in place and normalizes per row
+                distances = np.asarray(
+                    simsimd.cdist(query[np.newaxis, :], candidate_embeddings, metric="cosine")
+                )
+                return _top_k_above(1.0 - distances[0], top_k, threshold)
+
+            if candidate_embeddings.dtype == np.int8:
+                # Products of int8 rows overflow int8; score in float32
+                candidate_embeddings = candidate_embeddings.astype(np.float32)
+                query = np.asarray(query, dtype=np.float32)
+
+            # vdot is a direct BLAS dot, without linalg.norm's dispatch
+            query = query / (np.sqrt(np.vdot(query, query)) or 1.0)
+
+            # Cosine similarity as a single matrix-vector product
+            similarities = np.matmul(candidate_embeddings, query, out=out)
+            if not normalized:
+                # Row norms without materializing the squared matrix
+                norms = np.sqrt(
+                    np.einsum("ij,ij->i", candidate_embeddings, candidate_embeddings)
+                )
+                norms[norms == 0] = 1
+                similarities /= norms
 
-            return results
+            return _top_k_above(similarities, top_k, threshold)
         except Exception as e:
             logger.error(f"Error finding similar embeddings: {e}")
             return []
@@ -299,6 +532,82 @@ class EmbeddingService:
             logger.error(f"Error performing semantic search: {e}")
             return []
 
+    @staticmethod
+    def text_key(text: str) -> str:
+        """Stable key identifying a text in a persisted embedding matrix."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _persisted_source(self) -> Dict[str, Any]:
+        """What produced this service's embeddings, as recorded by persist()."""
+        return {
+            "model_name": self.model_name,
+            "fallback": not self.use_sentence_transformers,
+            "embedding_dim": self.embedding_dim,
+        }
+
+    @staticmethod
+    def _persisted_paths(path: Union[str, Path]) -> Tuple[Path, Path]:
+        """Matrix and index paths for a persist() base path."""
+        path = Path(path)
+        return path.with_name(path.name + ".npy"), path.with_name(path.name + ".json")
+
+    def persist(self, path: Union[str, Path], texts: List[str]) -> np.ndarray:
+        """
+        Encode texts and persist them as a memory-mappable matrix.
+
+        Writes ``<path>.npy`` (float32 rows) and ``<path>.json`` mapping each
+        text key to its row, so later runs can skip encoding entirely. The
+        index also records the model, whether fallback embeddings were used
+        and the dimension, so load() can refuse incompatible vectors.
+
+        Args:
+            path: Base path for the matrix and its index
+            texts: Texts to encode and persist
+
+        Returns:
+            The encoded embedding matrix
+        """
+        matrix_path, index_path = self._persisted_paths(path)
+        matrix_path.parent.mkdir(parents=True, exist_ok=True)
+
+        embeddings = self.encode_batch(texts)
+        np.save(matrix_path, embeddings)
+
+        index = {self.text_key(text): row for row, text in enumerate(texts)}
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump({**self._persisted_source(), "index": index}, f)
+
+        logger.info(f"Persisted {len(texts)} embeddings to {path}")
+        return embeddings
+
+    def load(self, path: Union[str, Path]) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        Open a matrix written by persist() without reading it into memory.
+
+        Args:
+            path: Base path passed to persist()
+
+        Returns:
+            Tuple of (read-only memory-mapped matrix, text key -> row index)
+
+        Raises:
+            ValueError: If the matrix was built with a different model,
+                embedding backend or dimension
+        """
+        matrix_path, index_path = self._persisted_paths(path)
+        with open(index_path, encoding="utf-8") as f:
+            sidecar = json.load(f)
+
+        source = self._persisted_source()
+        persisted = {key: sidecar.get(key) for key in source}
+        if persisted != source:
+            raise ValueError(
+                f"Embeddings at {path} were built with {persisted}, not {source}"
+            )
+
+        embeddings = np.load(matrix_path, mmap_mode="r")
+        return embeddings, sidecar["index"]
+
     def _generate_fallback_embedding(self, text: str) -> np.ndarray:
         """
         Generate a fallback embedding for the text.
@@ -312,25 +621,22 @@ class EmbeddingService:
         if not text:
             return embedding
 
-        # Simple character frequency encoding
-        char_freq = {}
-        for char in text.lower():
-            if char.isalnum():  # Only alphanumeric characters
-                char_freq[char] = char_freq.get(char, 0) + 1
+        # Character frequencies in code point order
+        text_lower = text.lower()
+        if text_lower.isascii():
+            codes = np.frombuffer(text_lower.encode("ascii"), dtype=np.uint8)
+            counts = np.bincount(codes[_ASCII_ALNUM[codes]], minlength=128)
+            freqs = counts[counts > 0]
+        else:
+            char_freq = Counter(char for char in text_lower if char.isalnum())
+            freqs = np.array([char_freq[char] for char in sorted(char_freq)])
 
         # Map character frequencies to embedding dimensions
-        if char_freq:
-            max_freq = max(char_freq.values()) if char_freq.values() else 1
-            chars = sorted(char_freq.keys())
-            for i, char in enumerate(chars):
-                if i < len(embedding):
-                    embedding[i] = char_freq[char] / max_freq
+        if freqs.size:
+            n_chars = min(freqs.size, self.embedding_dim)
+            embedding[:n_chars] = freqs[:n_chars] / freqs.max()
 
         # Add text length encoding in later positions
-        text_length = len(text)
-        start_idx = min(len(embedding) // 4, len(embedding) - 1)
-        end_idx = min(start_idx + 10, len(embedding))
-        for i in range(start_idx, end_idx):
-            embedding[i] = min(text_length / 1000, 1.0)
+        embedding[self._length_slice] = min(len(text) / 1000, 1.0)
 
-        return embedding.astype(np.float32)
+        return embedding
@@ -5,17 +5,60 @@ This module implements continuous learning from system performance and user inte
 with feedback loops, online learning, and improvement mechanisms.
 """
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from array import array
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+import copy
+import itertools
+import sys
 import uuid
 from datetime import datetime
 import json
 import statistics
 
+import numpy as np
+
+# Ratings are on a 0.0 to 1.0 scale
+MIN_RATING = 0.0
+MAX_RATING = 1.0
+
+# Ratings at or above / at or below these produce positive / negative signals
+POSITIVE_RATING_THRESHOLD = 0.8
+NEGATIVE_RATING_THRESHOLD = 0.3
+
+# Signal type for each rating band:
+# (rating >= POSITIVE_RATING_THRESHOLD) + 2 * (rating <= NEGATIVE_RATING_THRESHOLD)
+_SIGNAL_TYPES = ("neutral", "positive", "negative", "neutral")
+
+# Below this many samples, building a NumPy array costs more than the
+# pure-Python statistics save
+_NUMPY_MIN_SAMPLES = 64
+
+
+def _is_valid_rating(rating: float) -> bool:
+    """Check a rating is on the 0.0 to 1.0 scale (NaN fails both comparisons)"""
+    return MIN_RATING <= rating <= MAX_RATING
+
+
+def _intern_source(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Intern the metadata's feedback_source string in place.
+
+    Feedback types and sources repeat across records and key every index;
+    interning them lets dict lookups hit CPython's identity fast path.
+    """
+    source = metadata.get("feedback_source")
+    if type(source) is str:
+        metadata["feedback_source"] = sys.intern(source)
+    return metadata
+
 
 @dataclass
 class FeedbackRecord:
     """A single feedback record from a user or system evaluation"""
+    __slots__ = ("id", "feedback_type", "item_id", "rating", "comment", "metadata", "timestamp")
+    
     id: str
     feedback_type: str  # "user_rating", "engagement", "quality", "accuracy", "relevance"
     item_id: str  # ID of the item being rated
@@ -28,6 +71,8 @@ class FeedbackRecord:
 @dataclass
 class LearningSignal:
     """A learning signal for the improvement system"""
+    __slots__ = ("id", "signal_type", "content", "confidence", "source", "timestamp")
+    
     id: str
     signal_type: str  # "positive", "negative", "neutral", "pattern", "anomaly"
     content: Any
@@ -36,6 +81,130 @@ class LearningSignal:
     timestamp: datetime
 
 
+# Ratings rounded to 1 decimal place fall into 11 buckets, 0.0 to 1.0
+_HISTOGRAM_BUCKETS = 11
+
+
+def _rating_bucket(rating: float) -> int:
+    """Histogram bucket of a rating rounded to 1 decimal place"""
+    return int(round(rating, 1) * 10 + 0.5)
+
+
+@dataclass
+class _ItemAggregate:
+    """Running feedback statistics for a single item, updated on insert and eviction"""
+    count: int = 0
+    total: float = 0.0
+    rating_histogram: array = field(default_factory=lambda: array("i", bytes(4 * _HISTOGRAM_BUCKETS)))
+    feedback_types: Counter = field(default_factory=Counter)
+    recent: Deque[FeedbackRecord] = field(default_factory=lambda: deque(maxlen=5))
+
+    def add(self, feedback: FeedbackRecord):
+        """Fold a new feedback record into the aggregate"""
+        self.count += 1
+        self.total += feedback.rating
+        self.rating_histogram[_rating_bucket(feedback.rating)] += 1
+        self.feedback_types[feedback.feedback_type] += 1
+        self.recent.append(feedback)
+
+    def remove(self, feedback: FeedbackRecord):
+        """Take the item's oldest feedback record back out of the aggregate"""
+        self.count -= 1
+        self.total -= feedback.rating
+        self.rating_histogram[_rating_bucket(feedback.rating)] -= 1
+        self.feedback_types[feedback.feedback_type] -= 1
+        if not self.feedback_types[feedback.feedback_type]:
+            del self.feedback_types[feedback.feedback_type]
+        if self.recent and self.recent[0] is feedback:
+            self.recent.popleft()
+
+    def rating_distribution(self) -> Dict[float, int]:
+        """Counts of ratings rounded to 1 decimal place"""
+        return {
+            bucket / 10: count
+            for bucket, count in enumerate(self.rating_histogram)
+            if count
+        }
+
+    def _rating_at(self, index: int) -> float:
+        """Rounded rating at a position in sorted order, by a cumulative histogram walk"""
+        seen = 0
+        for bucket, count in enumerate(self.rating_histogram):
+            seen += count
+            if seen > index:
+                return bucket / 10
+        raise IndexError(index)
+
+    def median(self) -> float:
+        """Median of the ratings rounded to 1 decimal place, as in rating_distribution"""
+        mid = self.count // 2
+        if self.count % 2:
+            return self._rating_at(mid)
+        return (self._rating_at(mid - 1) + self._rating_at(mid)) / 2
+
+
+class _RatingWindow:
+    """FIFO window of ratings stored in one contiguous float64 buffer"""
+    __slots__ = ("_buffer", "_start", "_end")
+
+    def __init__(self, capacity: int = 64):
+        self._buffer = np.empty(capacity, dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def append(self, rating: float):
+        """Add a rating at the newest end"""
+        if self._end == len(self._buffer):
+            live = len(self)
+            # Grow when more than half full, otherwise slide live ratings to the front
+            if live * 2 > len(self._buffer):
+                buffer = np.empty(len(self._buffer) * 2, dtype=np.float64)
+            else:
+                buffer = self._buffer
+            buffer[:live] = self._buffer[self._start:self._end]
+            self._buffer, self._start, self._end = buffer, 0, live
+        self._buffer[self._end] = rating
+        self._end += 1
+
+    def popleft(self):
+        """Drop the oldest rating"""
+        self._start += 1
+
+    def values(self) -> np.ndarray:
+        """View of the ratings, oldest first"""
+        return self._buffer[self._start:self._end]
+
+
+class _FeedbackBucket:
+    """Feedback records in arrival order, with their ratings stored contiguously"""
+    __slots__ = ("records", "ratings", "feedback_types")
+
+    def __init__(self):
+        self.records: Deque[FeedbackRecord] = deque()
+        self.ratings = _RatingWindow()
+        self.feedback_types: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def append(self, feedback: FeedbackRecord):
+        """Add a feedback record at the newest end"""
+        self.records.append(feedback)
+        self.ratings.append(feedback.rating)
+        self.feedback_types[feedback.feedback_type] += 1
+
+    def popleft(self):
+        """Drop the oldest feedback record"""
+        feedback_type = self.records.popleft().feedback_type
+        self.ratings.popleft()
+        self.feedback_types[feedback_type] -= 1
+        if not self.feedback_types[feedback_type]:
+            del self.feedback_types[feedback_type]
+
+
 class FeedbackSystem(ABC):
     """Abstract base class for the feedback system"""
     
@@ -45,8 +214,15 @@ class FeedbackSystem(ABC):
         pass
     
     @abstractmethod
-    def record_system_feedback(self, feedback_type: str, item_id: str, rating: float, metadata: Dict[str, Any]) -> bool:
-        """Record system-generated feedback"""
+    def record_system_feedback(
+        self,
+        feedback_type: str,
+        item_id: str,
+        rating: float,
+        metadata: Dict[str, Any],
+        timestamp: Optional[datetime] = None,
+    ) -> bool:
+        """Record system-generated feedback (timestamp defaults to now)"""
         pass
     
     @abstractmethod
@@ -63,19 +239,46 @@ class FeedbackSystem(ABC):
 class SelfImprovingFeedbackSystem(FeedbackSystem):
     """Implementation of the self-improving feedback system"""
     
-    def __init__(self):
-        self.feedback_records: List[FeedbackRecord] = []
-        self.learning_signals: List[LearningSignal] = []
+    def __init__(self, max_records: int = 100_000, max_signals: int = 100_000):
+        """
+        Initialize the feedback system.
+        
+        Args:
+            max_records: Number of feedback records kept before the oldest are evicted
+            max_signals: Number of learning signals kept before the oldest are evicted
+        """
+        self.feedback_records: Deque[FeedbackRecord] = deque(maxlen=max_records)
+        self.learning_signals: Deque[LearningSignal] = deque(maxlen=max_signals)
         self.expansion_strategies: Dict[str, Dict[str, Any]] = {}
-        self.performance_metrics: Dict[str, List[float]] = {}
+        # Ratings per feedback type, trimmed as records are evicted
+        self.performance_metrics: Dict[str, _RatingWindow] = {}
+
+        # IDs are a per-instance random prefix plus a sequence number, so only
+        # construction touches the OS entropy source
+        self._id_prefix = uuid.uuid4().hex[:12]
+        self._id_counter = itertools.count()
+
+        # Indexes maintained on insert so queries avoid rescanning all records
+        # (oldest first, trimmed as records are evicted)
+        self._item_aggregates: Dict[str, _ItemAggregate] = defaultdict(_ItemAggregate)
+        self._ratings_by_expansion_type: Dict[str, _RatingWindow] = defaultdict(_RatingWindow)
+        self._high_rated = _FeedbackBucket()
+        self._low_rated = _FeedbackBucket()
+        # Bucket for each rating band, indexed like _SIGNAL_TYPES
+        self._rating_buckets = (None, self._high_rated, self._low_rated, None)
+
+        # Bumped on every state change; analyses are cached against it
+        self._version = 0
+        self._analysis_cache: Optional[tuple] = None
+        self._recommendations_cache: Optional[tuple] = None
     
     def record_user_feedback(self, item_id: str, rating: float, comment: Optional[str] = None) -> bool:
         """Record user feedback for an item"""
-        if not 0.0 <= rating <= 1.0:
+        if not _is_valid_rating(rating):
             return False
         
         feedback = FeedbackRecord(
-            id=str(uuid.uuid4()),
+            id=self._next_id(),
             feedback_type="user_rating",
             item_id=item_id,
             rating=rating,
@@ -84,40 +287,133 @@ class SelfImprovingFeedbackSystem(FeedbackSystem):
             timestamp=datetime.now()
         )
         
-        self.feedback_records.append(feedback)
-        
-        # Generate learning signals based on feedback
-        self._process_feedback_for_learning(feedback)
+        self._store_feedback(feedback)
         
         return True
     
-    def record_system_feedback(self, feedback_type: str, item_id: str, rating: float, metadata: Dict[str, Any]) -> bool:
-        """Record system-generated feedback"""
-        if not 0.0 <= rating <= 1.0:
+    def record_system_feedback(
+        self,
+        feedback_type: str,
+        item_id: str,
+        rating: float,
+        metadata: Dict[str, Any],
+        timestamp: Optional[datetime] = None,
+    ) -> bool:
+        """Record system-generated feedback (timestamp defaults to now)"""
+        if not _is_valid_rating(rating):
             return False
         
         feedback = FeedbackRecord(
-            id=str(uuid.uuid4()),
-            feedback_type=feedback_type,
+            id=self._next_id(),
+            feedback_type=sys.intern(feedback_type),
             item_id=item_id,
             rating=rating,
             comment=None,
-            metadata=metadata,
-            timestamp=datetime.now()
+            metadata=_intern_source(metadata),
+            timestamp=timestamp or datetime.now()
         )
         
+        self._store_feedback(feedback)
+        
+        return True
+    
+    def record_batch(
+        self,
+        item_ids: List[str],
+        ratings: List[float],
+        feedback_type: str = "user_rating",
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Record many feedback entries of one type, e.g. when replaying logs.
+        
+        Ratings are validated in one vectorized pass and the whole batch shares
+        a single timestamp. Out-of-range ratings are skipped.
+        
+        Args:
+            item_ids: IDs of the rated items
+            ratings: Rating for each item (0.0 to 1.0 scale)
+            feedback_type: Feedback type applied to every entry
+            metadata: Metadata copied onto every entry
+        
+        Returns:
+            Number of feedback entries recorded
+        """
+        if len(item_ids) != len(ratings):
+            raise ValueError("item_ids and ratings must have the same length")
+        
+        ratings_array = np.asarray(ratings, dtype=np.float64)
+        valid = np.flatnonzero((ratings_array >= MIN_RATING) & (ratings_array <= MAX_RATING))
+        
+        feedback_type = sys.intern(feedback_type)
+        if metadata is None:
+            metadata = {"feedback_source": "user"} if feedback_type == "user_rating" else {}
+        metadata = _intern_source(dict(metadata))
+        timestamp = datetime.now()
+        
+        for index, rating in zip(valid.tolist(), ratings_array[valid].tolist()):
+            self._store_feedback(FeedbackRecord(
+                id=self._next_id(),
+                feedback_type=feedback_type,
+                item_id=item_ids[index],
+                rating=rating,
+                comment=None,
+                metadata=dict(metadata),
+                timestamp=timestamp
+            ))
+        
+        return len(valid)
+    
+    def _next_id(self) -> str:
+        """Generate a unique ID for a feedback record or learning signal"""
+        return f"{self._id_prefix}-{next(self._id_counter)}"
+    
+    def _store_feedback(self, feedback: FeedbackRecord):
+        """Store a feedback record, update the indexes and derive learning signals"""
+        self._version += 1
+        if len(self.feedback_records) == self.feedback_records.maxlen:
+            self._evict_feedback(self.feedback_records[0])
         self.feedback_records.append(feedback)
+        self._item_aggregates[feedback.item_id].add(feedback)
+        self._ratings_by_expansion_type[
+            feedback.metadata.get("expansion_type", "unknown")
+        ].append(feedback.rating)
         
         # Generate learning signals based on feedback
         self._process_feedback_for_learning(feedback)
+    
+    def _evict_feedback(self, feedback: FeedbackRecord):
+        """Remove the oldest feedback record from the indexes before it is dropped"""
+        aggregate = self._item_aggregates[feedback.item_id]
+        if aggregate.count > 1:
+            aggregate.remove(feedback)
+        else:
+            del self._item_aggregates[feedback.item_id]
         
-        return True
+        self._pop_oldest(self.performance_metrics, feedback.feedback_type)
+        self._pop_oldest(
+            self._ratings_by_expansion_type,
+            feedback.metadata.get("expansion_type", "unknown"),
+        )
+        
+        # The evicted record is the oldest overall, so it heads any bucket it is in
+        for bucket in (self._high_rated, self._low_rated):
+            if bucket and bucket.records[0] is feedback:
+                bucket.popleft()
+    
+    @staticmethod
+    def _pop_oldest(index: Dict[str, Any], key: str):
+        """Drop the oldest entry under key, removing the key once it is empty"""
+        entries = index[key]
+        entries.popleft()
+        if not entries:
+            del index[key]
     
     def get_feedback_summary(self, item_id: str) -> Dict[str, Any]:
         """Get summary of feedback for an item"""
-        item_feedback = [f for f in self.feedback_records if f.item_id == item_id]
+        aggregate = self._item_aggregates.get(item_id)
         
-        if not item_feedback:
+        if aggregate is None:
             return {
                 "item_id": item_id,
                 "total_feedback": 0,
@@ -126,45 +422,38 @@ class SelfImprovingFeedbackSystem(FeedbackSystem):
                 "recent_feedback": []
             }
         
-        ratings = [f.rating for f in item_feedback]
-        feedback_types = [f.feedback_type for f in item_feedback]
-        
-        # Calculate distribution
-        rating_distribution = {}
-        for rating in ratings:
-            rounded_rating = round(rating, 1)  # Round to 1 decimal place
-            rating_distribution[rounded_rating] = rating_distribution.get(rounded_rating, 0) + 1
-        
         return {
             "item_id": item_id,
-            "total_feedback": len(item_feedback),
-            "average_rating": statistics.mean(ratings),
-            "median_rating": statistics.median(ratings),
-            "rating_distribution": rating_distribution,
-            "feedback_types": list(set(feedback_types)),
-            "recent_feedback": item_feedback[-5:]  # Last 5 feedback entries
+            "total_feedback": aggregate.count,
+            "average_rating": aggregate.total / aggregate.count,
+            "median_rating": aggregate.median(),
+            "rating_distribution": aggregate.rating_distribution(),
+            "feedback_types": list(aggregate.feedback_types),
+            "feedback_type_counts": dict(aggregate.feedback_types),
+            "recent_feedback": list(aggregate.recent)  # Last 5 feedback entries
         }
     
     def get_learning_signals(self) -> List[LearningSignal]:
         """Get accumulated learning signals for improvement"""
-        return self.learning_signals
+        return list(self.learning_signals)
     
     def _process_feedback_for_learning(self, feedback: FeedbackRecord):
         """Process feedback to generate learning signals"""
+        rating = feedback.rating
+        
         # Determine signal type based on rating
-        if feedback.rating >= 0.8:
-            signal_type = "positive"
-        elif feedback.rating <= 0.3:
-            signal_type = "negative"
-        else:
-            signal_type = "neutral"
+        band = (rating >= POSITIVE_RATING_THRESHOLD) + 2 * (rating <= NEGATIVE_RATING_THRESHOLD)
+        signal_type = _SIGNAL_TYPES[band]
+        bucket = self._rating_buckets[band]
+        if bucket is not None:
+            bucket.append(feedback)
         
         # Create learning signal
         signal = LearningSignal(
-            id=str(uuid.uuid4()),
+            id=self._next_id(),
             signal_type=signal_type,
             content=feedback,
-            confidence=abs(feedback.rating - 0.5) * 2,  # Higher confidence for ratings further from 0.5
+            confidence=abs(rating - 0.5) * 2,  # Higher confidence for ratings further from 0.5
             source=feedback.feedback_type,
             timestamp=feedback.timestamp
         )
@@ -172,13 +461,21 @@ class SelfImprovingFeedbackSystem(FeedbackSystem):
         self.learning_signals.append(signal)
         
         # Update performance metrics
-        if feedback.feedback_type not in self.performance_metrics:
-            self.performance_metrics[feedback.feedback_type] = []
-        
-        self.performance_metrics[feedback.feedback_type].append(feedback.rating)
+        metric_ratings = self.performance_metrics.get(feedback.feedback_type)
+        if metric_ratings is None:
+            metric_ratings = self.performance_metrics[feedback.feedback_type] = _RatingWindow()
+        metric_ratings.append(rating)
     
     def analyze_expansion_patterns(self) -> Dict[str, Any]:
-        """Analyze patterns in exploration expansions to improve strategy"""
+        """
+        Analyze patterns in exploration expansions to improve strategy.
+        
+        The analysis is cached until new feedback is recorded; each call
+        returns its own copy, so callers may modify it.
+        """
+        if self._analysis_cache and self._analysis_cache[0] == self._version:
+            return copy.deepcopy(self._analysis_cache[1])
+        
         pattern_analysis = {
             "most_successful_expansion_types": {},
             "common_patterns": [],
@@ -186,58 +483,80 @@ class SelfImprovingFeedbackSystem(FeedbackSystem):
             "strategy_effectiveness": {}
         }
         
-        # Analyze feedback by expansion type
-        feedback_by_type = {}
-        for feedback in self.feedback_records:
-            # Extract expansion type from metadata if available
-            exp_type = feedback.metadata.get("expansion_type", "unknown")
-            if exp_type not in feedback_by_type:
-                feedback_by_type[exp_type] = []
-            feedback_by_type[exp_type].append(feedback.rating)
-        
         # Calculate average ratings for each expansion type
-        for exp_type, ratings in feedback_by_type.items():
+        for exp_type, ratings in self._ratings_by_expansion_type.items():
             if ratings:
-                avg_rating = statistics.mean(ratings)
+                avg_rating = float(ratings.values().mean())
                 pattern_analysis["most_successful_expansion_types"][exp_type] = avg_rating
         
         # Identify common patterns in high/low rated feedback
-        high_rated = [f for f in self.feedback_records if f.rating >= 0.8]
-        low_rated = [f for f in self.feedback_records if f.rating <= 0.3]
+        high_rated = self._high_rated
+        low_rated = self._low_rated
         
         if high_rated:
             pattern_analysis["common_patterns"].append({
                 "type": "high_rated_characteristics",
-                "data": self._extract_common_features(high_rated)
+                "data": self._extract_common_features(
+                    high_rated.records, high_rated.ratings.values(), high_rated.feedback_types
+                )
             })
         
         if low_rated:
             pattern_analysis["improvement_opportunities"].append({
                 "type": "low_rated_issues",
-                "data": self._extract_common_features(low_rated)
+                "data": self._extract_common_features(
+                    low_rated.records, low_rated.ratings.values(), low_rated.feedback_types
+                )
             })
         
-        return pattern_analysis
+        self._analysis_cache = (self._version, pattern_analysis)
+        return copy.deepcopy(pattern_analysis)
     
-    def _extract_common_features(self, feedback_list: List[FeedbackRecord]) -> Dict[str, Any]:
-        """Extract common features from feedback records"""
+    def _extract_common_features(
+        self,
+        feedback_list: List[FeedbackRecord],
+        ratings: Optional[np.ndarray] = None,
+        source_counts: Optional[Counter] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract common features from feedback records.
+        
+        Args:
+            feedback_list: Feedback records to summarize
+            ratings: The records' ratings as a contiguous array, if already available
+            source_counts: Count of the records' feedback types, if already available
+        """
         # This would be a more sophisticated analysis in a real system
         # For now, just return basic statistics
         if not feedback_list:
             return {}
         
-        ratings = [f.rating for f in feedback_list]
-        sources = [f.feedback_type for f in feedback_list]
+        if source_counts is None:
+            source_counts = Counter(f.feedback_type for f in feedback_list)
+        
+        if ratings is None and len(feedback_list) >= _NUMPY_MIN_SAMPLES:
+            ratings = np.fromiter(
+                (f.rating for f in feedback_list), dtype=np.float64, count=len(feedback_list)
+            )
+        
+        if ratings is not None:
+            average_rating = float(ratings.mean())
+            rating_std_dev = float(ratings.std(ddof=1)) if len(ratings) > 1 else 0
+        else:
+            ratings = [f.rating for f in feedback_list]
+            average_rating = statistics.mean(ratings)
+            rating_std_dev = statistics.stdev(ratings) if len(ratings) > 1 else 0
         
         return {
-            "average_rating": statistics.mean(ratings),
-            "rating_std_dev": statistics.stdev(ratings) if len(ratings) > 1 else 0,
-            "common_sources": statistics.mode(sources) if sources else None,
+            "average_rating": average_rating,
+            "rating_std_dev": rating_std_dev,
+            "common_sources": source_counts.most_common(1)[0][0],
             "total_samples": len(feedback_list)
         }
     
     def update_expansion_strategy(self, strategy_id: str, performance_data: Dict[str, Any]) -> bool:
         """Update an expansion strategy based on performance data"""
+        self._version += 1
         if strategy_id not in self.expansion_strategies:
             self.expansion_strategies[strategy_id] = {
                 "strategy_id": strategy_id,
@@ -281,13 +600,21 @@ class SelfImprovingFeedbackSystem(FeedbackSystem):
         self.expansion_strategies[strategy_id]["improvements_applied"] = improvements
     
     def get_improvement_recommendations(self) -> List[Dict[str, Any]]:
-        """Get recommendations for system improvements"""
+        """
+        Get recommendations for system improvements.
+        
+        The recommendations are cached until new feedback is recorded; each
+        call returns its own copy, so callers may modify it.
+        """
+        if self._recommendations_cache and self._recommendations_cache[0] == self._version:
+            return [dict(recommendation) for recommendation in self._recommendations_cache[1]]
+        
         recommendations = []
         
         # Analyze performance metrics
         for feedback_type, ratings in self.performance_metrics.items():
             if ratings:
-                avg_rating = statistics.mean(ratings)
+                avg_rating = float(ratings.values().mean())
                 if avg_rating < 0.7:
                     recommendations.append({
                         "target": f"{feedback_type} feedback",
@@ -306,7 +633,8 @@ class SelfImprovingFeedbackSystem(FeedbackSystem):
                 "priority": "high"
             })
         
-        return recommendations
+        self._recommendations_cache = (self._version, recommendations)
+        return [dict(recommendation) for recommendation in recommendations]
 
 
 class PerformanceMonitor:
@@ -314,22 +642,27 @@ class PerformanceMonitor:
     
     def __init__(self, feedback_system: FeedbackSystem):
         self.feedback_system = feedback_system
-        self.metrics: Dict[str, List[float]] = {}
+        self.metrics: Dict[str, array] = {}
     
     def log_metric(self, metric_name: str, value: float):
         """Log a performance metric"""
-        if metric_name not in self.metrics:
-            self.metrics[metric_name] = []
-        self.metrics[metric_name].append(value)
+        values = self.metrics.get(metric_name)
+        if values is None:
+            values = self.metrics[metric_name] = array("d")
+        values.append(value)
     
     def generate_system_feedback(self):
         """Generate system feedback based on performance metrics"""
         if not self.metrics:
             return
         
+        # One clock read for the whole flush
+        now = datetime.now()
+        timestamp = now.isoformat()
+        
         for metric_name, values in self.metrics.items():
             if values:
-                avg_value = sum(values) / len(values)
+                avg_value = statistics.fmean(values)
                 # Convert performance metrics to feedback ratings (0-1 scale)
                 # This is a simplified conversion - real implementation would be more nuanced
                 rating = min(1.0, max(0.0, avg_value))  # Clamp between 0 and 1
@@ -341,8 +674,9 @@ class PerformanceMonitor:
                     metadata={
                         "average_value": avg_value,
                         "sample_count": len(values),
-                        "timestamp": datetime.now().isoformat()
-                    }
+                        "timestamp": timestamp
+                    },
+                    timestamp=now
                 )
         
         # Clear metrics after generating feedback
@@ -5,20 +5,125 @@ Enhances knowledge graph with automated fact-checking, source verification,
 and cross-reference analysis to ensure information accuracy and reliability.
 """
 import asyncio
+import functools
 import logging
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import Dict, FrozenSet, List, Any, Optional, Set, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
 import hashlib
+import json
 import re
-from collections import defaultdict
+import sqlite3
+from pathlib import Path
+from collections import Counter, OrderedDict, defaultdict
 
+import numpy as np
+
+from config.settings import settings
 from knowledge_graph.engine import InMemoryKnowledgeGraphEngine, ConceptNode, GraphEdge
 from data_pipeline.real_ingestion import ComprehensiveDataPipeline
 
+try:
+    from scipy.sparse import csr_matrix
+    from sklearn.feature_extraction.text import CountVectorizer
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+
 logger = logging.getLogger(__name__)
 
+# Concepts more similar than this are checked for contradicting claims
+CONTRADICTION_SIMILARITY_THRESHOLD = 0.7
+
+# Contradicting claim pairs reported per pair of nodes
+MAX_CONTRADICTIONS_PER_PAIR = 3
+
+# Upper bound on fact verifications searching the data pipeline at once
+MAX_CONCURRENT_VERIFICATIONS = 16
+
+# Fact checks are reused for this long and the least recently used are
+# evicted beyond this many
+FACT_CHECK_TTL_SECONDS = 3600
+FACT_CHECK_CACHE_SIZE = 1000
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+_TOKEN_RE = re.compile(r'\b\w+\b')
+
+# Words ignored when picking search terms from a claim
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
+    'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'
+})
+
+# Sentences matching any of these look like factual claims
+_CLAIM_RE = re.compile(
+    r'\b(?:is|are|was|were|has|have|can|will|should)\b'
+    r'|\baccording to\b'
+    r'|\bresearch shows\b'
+    r'|\bstudies indicate\b'
+    r'|\bdata suggests\b',
+    re.IGNORECASE
+)
+
+# Simple keyword matching for support/contradiction. Keywords match as
+# substrings, and support is checked first ("disproves" contains "proves")
+_SUPPORT_KEYWORDS_RE = re.compile('confirms|verifies|proves|shows|demonstrates')
+_CONTRADICT_KEYWORDS_RE = re.compile('disproves|contradicts|refutes|debunks|disagrees')
+
+# (negation, assertion) pattern pairs matched against lowercased claims
+_CONTRADICT_PATTERNS = [
+    (re.compile(r'\bnot\b'), re.compile(r'\b(is|are|was|were)\b')),
+    (re.compile(r'\bno\b'), re.compile(r'\b(yes|true|correct)\b')),
+    (re.compile(r'\bfalse\b'), re.compile(r'\b(true|correct)\b')),
+    (re.compile(r'\bincorrect\b'), re.compile(r'\b(correct|accurate)\b'))
+]
+
+def _fact_check_id(claim: str) -> str:
+    """Stable 16-hex-digit key for a claim (blake2b, cheaper than md5)"""
+    return hashlib.blake2b(claim.encode(), digest_size=8).hexdigest()
+
+@functools.lru_cache(maxsize=4096)
+def _extract_claims(content: str) -> Tuple[str, ...]:
+    """Claim-like sentences of some content, memoized on the content itself"""
+    # Split content into sentences
+    sentences = _SENTENCE_SPLIT_RE.split(content)
+    
+    # Filter for sentences that look like claims
+    claims = []
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if len(sentence) > 20 and _CLAIM_RE.search(sentence):
+            claims.append(sentence)
+    
+    return tuple(claims[:10])  # Limit to 10 claims
+
+@functools.lru_cache(maxsize=4096)
+def _contradiction_masks(claim: str) -> Tuple[int, int]:
+    """
+    Bitmasks of the contradiction patterns a claim matches
+    
+    Bit k of the first mask is set when the claim matches the negation side of
+    _CONTRADICT_PATTERNS[k], and of the second when it matches the assertion
+    side. Two claims contradict when either one's negations overlap the
+    other's assertions, so each claim is scanned once rather than per pair.
+    """
+    claim_lower = claim.lower()
+    negations = assertions = 0
+    for bit, (neg_pattern, pos_pattern) in enumerate(_CONTRADICT_PATTERNS):
+        if neg_pattern.search(claim_lower):
+            negations |= 1 << bit
+        if pos_pattern.search(claim_lower):
+            assertions |= 1 << bit
+    return negations, assertions
+
+@functools.lru_cache(maxsize=4096)
+def _word_set(text: str) -> FrozenSet[str]:
+    """Lowercased whitespace-separated words of a text"""
+    return frozenset(text.lower().split())
+
 class ReliabilityScore(Enum):
     """Source reliability levels"""
     HIGH = "high"
@@ -53,22 +158,128 @@ class FactCheck:
     verification_metadata: Dict[str, Any] = field(default_factory=dict)
     checked_at: datetime = field(default_factory=datetime.now)
 
+class FactCheckStore:
+    """
+    SQLite-backed store of fact checks, keyed by fact check id
+    
+    Keeps fact-check work across restarts and across the short-lived engines
+    created per API request; the engine holds hot entries in memory and
+    loads the rest from here on demand.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fact_checks (
+                id TEXT PRIMARY KEY,
+                claim TEXT NOT NULL,
+                status TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                supporting_sources TEXT NOT NULL,
+                contradicting_sources TEXT NOT NULL,
+                verification_metadata TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_fact_checks_checked_at ON fact_checks (checked_at)"
+        )
+        self._conn.commit()
+    
+    def get(self, fact_check_id: str) -> Optional[FactCheck]:
+        """Load one fact check, or None if it was never stored"""
+        row = self._conn.execute(
+            "SELECT claim, status, confidence, supporting_sources, contradicting_sources, "
+            "verification_metadata, checked_at FROM fact_checks WHERE id = ?",
+            (fact_check_id,)
+        ).fetchone()
+        return self._from_row(row) if row else None
+    
+    def put(self, fact_check_id: str, fact_check: FactCheck):
+        """Insert or replace a fact check"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO fact_checks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                fact_check_id,
+                fact_check.claim,
+                fact_check.status.value,
+                fact_check.confidence,
+                json.dumps(fact_check.supporting_sources),
+                json.dumps(fact_check.contradicting_sources),
+                json.dumps(fact_check.verification_metadata, default=str),
+                fact_check.checked_at.timestamp()
+            )
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def _from_row(row: Tuple) -> FactCheck:
+        """Rebuild a FactCheck from its stored columns"""
+        claim, status, confidence, supporting, contradicting, metadata, checked_at = row
+        return FactCheck(
+            claim=claim,
+            status=FactStatus(status),
+            confidence=confidence,
+            supporting_sources=json.loads(supporting),
+            contradicting_sources=json.loads(contradicting),
+            verification_metadata=json.loads(metadata),
+            checked_at=datetime.fromtimestamp(checked_at)
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_fact_check_store(path: Path) -> FactCheckStore:
+    """Shared store for a database file, so engines reuse one connection"""
+    return FactCheckStore(path)
+
 class CrossReferenceEngine:
     """
     Advanced cross-referencing and fact verification system
     """
     
+    # Rating for sources without one; shared, so treat it as read-only
+    _UNKNOWN_RELIABILITY = SourceReliability('', ReliabilityScore.UNKNOWN, 0.5, 0, datetime.min)
+    
     def __init__(self, knowledge_graph: InMemoryKnowledgeGraphEngine, 
-                 data_pipeline: ComprehensiveDataPipeline):
+                 data_pipeline: ComprehensiveDataPipeline,
+                 fact_check_store: Optional[FactCheckStore] = None):
+        """
+        Initialize the engine.
+        
+        Args:
+            knowledge_graph: Graph whose nodes are cross-referenced
+            data_pipeline: Pipeline used to search external sources
+            fact_check_store: Persistent fact-check store; defaults to the
+                store at settings.FACT_CHECK_DB_PATH when that is set
+        """
         self.knowledge_graph = knowledge_graph
         self.data_pipeline = data_pipeline
+        if fact_check_store is None and settings.FACT_CHECK_DB_PATH:
+            fact_check_store = get_fact_check_store(Path(settings.FACT_CHECK_DB_PATH))
+        self.fact_check_store = fact_check_store
         self.source_reliability: Dict[str, SourceReliability] = {}
-        self.fact_checks: Dict[str, FactCheck] = {}
+        self.fact_checks: "OrderedDict[str, FactCheck]" = OrderedDict()
+        self._pending_fact_checks: Dict[str, asyncio.Task] = {}
+        # node id -> (concept, content, word set); rebuilt when either string changes
+        self._node_word_cache: Dict[str, Tuple[str, str, FrozenSet[str]]] = {}
         self.cross_references: Dict[str, Set[str]] = defaultdict(set)
         
+        # Shared across calls so concurrent node checks respect one limit
+        self._verification_semaphore = asyncio.Semaphore(MAX_CONCURRENT_VERIFICATIONS)
+        
         # Initialize source reliability ratings
         self._initialize_source_reliability()
     
+    def _reliability_of(self, source: str) -> SourceReliability:
+        """Reliability rating of a source, or the shared unknown rating"""
+        return self.source_reliability.get(source, self._UNKNOWN_RELIABILITY)
+    
     def _initialize_source_reliability(self):
         """Initialize reliability ratings for common sources"""
         high_reliability_sources = [
@@ -80,13 +291,15 @@ class CrossReferenceEngine:
             'github', 'stackoverflow', 'news', 'youtube', 'reddit'
         ]
         
+        now = datetime.now()
+        
         for source in high_reliability_sources:
             self.source_reliability[source] = SourceReliability(
                 source=source,
                 reliability=ReliabilityScore.HIGH,
                 confidence=0.9,
                 verification_count=0,
-                last_updated=datetime.now()
+                last_updated=now
             )
         
         for source in medium_reliability_sources:
@@ -95,11 +308,37 @@ class CrossReferenceEngine:
                 reliability=ReliabilityScore.MEDIUM,
                 confidence=0.7,
                 verification_count=0,
-                last_updated=datetime.now()
+                last_updated=now
             )
     
     async def verify_fact(self, claim: str, context: Optional[Dict] = None) -> FactCheck:
-        """Verify a factual claim across multiple sources"""
+        """
+        Verify a factual claim across multiple sources
+        
+        Recent results are served from the fact-check cache (falling back to
+        the persistent store), and concurrent verifications of the same claim
+        share a single search.
+        """
+        fact_check_id = _fact_check_id(claim)
+        
+        cached = self.fact_checks.get(fact_check_id)
+        if cached is None and self.fact_check_store:
+            cached = self.fact_check_store.get(fact_check_id)
+        if cached is not None and (datetime.now() - cached.checked_at).total_seconds() < FACT_CHECK_TTL_SECONDS:
+            self._remember_fact_check(fact_check_id, cached)
+            return cached
+        
+        task = self._pending_fact_checks.get(fact_check_id)
+        if task is None:
+            task = asyncio.ensure_future(self._check_fact(claim, fact_check_id))
+            self._pending_fact_checks[fact_check_id] = task
+            task.add_done_callback(lambda _: self._pending_fact_checks.pop(fact_check_id, None))
+        
+        # Shielded so one cancelled caller does not cancel the shared check
+        return await asyncio.shield(task)
+    
+    async def _check_fact(self, claim: str, fact_check_id: str) -> FactCheck:
+        """Search for and score evidence on a claim, then cache the result"""
         logger.info(f"🔍 Verifying fact: {claim[:100]}...")
         
         # Extract key terms for search
@@ -125,17 +364,17 @@ class CrossReferenceEngine:
                 )
                 
                 if source_analysis['supports']:
-                    supporting_sources.extend(source_analysis['sources'])
+                    supporting_sources.extend(source_analysis['supports'])
                     total_relevance += source_analysis['relevance']
                     total_confidence += source_analysis['confidence']
                 elif source_analysis['contradicts']:
-                    contradicting_sources.extend(source_analysis['sources'])
+                    contradicting_sources.extend(source_analysis['contradicts'])
         
         # Determine fact status
-        fact_check_id = hashlib.md5(claim.encode()).hexdigest()[:16]
+        average_confidence = total_confidence / max(len(supporting_sources), 1)
         
         if len(supporting_sources) > len(contradicting_sources):
-            if total_confidence / max(len(supporting_sources), 1) > 0.8:
+            if average_confidence > 0.8:
                 status = FactStatus.VERIFIED
             else:
                 status = FactStatus.UNVERIFIED
@@ -147,9 +386,9 @@ class CrossReferenceEngine:
         fact_check = FactCheck(
             claim=claim,
             status=status,
-            confidence=min(total_confidence / max(len(supporting_sources), 1), 1.0),
-            supporting_sources=list(set(supporting_sources)),
-            contradicting_sources=list(set(contradicting_sources)),
+            confidence=min(max(average_confidence, 0.0), 1.0),
+            supporting_sources=list(dict.fromkeys(supporting_sources)),
+            contradicting_sources=list(dict.fromkeys(contradicting_sources)),
             verification_metadata={
                 'search_terms': key_terms,
                 'sources_searched': list(results.keys()),
@@ -158,11 +397,25 @@ class CrossReferenceEngine:
         )
         
         # Store fact check
-        self.fact_checks[fact_check_id] = fact_check
+        self._remember_fact_check(fact_check_id, fact_check)
+        if self.fact_check_store:
+            self.fact_check_store.put(fact_check_id, fact_check)
         
         logger.info(f"✅ Fact verified: {claim[:50]}... -> {status.value}")
         return fact_check
     
+    def _remember_fact_check(self, fact_check_id: str, fact_check: FactCheck):
+        """Put a fact check in the in-memory LRU cache, evicting the oldest"""
+        self.fact_checks[fact_check_id] = fact_check
+        self.fact_checks.move_to_end(fact_check_id)
+        if len(self.fact_checks) > FACT_CHECK_CACHE_SIZE:
+            self.fact_checks.popitem(last=False)
+    
+    async def _verify_fact_bounded(self, claim: str, context: Optional[Dict] = None) -> FactCheck:
+        """Verify a claim, waiting for a free slot in the verification limit"""
+        async with self._verification_semaphore:
+            return await self.verify_fact(claim, context)
+    
     async def cross_reference_node(self, node_id: str) -> Dict[str, Any]:
         """Cross-reference a knowledge graph node with other sources"""
         node = self.knowledge_graph.nodes.get(node_id)
@@ -171,16 +424,14 @@ class CrossReferenceEngine:
         
         logger.info(f"🔗 Cross-referencing node: {node.concept}")
         
-        # Find similar concepts across sources
-        cross_refs = await self._find_cross_references(node)
-        
-        # Verify claims in the node content
+        # Find similar concepts across sources while verifying the claims in
+        # the node content; every search runs concurrently
         claims = self._extract_claims_from_content(node.content)
-        verified_claims = []
-        
-        for claim in claims:
-            fact_check = await self.verify_fact(claim, {"node_id": node_id})
-            verified_claims.append(fact_check)
+        context = {"node_id": node_id}
+        cross_refs, *verified_claims = await asyncio.gather(
+            self._find_cross_references(node),
+            *(self._verify_fact_bounded(claim, context) for claim in claims)
+        )
         
         # Calculate overall reliability score
         reliability_score = self._calculate_node_reliability(
@@ -188,12 +439,13 @@ class CrossReferenceEngine:
         )
         
         # Update node with cross-reference information
+        verified_at = datetime.now().isoformat()
         updated_metadata = {
             **node.metadata,
             'cross_references': cross_refs,
             'fact_checks': [fc.claim for fc in verified_claims],
             'reliability_score': reliability_score,
-            'last_verified': datetime.now().isoformat()
+            'last_verified': verified_at
         }
         
         # Update knowledge graph node
@@ -206,7 +458,7 @@ class CrossReferenceEngine:
             'verified_claims': len([fc for fc in verified_claims if fc.status == FactStatus.VERIFIED]),
             'total_claims': len(verified_claims),
             'reliability_score': reliability_score,
-            'verification_timestamp': datetime.now().isoformat()
+            'verification_timestamp': verified_at
         }
     
     async def detect_contradictions(self) -> List[Dict[str, Any]]:
@@ -216,27 +468,32 @@ class CrossReferenceEngine:
         contradictions = []
         nodes = list(self.knowledge_graph.nodes.values())
         
-        for i, node1 in enumerate(nodes):
-            for node2 in nodes[i+1:]:
-                # Check for similar concepts
-                similarity = self._calculate_concept_similarity(node1.concept, node2.concept)
-                
-                if similarity > 0.7:  # High similarity threshold
-                    # Check for contradictory claims
-                    claims1 = self._extract_claims_from_content(node1.content)
-                    claims2 = self._extract_claims_from_content(node2.content)
-                    
-                    contradictory_pairs = self._find_contradictory_claims(claims1, claims2)
-                    
-                    if contradictory_pairs:
-                        contradictions.append({
-                            'node1_id': node1.id,
-                            'node2_id': node2.id,
-                            'concept1': node1.concept,
-                            'concept2': node2.concept,
-                            'similarity': similarity,
-                            'contradictory_claims': contradictory_pairs
-                        })
+        similar_pairs = self._similar_concept_pairs(nodes, CONTRADICTION_SIMILARITY_THRESHOLD)
+        
+        # Extract each candidate node's claims once, not once per pair
+        node_claims = {
+            index: self._extract_claims_from_content(nodes[index].content)
+            for i, j, _ in similar_pairs
+            for index in (i, j)
+        }
+        
+        for i, j, similarity in similar_pairs:
+            node1, node2 = nodes[i], nodes[j]
+            
+            # Check for contradictory claims
+            contradictory_pairs = self._find_contradictory_claims(
+                node_claims[i], node_claims[j], MAX_CONTRADICTIONS_PER_PAIR
+            )
+            
+            if contradictory_pairs:
+                contradictions.append({
+                    'node1_id': node1.id,
+                    'node2_id': node2.id,
+                    'concept1': node1.concept,
+                    'concept2': node2.concept,
+                    'similarity': similarity,
+                    'contradictory_claims': contradictory_pairs
+                })
         
         logger.info(f"Found {len(contradictions)} potential contradictions")
         return contradictions
@@ -252,16 +509,27 @@ class CrossReferenceEngine:
         # Find related concepts through cross-referencing
         related_concepts = await self._discover_related_concepts(node)
         
+        # Index nodes by concept word so each related concept is only compared
+        # with nodes sharing one of its words
+        nodes = list(self.knowledge_graph.nodes.values())
+        concept_index = self._build_concept_index(nodes) if related_concepts else {}
+        
         # Create or strengthen edges
         new_edges = []
+        now = datetime.now()
         for related in related_concepts:
-            # Find existing node or create new one
+            # Find the first existing node (in graph order) matching the concept
             target_node_id = None
-            for existing_node in self.knowledge_graph.nodes.values():
+            candidates = sorted({
+                position
+                for word in _word_set(related['concept'])
+                for position in concept_index.get(word, ())
+            })
+            for position in candidates:
                 if self._calculate_concept_similarity(
-                    existing_node.concept, related['concept']
+                    nodes[position].concept, related['concept']
                 ) > 0.8:
-                    target_node_id = existing_node.id
+                    target_node_id = nodes[position].id
                     break
             
             if target_node_id:
@@ -274,7 +542,7 @@ class CrossReferenceEngine:
                     target_node_id=target_node_id,
                     relationship_type="cross_reference",
                     weight=related['confidence'],
-                    created_at=datetime.now(),
+                    created_at=now,
                     metadata={
                         'cross_reference_source': related['source'],
                         'verification_method': 'automated_cross_ref'
@@ -285,6 +553,14 @@ class CrossReferenceEngine:
         
         return new_edges
     
+    def _build_concept_index(self, nodes: List[ConceptNode]) -> Dict[str, List[int]]:
+        """Map each lowercased concept word to the positions of nodes using it"""
+        concept_index: Dict[str, List[int]] = defaultdict(list)
+        for position, node in enumerate(nodes):
+            for word in _word_set(node.concept):
+                concept_index[word].append(position)
+        return concept_index
+    
     async def _find_cross_references(self, node: ConceptNode) -> List[Dict[str, Any]]:
         """Find cross-references for a node across multiple sources"""
         cross_refs = []
@@ -297,6 +573,8 @@ class CrossReferenceEngine:
         
         for source, result in results.items():
             if result.success and result.data:
+                reliability = self._reliability_of(source).reliability.value
+                
                 # Analyze content for relevance
                 for item in result.data[:3]:  # Top 3 items per source
                     relevance = self._calculate_content_relevance(node, item)
@@ -308,10 +586,7 @@ class CrossReferenceEngine:
                             'url': item.get('url', ''),
                             'content_snippet': item.get('content', item.get('description', ''))[:200],
                             'relevance': relevance,
-                            'source_reliability': self.source_reliability.get(
-                                source, 
-                                SourceReliability(source, ReliabilityScore.UNKNOWN, 0.5, 0, datetime.now())
-                            ).reliability.value
+                            'source_reliability': reliability
                         })
         
         return sorted(cross_refs, key=lambda x: x['relevance'], reverse=True)
@@ -324,38 +599,30 @@ class CrossReferenceEngine:
         total_relevance = 0
         total_confidence = 0
         
+        claim_lower = claim.lower()
+        claim_head_words = claim_lower.split()[:3]
+        source_confidence = self._reliability_of(source).confidence
+        
         for item in data:
             content = (
                 item.get('title', '') + ' ' + 
                 item.get('content', item.get('description', item.get('abstract', '')))
             ).lower()
             
-            # Simple keyword matching for support/contradiction
-            support_keywords = ['confirms', 'verifies', 'proves', 'shows', 'demonstrates']
-            contradict_keywords = ['disproves', 'contradicts', 'refutes', 'debunks', 'disagrees']
-            
-            claim_lower = claim.lower()
-            
             # Check for supporting evidence
-            if any(keyword in content for keyword in support_keywords):
+            if _SUPPORT_KEYWORDS_RE.search(content):
                 supports.append(item['url'] if 'url' in item else source)
                 total_relevance += 0.8
-                total_confidence += self.source_reliability.get(
-                    source, 
-                    SourceReliability(source, ReliabilityScore.UNKNOWN, 0.5, 0, datetime.now())
-                ).confidence
+                total_confidence += source_confidence
             
             # Check for contradicting evidence
-            elif any(keyword in content for keyword in contradict_keywords):
+            elif _CONTRADICT_KEYWORDS_RE.search(content):
                 contradicts.append(item['url'] if 'url' in item else source)
                 total_relevance += 0.7
-                total_confidence += self.source_reliability.get(
-                    source, 
-                    SourceReliability(source, ReliabilityScore.UNKNOWN, 0.5, 0, datetime.now())
-                ).confidence
+                total_confidence += source_confidence
             
             # Check for mention without clear stance
-            elif claim_lower in content or any(word in content for word in claim_lower.split()[:3]):
+            elif claim_lower in content or any(word in content for word in claim_head_words):
                 total_relevance += 0.5
         
         return {
@@ -368,14 +635,12 @@ class CrossReferenceEngine:
     def _extract_key_terms(self, claim: str) -> List[str]:
         """Extract key terms from a claim for searching"""
         # Simple keyword extraction - remove stop words and get important terms
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'}
-        
-        words = re.findall(r'\b\w+\b', claim.lower())
-        key_terms = [word for word in words if word not in stop_words and len(word) > 2]
+        words = _TOKEN_RE.findall(claim.lower())
         
         # Return top 5 most frequent terms
-        from collections import Counter
-        word_counts = Counter(key_terms)
+        word_counts = Counter(
+            word for word in words if len(word) > 2 and word not in _STOP_WORDS
+        )
         return [word for word, _ in word_counts.most_common(5)]
     
     def _extract_claims_from_content(self, content: str) -> List[str]:
@@ -383,49 +648,97 @@ class CrossReferenceEngine:
         if not content:
             return []
         
-        # Split content into sentences
-        sentences = re.split(r'[.!?]+', content)
-        
-        # Filter for sentences that look like claims
-        claims = []
-        claim_patterns = [
-            r'\b(is|are|was|were|has|have|can|will|should)\b',
-            r'\baccording to\b',
-            r'\bresearch shows\b',
-            r'\bstudies indicate\b',
-            r'\bdata suggests\b'
-        ]
+        return list(_extract_claims(content))
+    
+    def _similar_concept_pairs(self, nodes: List[ConceptNode],
+                               threshold: float) -> List[Tuple[int, int, float]]:
+        """
+        Find node index pairs (i < j) whose concept similarity exceeds threshold
+        
+        With scikit-learn the search is an exact prefix-filtered similarity
+        join: a pair can only exceed the threshold if the two concepts share
+        one of their rarest few words, so candidates come from a sparse
+        product over just those "prefix" words. Candidates are then pruned
+        by set size and scored exactly.
+        """
+        if not HAS_SKLEARN:
+            return [
+                (i, j, similarity)
+                for i in range(len(nodes))
+                for j in range(i + 1, len(nodes))
+                for similarity in (self._calculate_concept_similarity(nodes[i].concept, nodes[j].concept),)
+                if similarity > threshold
+            ]
+        
+        concepts = [node.concept.lower() for node in nodes]
+        if not any(concept.split() for concept in concepts):
+            return []
+        
+        terms = CountVectorizer(binary=True, analyzer=str.split).fit_transform(concepts).tocsr()
+        terms.sort_indices()
+        sizes = np.diff(terms.indptr)
+        
+        # Jaccard > t needs an overlap above t * |x|, so two concepts that
+        # qualify must share one of the first |x| - ceil(t * |x|) + 1 words of
+        # each, with words ordered rarest first (the epsilon keeps float error
+        # from shortening a prefix)
+        word_rank = np.empty(terms.shape[1], dtype=np.int64)
+        word_rank[np.argsort(np.bincount(terms.indices, minlength=terms.shape[1]), kind='stable')] = np.arange(terms.shape[1])
+        entry_rows = np.repeat(np.arange(len(concepts)), sizes)
+        entry_order = np.lexsort((word_rank[terms.indices], entry_rows))
+        min_overlap = np.maximum(np.ceil(threshold * sizes - 1e-9), 1).astype(np.int64)
+        prefix_sizes = np.minimum(sizes - min_overlap + 1, sizes)
+        in_prefix = np.arange(terms.nnz) - terms.indptr[entry_rows] < prefix_sizes[entry_rows]
+        prefix_entries = entry_order[in_prefix]
+        prefixes = csr_matrix(
+            (np.ones(len(prefix_entries), dtype=np.int64), (entry_rows[prefix_entries], terms.indices[prefix_entries])),
+            shape=terms.shape
+        )
+        
+        candidates = (prefixes @ prefixes.T).tocoo()
+        rows, cols = candidates.row, candidates.col
+        
+        # Jaccard is at most min(|x|, |y|) / max(|x|, |y|)
+        keep = (rows < cols) & (np.minimum(sizes[rows], sizes[cols]) > threshold * np.maximum(sizes[rows], sizes[cols]))
+        rows, cols = rows[keep], cols[keep]
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 20 and any(re.search(pattern, sentence, re.IGNORECASE) for pattern in claim_patterns):
-                claims.append(sentence)
+        intersection = np.asarray(terms[rows].multiply(terms[cols]).sum(axis=1)).ravel()
+        similarity = intersection / (sizes[rows] + sizes[cols] - intersection)
         
-        return claims[:10]  # Limit to 10 claims
+        keep = similarity > threshold
+        rows, cols, similarity = rows[keep], cols[keep], similarity[keep]
+        order = np.lexsort((cols, rows))
+        
+        return list(zip(rows[order].tolist(), cols[order].tolist(), similarity[order].tolist()))
     
     def _calculate_concept_similarity(self, concept1: str, concept2: str) -> float:
         """Calculate similarity between two concepts"""
-        words1 = set(concept1.lower().split())
-        words2 = set(concept2.lower().split())
+        words1 = _word_set(concept1)
+        words2 = _word_set(concept2)
         
         if not words1 or not words2:
             return 0.0
         
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union)
+        intersection = len(words1 & words2)
+        return intersection / (len(words1) + len(words2) - intersection)
+    
+    def _node_words(self, node: ConceptNode) -> FrozenSet[str]:
+        """Lowercased words of a node's concept and content, cached per node"""
+        cached = self._node_word_cache.get(node.id)
+        if cached is None or cached[0] is not node.concept or cached[1] is not node.content:
+            words = frozenset((node.concept + ' ' + node.content).lower().split())
+            cached = self._node_word_cache[node.id] = (node.concept, node.content, words)
+        return cached[2]
     
     def _calculate_content_relevance(self, node: ConceptNode, item: Dict[str, Any]) -> float:
         """Calculate relevance of external content to the node"""
-        node_text = (node.concept + ' ' + node.content).lower()
         item_text = (
             item.get('title', '') + ' ' + 
-            item.get('content', item.get('description', item.get('abstract', ''))
+            item.get('content', item.get('description', item.get('abstract', '')))
         ).lower()
         
         # Simple relevance based on word overlap
-        node_words = set(node_text.split())
+        node_words = self._node_words(node)
         item_words = set(item_text.split())
         
         if not node_words or not item_words:
@@ -466,28 +779,23 @@ class CrossReferenceEngine:
         
         return sum(factors) / len(factors) if factors else 0.5
     
-    def _find_contradictory_claims(self, claims1: List[str], claims2: List[str]) -> List[Tuple[str, str]]:
-        """Find contradictory claim pairs"""
+    def _find_contradictory_claims(self, claims1: List[str], claims2: List[str],
+                                   limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """Find contradictory claim pairs, stopping after limit pairs if given"""
         contradictions = []
-        contradict_patterns = [
-            (r'\bnot\b', r'\b(is|are|was|were)\b'),
-            (r'\bno\b', r'\b(yes|true|correct)\b'),
-            (r'\bfalse\b', r'\b(true|correct)\b'),
-            (r'\bincorrect\b', r'\b(correct|accurate)\b')
-        ]
         
-        for claim1 in claims1:
-            for claim2 in claims2:
-                claim1_lower = claim1.lower()
-                claim2_lower = claim2.lower()
-                
-                for neg_pattern, pos_pattern in contradict_patterns:
-                    if (re.search(neg_pattern, claim1_lower) and 
-                        re.search(pos_pattern, claim2_lower)) or \
-                       (re.search(neg_pattern, claim2_lower) and 
-                        re.search(pos_pattern, claim1_lower)):
-                        contradictions.append((claim1, claim2))
-                        break
+        # Claims matching no pattern on either side cannot contradict anything
+        masked1 = [(claim, _contradiction_masks(claim)) for claim in claims1]
+        masked1 = [(claim, masks) for claim, masks in masked1 if masks != (0, 0)]
+        masked2 = [(claim, _contradiction_masks(claim)) for claim in claims2]
+        masked2 = [(claim, masks) for claim, masks in masked2 if masks != (0, 0)]
+        
+        for claim1, (neg1, pos1) in masked1:
+            for claim2, (neg2, pos2) in masked2:
+                if (neg1 & pos2) | (neg2 & pos1):
+                    contradictions.append((claim1, claim2))
+                    if len(contradictions) == limit:
+                        return contradictions
         
         return contradictions
     
@@ -5,14 +5,17 @@ This component implements a dynamic, self-organizing knowledge representation
 with autonomous schema induction, real-time node/edge creation, and similarity-based retrieval.
 """
 import logging
+import sys
 from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from core.concept_orchestrator import ConceptNode
 try:
-    from embeddings.service import EmbeddingService
+    from embeddings.service import EmbeddingService, HAS_SIMSIMD
 except ImportError:
     EmbeddingService = None
+    HAS_SIMSIMD = False
 
 import uuid
 from datetime import datetime
@@ -20,12 +23,36 @@ from datetime import datetime
 try:
     import numpy as np
     NDArray = np.ndarray
+    # Lookup table of alphanumeric ASCII code points for the fallback embedding
+    _ASCII_ALNUM = np.array([chr(code).isalnum() for code in range(128)])
 except ImportError:
     np = None
     NDArray = Any
 
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    hnswlib = None
+    HAS_HNSWLIB = False
+
 logger = logging.getLogger(__name__)
 
+# Rows preallocated for node embeddings; the matrix doubles when full
+INITIAL_EMBEDDING_CAPACITY = 1024
+
+# Nodes whose neighbor lists are cached, and how many recent first-time
+# lookups are remembered so a node is only cached on its second lookup
+NEIGHBOR_CACHE_SIZE = 10000
+
+# Below this many embeddings the CPU scan beats a GPU round trip
+GPU_SIMILARITY_MIN_ROWS = 50000
+
+# HNSW graph parameters for the optional approximate-nearest-neighbour index
+ANN_M = 16
+ANN_EF_CONSTRUCTION = 200
+ANN_EF_SEARCH = 64
+
 
 @dataclass
 class GraphEdge:
@@ -89,10 +116,65 @@ class KnowledgeGraphEngine(ABC):
 class InMemoryKnowledgeGraphEngine(KnowledgeGraphEngine):
     """In-memory implementation of the knowledge graph engine for development"""
 
-    def __init__(self, embedding_service: Optional[EmbeddingService] = None):
+    def __init__(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        use_simsimd: bool = True,
+        quantize_embeddings: bool = False,
+        use_ann: bool = False,
+        similarity_device: str = "cpu",
+    ):
         self.nodes: Dict[str, ConceptNode] = {}
         self.edges: Dict[str, GraphEdge] = {}
-        self.embeddings: Dict[str, NDArray] = {}  # Sentence Transformer embeddings
+        # (other endpoint, edge) pairs for the edges touching each node, in
+        # edge insertion order, so neighbor lookups and BFS never scan the
+        # whole edge table
+        self._adjacency: Dict[str, List[Tuple[str, GraphEdge]]] = {}
+        # Neighbor ids bucketed by (node id, relationship type), so filtered
+        # lookups skip edges of other types outright
+        self._typed_adjacency: Dict[Tuple[str, str], List[str]] = {}
+        # Membership sets mirroring each node's connections list, with the
+        # list and length they were built from to detect outside edits
+        self._connection_sets: Dict[str, Tuple[List[str], int, Set[str]]] = {}
+        # LRU-2 cache of neighbor lists per node and relationship filter:
+        # one-off lookups only enter the history, so they cannot evict
+        # nodes a traversal keeps coming back to
+        self._neighbor_cache: "OrderedDict[str, Dict[Optional[str], List[ConceptNode]]]" = OrderedDict()
+        self._neighbor_history: "OrderedDict[str, None]" = OrderedDict()
+
+        # Sentence Transformer embeddings, L2-normalized, one matrix row per
+        # node so similarity search is a single matrix-vector product
+        self._embedding_matrix: Optional[NDArray] = None
+        self._embedding_rows: Dict[str, int] = {}
+        self._embedding_ids: List[str] = []
+        # Score with SimSIMD kernels when the package is installed
+        self.use_simsimd = use_simsimd
+        # int8 copy of the matrix, scanned by SimSIMD at a quarter of the
+        # memory traffic; without SimSIMD the float32 matrix is used
+        self.quantize_embeddings = quantize_embeddings and use_simsimd and HAS_SIMSIMD
+        if quantize_embeddings and not self.quantize_embeddings:
+            logger.warning("int8 embedding search needs simsimd; using float32.")
+        self._embedding_int8: Optional[NDArray] = None
+        # Score buffer reused across queries, grown with the matrix
+        self._similarity_buffer: Optional[NDArray] = None
+        # Approximate HNSW index over the same rows, for graphs too large
+        # to scan exhaustively; results are approximate (high recall)
+        self.use_ann = use_ann and HAS_HNSWLIB
+        if use_ann and not self.use_ann:
+            logger.warning("ANN search needs hnswlib; using exhaustive search.")
+        self._ann_index = None
+        # Optional CUDA mirror of the matrix for large graphs; rows added
+        # since the last query are copied over in one batch before scoring
+        self.similarity_device = (
+            EmbeddingService._resolve_device(similarity_device) if EmbeddingService else "cpu"
+        )
+        self._device_matrix = None
+        self._device_rows = 0
+
+        # Lowercased concept/content per node, keyed to the exact strings
+        # they were built from, plus whitespace tokens -> node ids
+        self._search_text: Dict[str, Tuple[str, str, str, str]] = {}
+        self._token_index: Dict[str, Set[str]] = {}
 
         # Initialize embedding service
         try:
@@ -114,20 +196,23 @@ class InMemoryKnowledgeGraphEngine(KnowledgeGraphEngine):
             return False
 
         self.nodes[node.id] = node
+        self._lowered_text(node)
 
         # Generate embedding for semantic search
         try:
             if self.embedding_service:
                 # Use Sentence Transformer embeddings
                 text_to_embed = f"{node.concept} {node.content}"
-                self.embeddings[node.id] = self.embedding_service.encode(text_to_embed)
+                self._store_embedding(
+                    node.id, self.embedding_service.encode(text_to_embed)
+                )
                 logger.debug(
                     f"Generated embedding for node {node.id} ({node.concept})"
                 )
             else:
                 # Fallback to simple embedding
-                self.embeddings[node.id] = self._generate_fallback_embedding(
-                    node.content
+                self._store_embedding(
+                    node.id, self._generate_fallback_embedding(node.content)
                 )
         except Exception as e:
             logger.error(f"Error generating embedding for node {node.id}: {e}")
@@ -135,7 +220,165 @@ class InMemoryKnowledgeGraphEngine(KnowledgeGraphEngine):
             pass
 
         return True
+
+    def add_nodes(self, nodes: List[ConceptNode]) -> List[bool]:
+        """
+        Add several nodes, encoding their embeddings in one batch.
+
+        Args:
+            nodes: Nodes to add
+
+        Returns:
+            Whether each node was added (False for ids already present)
+        """
+        added = []
+        new_nodes = []
+        for node in nodes:
+            if node.id in self.nodes:
+                added.append(False)
+                continue
+            self.nodes[node.id] = node
+            self._lowered_text(node)
+            new_nodes.append(node)
+            added.append(True)
+
+        if not new_nodes or not self.embedding_service:
+            # Fallback embeddings are cheap to build one at a time
+            for node in new_nodes:
+                try:
+                    self._store_embedding(
+                        node.id, self._generate_fallback_embedding(node.content)
+                    )
+                except Exception as e:
+                    logger.error(f"Error generating embedding for node {node.id}: {e}")
+            return added
+
+        try:
+            # One encoder call amortizes model overhead across the batch
+            batch = self.embedding_service.encode_batch(
+                [f"{node.concept} {node.content}" for node in new_nodes]
+            )
+            for node, embedding in zip(new_nodes, batch):
+                self._store_embedding(node.id, embedding)
+            logger.debug(f"Generated embeddings for {len(new_nodes)} nodes in one batch")
+        except Exception as e:
+            logger.error(f"Error generating embeddings for {len(new_nodes)} nodes: {e}")
+
+        return added
+
+    @property
+    def embeddings(self) -> Dict[str, NDArray]:
+        """Normalized embedding of each node (views into the embedding matrix)"""
+        return {
+            node_id: self._embedding_matrix[row]
+            for node_id, row in self._embedding_rows.items()
+        }
+
+    def _store_embedding(self, node_id: str, embedding: NDArray) -> None:
+        """L2-normalize an embedding into the next matrix row, growing it if full"""
+        if np is None:
+            return
+
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        row = len(self._embedding_ids)
+
+        if self._embedding_matrix is None:
+            self._embedding_matrix = np.empty(
+                (INITIAL_EMBEDDING_CAPACITY, vector.shape[0]), dtype=np.float32
+            )
+            if self.quantize_embeddings:
+                self._embedding_int8 = np.empty(self._embedding_matrix.shape, dtype=np.int8)
+        elif row == self._embedding_matrix.shape[0]:
+            self._embedding_matrix = self._grow(self._embedding_matrix, row)
+            if self._embedding_int8 is not None:
+                self._embedding_int8 = self._grow(self._embedding_int8, row)
+
+        # Normalize in place in the matrix row rather than via a temporary
+        stored = self._embedding_matrix[row]
+        stored[:] = vector
+        norm = np.sqrt(np.vdot(stored, stored))
+        if norm:
+            stored /= norm
+        if self._embedding_int8 is not None:
+            self._embedding_int8[row] = EmbeddingService.quantize_int8(
+                self._embedding_matrix[row]
+            )
+        if self.use_ann:
+            self._add_to_ann_index(row)
+        self._embedding_rows[node_id] = row
+        self._embedding_ids.append(node_id)
     
+    def _add_to_ann_index(self, row: int) -> None:
+        """Insert a matrix row into the HNSW index, labelled by its row number"""
+        if self._ann_index is None:
+            self._ann_index = hnswlib.Index(space="cosine", dim=self._embedding_matrix.shape[1])
+            self._ann_index.init_index(
+                max_elements=self._embedding_matrix.shape[0],
+                ef_construction=ANN_EF_CONSTRUCTION,
+                M=ANN_M,
+            )
+        elif row == self._ann_index.get_max_elements():
+            self._ann_index.resize_index(self._embedding_matrix.shape[0])
+
+        self._ann_index.add_items(self._embedding_matrix[row:row + 1], [row])
+
+    def _query_ann_index(self, query_embedding: NDArray, limit: int) -> List[Tuple[int, float]]:
+        """Top matrix rows for a query from the HNSW index, best first"""
+        k = min(limit, self._ann_index.get_current_count())
+        if k <= 0:
+            return []
+
+        self._ann_index.set_ef(max(ANN_EF_SEARCH, k))
+        labels, distances = self._ann_index.knn_query(
+            np.asarray(query_embedding, dtype=np.float32).reshape(1, -1), k=k
+        )
+        # Cosine distance is 1 - similarity; keep the exhaustive path's
+        # non-negative threshold
+        return [
+            (int(label), 1.0 - float(distance))
+            for label, distance in zip(labels[0], distances[0])
+            if distance <= 1.0
+        ]
+
+    def _query_device_matrix(self, query_embedding: NDArray, limit: int) -> List[Tuple[int, float]]:
+        """Top matrix rows for a query, scored on the GPU, best first"""
+        import torch
+
+        n = len(self._embedding_ids)
+        if self._device_matrix is None or self._device_matrix.shape[0] != self._embedding_matrix.shape[0]:
+            # Allocate at the matrix capacity so later inserts only copy rows
+            self._device_matrix = torch.empty(
+                self._embedding_matrix.shape, dtype=torch.float32, device=self.similarity_device
+            )
+            self._device_rows = 0
+        if self._device_rows < n:
+            self._device_matrix[self._device_rows:n] = torch.from_numpy(
+                self._embedding_matrix[self._device_rows:n]
+            ).to(self.similarity_device, non_blocking=True)
+            self._device_rows = n
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        query = query / (np.sqrt(np.vdot(query, query)) or 1.0)
+        with torch.inference_mode():
+            scores = torch.mv(
+                self._device_matrix[:n], torch.from_numpy(query).to(self.similarity_device)
+            )
+            values, indices = torch.topk(scores, min(limit, n))
+
+        # Keep the exhaustive path's non-negative threshold
+        return [
+            (int(index), float(value))
+            for value, index in zip(values.tolist(), indices.tolist())
+            if value >= 0.0
+        ]
+
+    @staticmethod
+    def _grow(matrix: NDArray, rows: int) -> NDArray:
+        """Copy the first rows of a full matrix into one of twice the capacity"""
+        grown = np.empty((2 * rows, matrix.shape[1]), dtype=matrix.dtype)
+        grown[:rows] = matrix
+        return grown
+
     def add_edge(self, edge: GraphEdge) -> bool:
         """Add an edge to the knowledge graph"""
         if edge.id in self.edges:
@@ -145,14 +388,46 @@ class InMemoryKnowledgeGraphEngine(KnowledgeGraphEngine):
         if edge.source_node_id not in self.nodes or edge.target_node_id not in self.nodes:
             return False
         
+        # Relationship types come from a small vocabulary; interning makes
+        # every edge share one string object per type
+        if isinstance(edge.relationship_type, str):
+            edge.relationship_type = sys.intern(edge.relationship_type)
+
         self.edges[edge.id] = edge
+        self._adjacency.setdefault(edge.source_node_id, []).append(
+            (edge.target_node_id, edge)
+        )
+        self._typed_adjacency.setdefault(
+            (edge.source_node_id, edge.relationship_type), []
+        ).append(edge.target_node_id)
+        if edge.target_node_id != edge.source_node_id:
+            self._adjacency.setdefault(edge.target_node_id, []).append(
+                (edge.source_node_id, edge)
+            )
+            self._typed_adjacency.setdefault(
+                (edge.target_node_id, edge.relationship_type), []
+            ).append(edge.source_node_id)
+        self._neighbor_cache.pop(edge.source_node_id, None)
+        self._neighbor_cache.pop(edge.target_node_id, None)
         # Also add to node's connections
-        if edge.target_node_id not in self.nodes[edge.source_node_id].connections:
-            self.nodes[edge.source_node_id].connections.append(edge.target_node_id)
-        if edge.source_node_id not in self.nodes[edge.target_node_id].connections:
-            self.nodes[edge.target_node_id].connections.append(edge.source_node_id)
-        
+        self._connect(self.nodes[edge.source_node_id], edge.target_node_id)
+        self._connect(self.nodes[edge.target_node_id], edge.source_node_id)
+
         return True
+
+    def _connect(self, node: ConceptNode, other_node_id: str) -> None:
+        """Append to a node's connections unless already present, via a set"""
+        connections = node.connections
+        entry = self._connection_sets.get(node.id)
+        if entry is None or entry[0] is not connections or entry[1] != len(connections):
+            # First use, or the list was replaced or edited outside add_edge
+            entry = (connections, len(connections), set(connections))
+
+        if other_node_id not in entry[2]:
+            connections.append(other_node_id)
+            entry[2].add(other_node_id)
+            entry = (connections, len(connections), entry[2])
+        self._connection_sets[node.id] = entry
     
     def get_node(self, node_id: str) -> Optional[ConceptNode]:
         """Get a node by ID"""
@@ -162,19 +437,44 @@ class InMemoryKnowledgeGraphEngine(KnowledgeGraphEngine):
         """Get neighboring nodes of a given node"""
         if node_id not in self.nodes:
             return []
-        
+
+        cached = self._neighbor_cache.get(node_id)
+        if cached is not None and relationship_type in cached:
+            self._neighbor_cache.move_to_end(node_id)
+            return list(cached[relationship_type])
+
+        if relationship_type is None:
+            neighbor_ids = [neighbor_id for neighbor_id, _ in self._adjacency.get(node_id, ())]
+        else:
+            neighbor_ids = self._typed_adjacency.get((node_id, relationship_type), ())
+
         neighbors = []
-        for edge_id, edge in self.edges.items():
-            # Check if this edge involves our node
-            if edge.source_node_id == node_id or edge.target_node_id == node_id:
-                if relationship_type is None or edge.relationship_type == relationship_type:
-                    # Get the other node in the relationship
-                    neighbor_id = edge.target_node_id if edge.source_node_id == node_id else edge.source_node_id
-                    neighbor = self.nodes.get(neighbor_id)
-                    if neighbor:
-                        neighbors.append(neighbor)
-        
+        for neighbor_id in neighbor_ids:
+            neighbor = self.nodes.get(neighbor_id)
+            if neighbor:
+                neighbors.append(neighbor)
+
+        self._cache_neighbors(node_id, relationship_type, neighbors)
         return neighbors
+
+    def _cache_neighbors(
+        self, node_id: str, relationship_type: Optional[str], neighbors: List[ConceptNode]
+    ) -> None:
+        """Cache a neighbor list once its node has been looked up twice"""
+        cached = self._neighbor_cache.get(node_id)
+        if cached is None:
+            if node_id not in self._neighbor_history:
+                self._neighbor_history[node_id] = None
+                if len(self._neighbor_history) > NEIGHBOR_CACHE_SIZE:
+                    self._neighbor_history.popitem(last=False)
+                return
+            del self._neighbor_history[node_id]
+            cached = self._neighbor_cache[node_id] = {}
+            if len(self._neighbor_cache) > NEIGHBOR_CACHE_SIZE:
+                self._neighbor_cache.popitem(last=False)
+
+        cached[relationship_type] = list(neighbors)
+        self._neighbor_cache.move_to_end(node_id)
     
     def find_similar_nodes(self, concept: str, limit: int = 10) -> List[GraphQueryResult]:
         """Find nodes similar to the given concept using semantic embeddings"""
@@ -184,39 +484,61 @@ class InMemoryKnowledgeGraphEngine(KnowledgeGraphEngine):
         try:
             similarities = []
 
-            if self.embedding_service and self.embeddings:
+            if self.embedding_service and self._embedding_ids:
                 # Use Sentence Transformer embeddings for semantic search
                 query_embedding = self.embedding_service.encode(concept)
 
-                # Find similar embeddings
-                embedding_list = list(self.embeddings.values())
-                node_ids = list(self.embeddings.keys())
-
-                if embedding_list:
+                if self._ann_index is not None:
+                    results = self._query_ann_index(query_embedding, limit)
+                elif (
+                    self.similarity_device == "cuda"
+                    and len(self._embedding_ids) >= GPU_SIMILARITY_MIN_ROWS
+                ):
+                    results = self._query_device_matrix(query_embedding, limit)
+                else:
+                    # Rows are pre-normalized, so cosine similarity over the
+                    # live slice of the matrix is one matrix-vector product
+                    matrix = (
+                        self._embedding_int8
+                        if self._embedding_int8 is not None
+                        else self._embedding_matrix
+                    )
+                    if (
+                        self._similarity_buffer is None
+                        or self._similarity_buffer.shape[0] != matrix.shape[0]
+                    ):
+                        self._similarity_buffer = np.empty(matrix.shape[0], dtype=np.float32)
+                    n = len(self._embedding_ids)
                     results = self.embedding_service.find_similar(
                         query_embedding,
-                        np.array(embedding_list),
+                        matrix[:n],
                         top_k=limit,
                         threshold=0.0,
+                        normalized=True,
+                        use_simsimd=self.use_simsimd,
+                        out=self._similarity_buffer[:n] if matrix.dtype == np.float32 else None,
                     )
 
-                    similarities = [
-                        (node_ids[idx], score) for idx, score in results
-                    ]
-                    logger.debug(
-                        f"Found {len(similarities)} similar nodes using embeddings"
-                    )
+                # find_similar already returns the top results best first
+                similarities = [
+                    (self._embedding_ids[idx], score) for idx, score in results
+                ]
+                logger.debug(
+                    f"Found {len(similarities)} similar nodes using embeddings"
+                )
             else:
-                # Fallback to simple text matching
+                # Fallback to simple text matching. There are only two scores,
+                # so bucketing in node order replaces a full stable sort
                 query_lower = concept.lower()
+                concept_hits = []
+                content_hits = []
                 for node_id, node in self.nodes.items():
-                    if query_lower in node.concept.lower():
-                        similarities.append((node_id, 0.8))
-                    elif query_lower in node.content.lower():
-                        similarities.append((node_id, 0.5))
-
-            # Sort by similarity descending
-            similarities.sort(key=lambda x: x[1], reverse=True)
+                    concept_lower, content_lower = self._lowered_text(node)
+                    if query_lower in concept_lower:
+                        concept_hits.append((node_id, 0.8))
+                    elif query_lower in content_lower:
+                        content_hits.append((node_id, 0.5))
+                similarities = concept_hits + content_hits
 
             # Return top results
             results = []
@@ -234,58 +556,91 @@ class InMemoryKnowledgeGraphEngine(KnowledgeGraphEngine):
             logger.error(f"Error finding similar nodes: {e}")
             return []
     
+    def _lowered_text(self, node: ConceptNode) -> Tuple[str, str]:
+        """Lowercased concept and content of a node, re-indexed if they changed"""
+        entry = self._search_text.get(node.id)
+        if entry is not None and entry[0] is node.concept and entry[1] is node.content:
+            return entry[2], entry[3]
+
+        if entry is not None:
+            for token in set(entry[2].split()) | set(entry[3].split()):
+                node_ids = self._token_index[token]
+                node_ids.discard(node.id)
+                if not node_ids:
+                    del self._token_index[token]
+
+        concept_lower = node.concept.lower()
+        content_lower = node.content.lower()
+        self._search_text[node.id] = (node.concept, node.content, concept_lower, content_lower)
+        for token in set(concept_lower.split()) | set(content_lower.split()):
+            self._token_index.setdefault(token, set()).add(node.id)
+        return concept_lower, content_lower
+
     def search_nodes(self, query: str, limit: int = 10) -> List[GraphQueryResult]:
         """Search nodes by content"""
-        results = []
         query_lower = query.lower()
-        
-        for node in self.nodes.values():
-            # Simple text matching - in a real implementation, this would use embeddings
-            if query_lower in node.concept.lower() or query_lower in node.content.lower():
-                results.append(GraphQueryResult(
-                    nodes=[node],
-                    edges=[],
-                    score=0.5  # Placeholder score
-                ))
-        
-        # Sort by score and return top results
-        results.sort(key=lambda x: x.score, reverse=True)
+        hits = []
+
+        # Every match scores the same placeholder, so results are simply the
+        # first `limit` matches in node order and the scans can stop there
+        if query_lower and not any(char.isspace() for char in query_lower):
+            # A query without whitespace can only match inside one token, so
+            # scan the vocabulary instead of every node's full text. Refresh
+            # the cached text first; unchanged nodes cost an identity check
+            for node in self.nodes.values():
+                self._lowered_text(node)
+            matched: Set[str] = set()
+            for token, node_ids in self._token_index.items():
+                if query_lower in token:
+                    matched |= node_ids
+            if matched:
+                for node in self.nodes.values():
+                    if node.id in matched:
+                        hits.append(node)
+                        if len(hits) == limit:
+                            break
+        else:
+            for node in self.nodes.values():
+                concept_lower, content_lower = self._lowered_text(node)
+                if query_lower in concept_lower or query_lower in content_lower:
+                    hits.append(node)
+                    if len(hits) == limit:
+                        break
+
+        # Simple text matching - in a real implementation, this would use embeddings
+        results = [
+            GraphQueryResult(nodes=[node], edges=[], score=0.5)  # Placeholder score
+            for node in hits
+        ]
         return results[:limit]
-    
+
     def get_subgraph(self, center_node_id: str, depth: int = 2) -> Tuple[List[ConceptNode], List[GraphEdge]]:
         """Get a subgraph centered around a node"""
         if center_node_id not in self.nodes:
             return [], []
         
-        visited_nodes = {center_node_id}
-        subgraph_nodes = [self.nodes[center_node_id]]
+        # Insertion-ordered visited set; nodes are materialized once at the end
+        visited_nodes = {center_node_id: None}
         subgraph_edges = []
-        
+        adjacency = self._adjacency
+
         # Use BFS to get the subgraph up to the specified depth
-        current_level = [center_node_id]
-        current_depth = 0
-        
-        while current_level and current_depth < depth:
-            next_level = []
-            
-            for node_id in current_level:
-                # Find all edges connected to this node
-                for edge in self.edges.values():
-                    if edge.source_node_id == node_id or edge.target_node_id == node_id:
-                        # Get the other node in the relationship
-                        other_node_id = edge.target_node_id if edge.source_node_id == node_id else edge.source_node_id
-                        
-                        # If we haven't visited this node yet
-                        if other_node_id not in visited_nodes:
-                            visited_nodes.add(other_node_id)
-                            subgraph_nodes.append(self.nodes[other_node_id])
-                            subgraph_edges.append(edge)
-                            next_level.append(other_node_id)
-            
-            current_level = next_level
-            current_depth += 1
-        
-        return subgraph_nodes, subgraph_edges
+        frontier = [center_node_id]
+        for _ in range(depth):
+            if not frontier:
+                break
+            next_frontier = []
+
+            for node_id in frontier:
+                for other_node_id, edge in adjacency.get(node_id, ()):
+                    if other_node_id not in visited_nodes:
+                        visited_nodes[other_node_id] = None
+                        subgraph_edges.append(edge)
+                        next_frontier.append(other_node_id)
+
+            frontier = next_frontier
+
+        return [self.nodes[node_id] for node_id in visited_nodes], subgraph_edges
     
     def _generate_fallback_embedding(self, text: str) -> NDArray:
         """
@@ -304,26 +659,25 @@ class InMemoryKnowledgeGraphEngine(KnowledgeGraphEngine):
         # Create a 384-dimensional embedding (matching Sentence Transformer output)
         embedding = np.zeros(384, dtype=np.float32)
 
-        # Simple character frequency encoding
-        char_freq = {}
-        for char in text_lower:
-            if char.isalnum():
-                char_freq[char] = char_freq.get(char, 0) + 1
+        # Alphanumeric character frequencies in code point order; ASCII text
+        # is counted with one bincount instead of a Python loop
+        if text_lower.isascii():
+            codes = np.frombuffer(text_lower.encode("ascii"), dtype=np.uint8)
+            counts = np.bincount(codes[_ASCII_ALNUM[codes]], minlength=128)
+            freqs = counts[counts > 0]
+        else:
+            char_freq = Counter(char for char in text_lower if char.isalnum())
+            freqs = np.array([char_freq[char] for char in sorted(char_freq)])
 
         # Map character frequencies to embedding dimensions
-        if char_freq:
-            max_freq = max(char_freq.values())
-            chars = sorted(char_freq.keys())
-            for i, char in enumerate(chars):
-                if i < len(embedding):
-                    embedding[i] = char_freq[char] / max_freq
+        if freqs.size:
+            n_chars = min(freqs.size, len(embedding))
+            embedding[:n_chars] = freqs[:n_chars] / freqs.max()
 
         # Add text length encoding
-        text_length = len(text_lower)
-        for i in range(len(embedding) // 4, min(len(embedding) // 4 + 10, len(embedding))):
-            embedding[i] = min(text_length / 1000, 1.0)
+        embedding[len(embedding) // 4:len(embedding) // 4 + 10] = min(len(text_lower) / 1000, 1.0)
 
-        return embedding.astype(np.float32)
+        return embedding
     
     def get_node_count(self) -> int:
         """Get the total number of nodes in the graph"""
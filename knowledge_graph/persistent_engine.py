@@ -4,11 +4,16 @@ Persistent Knowledge Graph Engine implementation.
 This component implements the KnowledgeGraphEngine interface using
 SQLAlchemy repositories for data persistence.
 """
+import dataclasses
 import logging
+import time
+from collections import OrderedDict
 from typing import List, Optional, Tuple, Dict, Any
 from datetime import datetime
-import json
 
+import numpy as np
+
+from config.settings import settings
 from core.concept_orchestrator import ConceptNode
 from knowledge_graph.engine import (
     KnowledgeGraphEngine,
@@ -21,6 +26,11 @@ from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Nodes kept in memory between queries, least recently used evicted first
+NODE_CACHE_SIZE = 10000
+# Bounds how stale a node can be after a write this engine did not make
+NODE_CACHE_TTL_SECONDS = 300
+
 
 class PersistentKnowledgeGraphEngine(KnowledgeGraphEngine):
     """
@@ -40,10 +50,20 @@ class PersistentKnowledgeGraphEngine(KnowledgeGraphEngine):
         self.node_repo = ConceptNodeRepository(db_session)
         self.edge_repo = GraphEdgeRepository(db_session)
         self.embedding_service = embedding_service
-        
-        # We also keep an in-memory cache for performance if needed,
-        # or delegate complex graph algos to networkx if we load the whole graph.
-        # For now, we'll rely on DB queries.
+        is_postgres = db_session.get_bind().dialect.name == "postgresql"
+        # Nearest-neighbour search through the pgvector HNSW index
+        self.use_vector_search = bool(
+            embedding_service and settings.ENABLE_PGVECTOR and is_postgres
+        )
+        # Text search through the tsvector GIN index, if the table has it
+        self.use_full_text_search = is_postgres and self.node_repo.has_search_column()
+        if is_postgres and not self.use_full_text_search:
+            logger.warning("concept_nodes has no search_tsv column, using ILIKE search")
+
+        # Domain nodes by ID with their expiry time, so repeat lookups and
+        # traversals skip the DB. Writes through this engine invalidate
+        # entries; writes made elsewhere show up once the entry expires.
+        self._node_cache: "OrderedDict[str, Tuple[ConceptNode, float]]" = OrderedDict()
         
         if self.embedding_service:
             logger.info("Persistent Graph Engine initialized with embedding service")
@@ -58,11 +78,63 @@ class PersistentKnowledgeGraphEngine(KnowledgeGraphEngine):
             
         try:
             self.node_repo.create(node)
-            return True
         except Exception as e:
             logger.error(f"Error adding node {node.id}: {e}")
             self.db.rollback()
             return False
+        self._node_cache.pop(node.id, None)
+
+        if self.use_vector_search:
+            try:
+                embedding = self.embedding_service.encode(f"{node.concept} {node.content}")
+                self.node_repo.set_embedding(node.id, np.ravel(embedding))
+            except Exception as e:
+                logger.error(f"Error storing embedding for node {node.id}: {e}")
+                self.db.rollback()
+        return True
+
+    def add_nodes(self, nodes: List[ConceptNode]) -> List[bool]:
+        """
+        Add several nodes with one existence check and batched inserts.
+
+        Args:
+            nodes: Nodes to add
+
+        Returns:
+            Whether each node was added (False for ids already present)
+        """
+        seen = self.node_repo.existing_ids(node.id for node in nodes)
+        added = []
+        new_nodes = []
+        for node in nodes:
+            if node.id in seen:
+                added.append(False)
+                continue
+            seen.add(node.id)
+            new_nodes.append(node)
+            added.append(True)
+        if not new_nodes:
+            return added
+
+        try:
+            self.node_repo.create_many(new_nodes)
+        except Exception as e:
+            logger.error(f"Bulk node insert failed, adding one at a time: {e}")
+            self.db.rollback()
+            return [self.add_node(node) for node in nodes]
+        for node in new_nodes:
+            self._node_cache.pop(node.id, None)
+
+        if self.use_vector_search:
+            try:
+                embeddings = self.embedding_service.encode_batch(
+                    [f"{node.concept} {node.content}" for node in new_nodes]
+                )
+                self.node_repo.set_embeddings([node.id for node in new_nodes], embeddings)
+            except Exception as e:
+                logger.error(f"Error storing embeddings for {len(new_nodes)} nodes: {e}")
+                self.db.rollback()
+        return added
 
     def add_edge(self, edge: GraphEdge) -> bool:
         """Add an edge to the knowledge graph"""
@@ -78,104 +150,161 @@ class PersistentKnowledgeGraphEngine(KnowledgeGraphEngine):
             self.db.rollback()
             return False
 
+    def add_edges(self, edges: List[GraphEdge]) -> List[bool]:
+        """
+        Add several edges with one existence check and batched inserts.
+
+        Args:
+            edges: Edges to add
+
+        Returns:
+            Whether each edge was added (False for ids already present)
+        """
+        seen = self.edge_repo.existing_ids(edge.id for edge in edges)
+        added = []
+        new_edges = []
+        for edge in edges:
+            if edge.id in seen:
+                added.append(False)
+                continue
+            seen.add(edge.id)
+            new_edges.append(edge)
+            added.append(True)
+        if not new_edges:
+            return added
+
+        try:
+            self.edge_repo.create_many(new_edges)
+        except Exception as e:
+            # e.g. an edge to a missing node; isolate it like add_edge would
+            logger.error(f"Bulk edge insert failed, adding one at a time: {e}")
+            self.db.rollback()
+            return [self.add_edge(edge) for edge in edges]
+        return added
+
+    def update_quality_score(self, node_id: str, score: float) -> bool:
+        """Update a node's quality score"""
+        self._node_cache.pop(node_id, None)
+        return self.node_repo.update_quality_score(node_id, score) is not None
+
+    def delete_node(self, node_id: str) -> bool:
+        """Delete a node"""
+        self._node_cache.pop(node_id, None)
+        return self.node_repo.delete(node_id)
+
     def get_node(self, node_id: str) -> Optional[ConceptNode]:
         """Get a node by ID"""
+        cached = self._cached_node(node_id)
+        if cached is not None:
+            return cached
+
         db_node = self.node_repo.get_by_id(node_id)
         if not db_node:
             return None
-            
-        # Convert DB model back to domain object
-        metadata = {}
-        if db_node.metadata:
-            try:
-                metadata = json.loads(db_node.metadata)
-            except:
-                pass
-                
+        return self._cache_node(self._to_concept_node(db_node))
+
+    @staticmethod
+    def _copy_node(node: ConceptNode) -> ConceptNode:
+        """Copy a cached node so callers' edits do not leak into the cache"""
+        return dataclasses.replace(
+            node, metadata=dict(node.metadata), connections=list(node.connections)
+        )
+
+    def _cached_node(self, node_id: str) -> Optional[ConceptNode]:
+        """Get a copy of a cached node, or None when absent or expired"""
+        entry = self._node_cache.get(node_id)
+        if entry is None:
+            return None
+        node, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._node_cache[node_id]
+            return None
+        self._node_cache.move_to_end(node_id)
+        return self._copy_node(node)
+
+    def _cache_node(self, node: ConceptNode) -> ConceptNode:
+        """Store a node in the LRU node cache and return a copy of it"""
+        self._node_cache[node.id] = (node, time.monotonic() + NODE_CACHE_TTL_SECONDS)
+        self._node_cache.move_to_end(node.id)
+        if len(self._node_cache) > NODE_CACHE_SIZE:
+            self._node_cache.popitem(last=False)
+        return self._copy_node(node)
+
+    def _to_concept_node(self, db_node) -> ConceptNode:
+        """Convert a DB model back to a domain object"""
+        # meta_data is a JSON column, already decoded by the driver
         return ConceptNode(
             id=db_node.id,
             concept=db_node.concept,
             content=db_node.content,
-            metadata=metadata,
-            created_at=db_node.created_at
+            metadata=db_node.meta_data or {},
+            created_at=db_node.created_at,
+            connections=[]
         )
 
     def get_neighbors(self, node_id: str, relationship_type: Optional[str] = None) -> List[ConceptNode]:
         """Get neighboring nodes of a given node"""
-        # Get edges where this node is source
-        out_edges = self.edge_repo.get_from_node(node_id)
-        # Get edges where this node is target
-        in_edges = self.edge_repo.get_to_node(node_id)
-        
-        neighbor_ids = set()
-        
-        for edge in out_edges:
-            if relationship_type is None or edge.relationship_type == relationship_type:
-                neighbor_ids.add(edge.target_id)
-                
-        for edge in in_edges:
-            if relationship_type is None or edge.relationship_type == relationship_type:
-                neighbor_ids.add(edge.source_id)
-                
-        neighbors = []
-        for nid in neighbor_ids:
-            node = self.get_node(nid)
-            if node:
-                neighbors.append(node)
-                
-        return neighbors
+        # One JOIN query instead of two edge queries plus one per neighbor
+        return [
+            self._cached_node(db_node.id) or self._cache_node(self._to_concept_node(db_node))
+            for db_node in self.node_repo.get_neighbors(node_id, relationship_type)
+        ]
 
     def find_similar_nodes(self, concept: str, limit: int = 10) -> List[GraphQueryResult]:
         """
         Find nodes similar to the given concept.
         
-        NOTE: This implementation currently fetches all nodes to perform 
-        semantic search in memory if vector DB is not set up.
-        For production with large graphs, this should utilize pgvector.
+        On PostgreSQL with ENABLE_PGVECTOR, this is an approximate
+        nearest-neighbour query against the pgvector index on node embeddings.
+        Otherwise it falls back to text search.
         """
-        # TODO: Implement pgvector support for true scalable semantic search
-        
-        # For now, we'll fetch recent/all nodes and use the embedding service 
-        # similar to the in-memory engine, but this is not scalable.
-        # A better approach for now is simple text search if no vector DB.
-        
-        if not self.embedding_service:
+        if not self.use_vector_search:
             return self.search_nodes(concept, limit)
-            
-        # If we have embedding service, we can try to be smarter.
-        # But without vector DB, we can't efficiently search.
-        # Fallback to search_nodes for this iteration.
-        return self.search_nodes(concept, limit)
+
+        try:
+            query_embedding = np.ravel(self.embedding_service.encode(concept))
+            matches = self.node_repo.nearest(
+                query_embedding,
+                limit,
+                settings.PGVECTOR_EF_SEARCH,
+                settings.PGVECTOR_IVFFLAT_PROBES,
+            )
+        except Exception as e:
+            logger.error(f"Vector search failed, falling back to text search: {e}")
+            self.db.rollback()
+            return self.search_nodes(concept, limit)
+
+        return [
+            GraphQueryResult(nodes=[self._to_concept_node(db_node)], edges=[], score=score)
+            for db_node, score in matches
+        ]
 
     def search_nodes(self, query: str, limit: int = 10) -> List[GraphQueryResult]:
-        """Search nodes by content (simple SQL LIKE)"""
-        # We'll implement a basic text search here
-        # In a real app, use Full Text Search (Postgres TSVECTOR)
-        
-        # Get all nodes (warning: slow for large DBs)
-        # Optimization: Just search by concept name for now
-        
-        # This is a limitation of the current repo interface, 
-        # we'll do a direct query on the session for flexibility
-        from database.models import ConceptNodeModel
-        
-        search = f"%{query}%"
-        results = self.db.query(ConceptNodeModel).filter(
-            (ConceptNodeModel.concept.ilike(search)) | 
-            (ConceptNodeModel.content.ilike(search))
-        ).limit(limit).all()
+        """
+        Search nodes by concept and content.
+
+        PostgreSQL uses the full-text GIN index, ranked by ts_rank; other
+        databases fall back to an ILIKE substring scan.
+        """
+        results = None
+        if self.use_full_text_search:
+            try:
+                results = self.node_repo.full_text_search(query, limit)
+            except Exception as e:
+                logger.error(f"Full-text search failed, falling back to ILIKE: {e}")
+                self.db.rollback()
+
+        if results is None:
+            results = self.node_repo.substring_search(query, limit)
         
-        graph_results = []
-        for db_node in results:
-            node = self.get_node(db_node.id)
-            if node:
-                graph_results.append(GraphQueryResult(
-                    nodes=[node],
-                    edges=[],
-                    score=1.0 if query.lower() == db_node.concept.lower() else 0.5
-                ))
-                
-        return graph_results
+        return [
+            GraphQueryResult(
+                nodes=[self._to_concept_node(db_node)],
+                edges=[],
+                score=1.0 if query.lower() == db_node.concept.lower() else 0.5
+            )
+            for db_node in results
+        ]
 
     def get_subgraph(self, center_node_id: str, depth: int = 2) -> Tuple[List[ConceptNode], List[GraphEdge]]:
         """Get a subgraph centered around a node"""
@@ -183,53 +312,36 @@ class PersistentKnowledgeGraphEngine(KnowledgeGraphEngine):
             logger.warning("Depth > 2 not recommended for persistent graph queries without graph DB")
             depth = 2
             
-        visited_ids = {center_node_id}
-        nodes_map = {}
-        edges_list = []
-        
         # Get center node
         center_node = self.get_node(center_node_id)
         if not center_node:
             return [], []
-            
-        nodes_map[center_node_id] = center_node
-        
-        current_level = [center_node_id]
-        
-        for _ in range(depth):
-            next_level = []
-            for nid in current_level:
-                # Get all connected edges
-                out_edges = self.edge_repo.get_from_node(nid)
-                in_edges = self.edge_repo.get_to_node(nid)
-                
-                all_edges = out_edges + in_edges
-                
-                for db_edge in all_edges:
-                    # Convert DB edge to domain edge
-                    edge = GraphEdge(
-                        id=db_edge.id,
-                        source_node_id=db_edge.source_id,
-                        target_node_id=db_edge.target_id,
-                        relationship_type=db_edge.relationship_type,
-                        weight=db_edge.weight,
-                        created_at=db_edge.created_at,
-                        metadata={}
-                    )
-                    edges_list.append(edge)
-                    
-                    # Identify neighbor
-                    neighbor_id = edge.target_node_id if edge.source_node_id == nid else edge.source_node_id
-                    
-                    if neighbor_id not in visited_ids:
-                        visited_ids.add(neighbor_id)
-                        next_level.append(neighbor_id)
-                        
-                        # Fetch neighbor node
-                        neighbor = self.get_node(neighbor_id)
-                        if neighbor:
-                            nodes_map[neighbor_id] = neighbor
-                            
-            current_level = next_level
-            
-        return list(nodes_map.values()), edges_list
+        if depth <= 0:
+            return [center_node], []
+
+        # The whole traversal is one recursive query; every node within
+        # depth hops is an endpoint of an edge it returns
+        edges_list = []
+        node_ids = {center_node_id: None}
+        for db_edge in self.edge_repo.get_edges_within(center_node_id, depth):
+            edges_list.append(GraphEdge(
+                id=db_edge.id,
+                source_node_id=db_edge.source_id,
+                target_node_id=db_edge.target_id,
+                relationship_type=db_edge.relationship_type,
+                weight=db_edge.weight,
+                created_at=db_edge.created_at,
+                metadata={}
+            ))
+            node_ids[db_edge.source_id] = None
+            node_ids[db_edge.target_id] = None
+
+        # Fetch uncached nodes in one query
+        nodes_map = {node_id: self._cached_node(node_id) for node_id in node_ids}
+        db_nodes = self.node_repo.get_many(
+            node_id for node_id, node in nodes_map.items() if node is None
+        )
+        for node_id, db_node in db_nodes.items():
+            nodes_map[node_id] = self._cache_node(self._to_concept_node(db_node))
+
+        return [node for node in nodes_map.values() if node is not None], edges_list
@@ -6,10 +6,12 @@ Provides persistent graph storage using SQLAlchemy models.
 
 import logging
 from typing import List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 import numpy as np
 from datetime import datetime
 
+from config.settings import settings
 from knowledge_graph.engine import (
     KnowledgeGraphEngine,
     GraphEdge,
@@ -25,16 +27,27 @@ logger = logging.getLogger(__name__)
 class PostgreSQLKnowledgeGraphEngine(KnowledgeGraphEngine):
     """Knowledge graph engine backed by PostgreSQL."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, embedding_service=None):
         """
         Initialize PostgreSQL knowledge graph engine.
 
         Args:
             db: SQLAlchemy database session
+            embedding_service: Optional embedding service for semantic search
         """
         self.db = db
         self.node_repo = ConceptNodeRepository(db)
         self.edge_repo = GraphEdgeRepository(db)
+        self.embedding_service = embedding_service
+        is_postgres = db.get_bind().dialect.name == "postgresql"
+        # Nearest-neighbour search through the pgvector index
+        self.use_vector_search = bool(
+            embedding_service and settings.ENABLE_PGVECTOR and is_postgres
+        )
+        # Text search through the tsvector GIN index, if the table has it
+        self.use_full_text_search = is_postgres and self.node_repo.has_search_column()
+        if is_postgres and not self.use_full_text_search:
+            logger.warning("concept_nodes has no search_tsv column, using ILIKE search")
         logger.info("PostgreSQL knowledge graph engine initialized")
 
     def add_node(self, node: ConceptNode) -> bool:
@@ -49,40 +62,34 @@ class PostgreSQLKnowledgeGraphEngine(KnowledgeGraphEngine):
             # Create node in database
             self.node_repo.create(node)
             logger.debug(f"Added node: {node.id} ({node.concept})")
-            return True
         except Exception as e:
             logger.error(f"Error adding node: {e}")
             return False
 
+        if self.use_vector_search:
+            try:
+                embedding = self.embedding_service.encode(f"{node.concept} {node.content}")
+                self.node_repo.set_embedding(node.id, np.ravel(embedding))
+            except Exception as e:
+                logger.error(f"Error storing embedding for node {node.id}: {e}")
+                self.db.rollback()
+        return True
+
     def add_edge(self, edge: GraphEdge) -> bool:
         """Add an edge to the knowledge graph."""
         try:
-            # Verify both nodes exist
-            source_node = self.node_repo.get_by_id(edge.source_node_id)
-            target_node = self.node_repo.get_by_id(edge.target_node_id)
-
-            if not source_node or not target_node:
-                logger.warning(f"Cannot add edge: nodes not found")
-                return False
-
-            # Check if edge already exists
-            existing = self.edge_repo.get_by_id(edge.id)
-            if existing:
+            # One round-trip: the primary key rejects duplicates and the
+            # foreign keys reject missing nodes
+            if not self.edge_repo.create_if_absent(edge):
                 logger.warning(f"Edge {edge.id} already exists")
                 return False
 
-            # Create edge in database
-            self.edge_repo.create(edge)
-
-            # Update node connections
-            if edge.target_node_id not in source_node.connections:
-                source_node.connections.append(edge.target_node_id)
-            if edge.source_node_id not in target_node.connections:
-                target_node.connections.append(edge.source_node_id)
-
-            self.db.commit()
             logger.debug(f"Added edge: {edge.id}")
             return True
+        except IntegrityError:
+            logger.warning(f"Cannot add edge: nodes not found")
+            self.db.rollback()
+            return False
         except Exception as e:
             logger.error(f"Error adding edge: {e}")
             self.db.rollback()
@@ -95,109 +102,101 @@ class PostgreSQLKnowledgeGraphEngine(KnowledgeGraphEngine):
             if not db_node:
                 return None
 
-            return ConceptNode(
-                id=db_node.id,
-                concept=db_node.concept,
-                content=db_node.content,
-                metadata=db_node.metadata or {},
-                created_at=db_node.created_at,
-                connections=db_node.connections or [],
-            )
+            return self._to_concept_node(db_node)
         except Exception as e:
             logger.error(f"Error getting node: {e}")
             return None
 
+    def _to_concept_node(self, db_node: ConceptNodeModel) -> ConceptNode:
+        """Convert a database row to a domain node."""
+        return ConceptNode(
+            id=db_node.id,
+            concept=db_node.concept,
+            content=db_node.content,
+            metadata=db_node.meta_data or {},
+            created_at=db_node.created_at,
+            connections=[],
+        )
+
     def get_neighbors(self, node_id: str, relationship_type: Optional[str] = None) -> List[ConceptNode]:
         """Get neighboring nodes."""
         try:
-            neighbors = []
-
-            # Get edges from this node
-            outgoing_edges = self.edge_repo.get_from_node(node_id)
-            for edge in outgoing_edges:
-                if relationship_type and edge.relationship_type != relationship_type:
-                    continue
-                neighbor = self.get_node(edge.target_id)
-                if neighbor:
-                    neighbors.append(neighbor)
-
-            # Get edges to this node
-            incoming_edges = self.edge_repo.get_to_node(node_id)
-            for edge in incoming_edges:
-                if relationship_type and edge.relationship_type != relationship_type:
-                    continue
-                neighbor = self.get_node(edge.source_id)
-                if neighbor:
-                    neighbors.append(neighbor)
-
-            return neighbors
+            # Neighbors in both directions, joined in a single query
+            return [
+                self._to_concept_node(db_node)
+                for db_node in self.node_repo.get_neighbors(node_id, relationship_type or None)
+            ]
         except Exception as e:
             logger.error(f"Error getting neighbors: {e}")
             return []
 
     def find_similar_nodes(self, concept: str, limit: int = 10) -> List[GraphQueryResult]:
-        """Find similar nodes (text-based for PostgreSQL without pgvector)."""
-        try:
-            results = []
-
-            # Search by concept name
-            nodes = self.node_repo.get_by_concept(concept)
-            for node in nodes[:limit]:
-                concept_node = ConceptNode(
-                    id=node.id,
-                    concept=node.concept,
-                    content=node.content,
-                    metadata=node.metadata or {},
-                    created_at=node.created_at,
-                    connections=node.connections or [],
-                )
-                results.append(
-                    GraphQueryResult(
-                        nodes=[concept_node],
-                        edges=[],
-                        score=1.0,
-                    )
+        """
+        Find similar nodes.
+
+        With ENABLE_PGVECTOR and an embedding service this is a nearest-
+        neighbour query on the pgvector index; otherwise nodes are matched
+        by concept name.
+        """
+        if self.use_vector_search:
+            try:
+                matches = self.node_repo.nearest(
+                    np.ravel(self.embedding_service.encode(concept)),
+                    limit,
+                    settings.PGVECTOR_EF_SEARCH,
+                    settings.PGVECTOR_IVFFLAT_PROBES,
                 )
+                return [
+                    GraphQueryResult(nodes=[self._to_concept_node(db_node)], edges=[], score=score)
+                    for db_node, score in matches
+                ]
+            except Exception as e:
+                logger.error(f"Vector search failed, falling back to concept match: {e}")
+                self.db.rollback()
 
-            return results
+        try:
+            # Search by concept name, limited in SQL rather than sliced here
+            return [
+                GraphQueryResult(
+                    nodes=[self._to_concept_node(node)],
+                    edges=[],
+                    score=1.0,
+                )
+                for node in self.node_repo.get_by_concept(concept, limit)
+            ]
         except Exception as e:
             logger.error(f"Error finding similar nodes: {e}")
             return []
 
     def search_nodes(self, query: str, limit: int = 10) -> List[GraphQueryResult]:
-        """Search nodes by content."""
-        try:
-            results = []
-            query_lower = query.lower()
-
-            # Full list search (for small graphs) or implement full-text search for large ones
-            all_nodes = self.node_repo.list_all(limit=1000)
-
-            for db_node in all_nodes:
-                if (query_lower in db_node.concept.lower() or
-                    (db_node.content and query_lower in db_node.content.lower())):
-                    concept_node = ConceptNode(
-                        id=db_node.id,
-                        concept=db_node.concept,
-                        content=db_node.content,
-                        metadata=db_node.metadata or {},
-                        created_at=db_node.created_at,
-                        connections=db_node.connections or [],
-                    )
-                    results.append(
-                        GraphQueryResult(
-                            nodes=[concept_node],
-                            edges=[],
-                            score=0.5,
-                        )
-                    )
+        """
+        Search nodes by concept and content.
 
-                if len(results) >= limit:
-                    break
+        Uses the full-text GIN index, ranked by ts_rank, when the table has
+        the search_tsv column; otherwise an ILIKE substring scan.
+        """
+        results = None
+        if self.use_full_text_search:
+            try:
+                results = self.node_repo.full_text_search(query, limit)
+            except Exception as e:
+                logger.error(f"Full-text search failed, falling back to ILIKE: {e}")
+                self.db.rollback()
 
-            return results
+        try:
+            if results is None:
+                results = self.node_repo.substring_search(query, limit)
+            return [
+                GraphQueryResult(
+                    nodes=[self._to_concept_node(db_node)],
+                    edges=[],
+                    score=0.5,
+                )
+                for db_node in results
+            ]
         except Exception as e:
             logger.error(f"Error searching nodes: {e}")
+            self.db.rollback()
             return []
 
     def get_subgraph(self, center_node_id: str, depth: int = 2) -> Tuple[List[ConceptNode], List[GraphEdge]]:
@@ -220,15 +219,21 @@ class PostgreSQLKnowledgeGraphEngine(KnowledgeGraphEngine):
             while current_level and current_depth < depth:
                 next_level = []
 
+                # Fetch the whole level's edges at once, grouped per node
+                outgoing_edges = {node_id: [] for node_id in current_level}
+                incoming_edges = {node_id: [] for node_id in current_level}
+                for edge in self.edge_repo.get_edges_for_nodes(current_level):
+                    if edge.source_id in outgoing_edges:
+                        outgoing_edges[edge.source_id].append(edge)
+                    if edge.target_id in incoming_edges:
+                        incoming_edges[edge.target_id].append(edge)
+
                 for node_id in current_level:
                     # Get outgoing edges
-                    outgoing = self.edge_repo.get_from_node(node_id)
+                    outgoing = outgoing_edges[node_id]
                     for edge in outgoing:
                         if edge.target_id not in visited_nodes:
                             visited_nodes.add(edge.target_id)
-                            neighbor = self.get_node(edge.target_id)
-                            if neighbor:
-                                subgraph_nodes.append(neighbor)
                             next_level.append(edge.target_id)
 
                         # Convert to GraphEdge
@@ -245,15 +250,20 @@ class PostgreSQLKnowledgeGraphEngine(KnowledgeGraphEngine):
                         )
 
                     # Get incoming edges
-                    incoming = self.edge_repo.get_to_node(node_id)
+                    incoming = incoming_edges[node_id]
                     for edge in incoming:
                         if edge.source_id not in visited_nodes:
                             visited_nodes.add(edge.source_id)
-                            neighbor = self.get_node(edge.source_id)
-                            if neighbor:
-                                subgraph_nodes.append(neighbor)
                             next_level.append(edge.source_id)
 
+                # Hydrate the level's new neighbors in one query
+                db_nodes = self.node_repo.get_many(next_level)
+                subgraph_nodes.extend(
+                    self._to_concept_node(db_nodes[neighbor_id])
+                    for neighbor_id in next_level
+                    if neighbor_id in db_nodes
+                )
+
                 current_level = next_level
                 current_depth += 1
 
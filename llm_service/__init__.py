@@ -7,12 +7,16 @@ Provides unified interface for different LLM providers:
 - Qwen (Alibaba models)
 - Gemini (Google models)
 - Gemini CLI (Command line interface)
+
+Responses can be cached across providers with CachingLLMService.
 """
 from llm_service.base import LLMService, LLMResponse
+from llm_service.caching import CachingLLMService
 from llm_service.factory import get_llm_service
 
 __all__ = [
     "LLMService",
     "LLMResponse", 
+    "CachingLLMService",
     "get_llm_service"
 ]
@@ -5,11 +5,51 @@ Provides LLM interactions using Anthropic's Claude API.
 """
 import logging
 from typing import Optional
-from llm_service.base import LLMService, LLMResponse
+from llm_service.base import (
+    LLMService,
+    LLMResponse,
+    _CONNECTIONS_SYS,
+    _SUMMARY_SYS,
+    _VALIDATE_SYS,
+)
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Outbound connection pool shared by every AnthropicService
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 50
+
+_http_client = None
+
+
+def _shared_http_client():
+    """
+    Get the process-wide HTTP client for Anthropic requests.
+
+    Service instances share one keep-alive pool, so concurrent calls reuse
+    warm TCP/TLS connections instead of opening their own. HTTP/2 is used
+    when the optional h2 package is installed.
+    """
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+
+        _http_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
 
 class AnthropicService(LLMService):
     """Anthropic Claude LLM service implementation."""
@@ -21,7 +61,10 @@ class AnthropicService(LLMService):
 
         try:
             from anthropic import AsyncAnthropic
-            self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+            self.client = AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                http_client=_shared_http_client(),
+            )
         except ImportError:
             raise ImportError(
                 "anthropic package not installed. "
@@ -50,12 +93,20 @@ class AnthropicService(LLMService):
         Returns:
             LLMResponse with generated content
         """
+        # Mark the system prompt as a cacheable prefix; Anthropic reuses it
+        # across calls once it is long enough to be cached
+        system = (
+            [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+            if system_prompt
+            else ""
+        )
+
         try:
             response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                system=system_prompt or "",
+                system=system,
                 messages=[{"role": "user", "content": prompt}],
             )
 
@@ -82,17 +133,15 @@ Text:
 
 Summary:"""
 
-        system_prompt = "You are a helpful assistant that creates clear, concise summaries."
-
         response = await self.generate_text(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_SUMMARY_SYS,
             max_tokens=max_length // 4,  # Rough estimate: 4 chars per token
         )
 
         return response.content.strip()
 
-    async def generate_connections(self, concept: str, context: str) -> list[str]:
+    async def _generate_connections(self, concept: str, context: str) -> list[str]:
         """
         Generate related concepts and connections.
 
@@ -107,30 +156,22 @@ Summary:"""
 generate a list of 5-10 related concepts or ideas that connect to this concept.
 Return only the concept names, one per line, without numbering or bullets."""
 
-        system_prompt = (
-            "You are an expert at finding meaningful connections between ideas. "
-            "Generate only concrete, specific concepts."
-        )
-
         response = await self.generate_text(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_CONNECTIONS_SYS,
             max_tokens=500,
         )
 
         # Parse the response into a list of concepts
-        connections = [
-            line.strip() for line in response.content.split("\n") if line.strip()
-        ]
-        return connections[:10]  # Limit to 10
+        return self._parse_connections(response.content)
 
-    async def validate_concept(self, concept: str) -> bool:
+    async def _validate_concept(self, concept: str) -> bool:
         """Validate if a concept is valid and well-formed."""
-        prompt = f"""Is "{concept}" a valid, well-defined concept suitable for knowledge expansion?
-Answer only "yes" or "no"."""
+        prompt = f'Is "{concept}" a valid, well-defined concept suitable for knowledge expansion?'
 
         response = await self.generate_text(
             prompt=prompt,
+            system_prompt=_VALIDATE_SYS,
             temperature=0.0,  # Deterministic for validation
             max_tokens=10,
         )
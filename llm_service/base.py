@@ -4,11 +4,29 @@ Base LLM service interface for the Continuum application.
 Provides abstract interface for LLM interactions.
 """
 from abc import ABC, abstractmethod
-from typing import Optional
+from itertools import islice
+from typing import List, Optional, Sequence, Tuple
+import asyncio
 import logging
 
+from cache.decorators import cache_method
+from config.settings import settings
+
 logger = logging.getLogger(__name__)
 
+# System prompts for the built-in helpers. They are fixed strings shared by
+# every provider, so each request starts with a byte-identical prefix that
+# provider-side prompt caches can match.
+_SUMMARY_SYS = "You are a helpful assistant that creates clear, concise summaries."
+_CONNECTIONS_SYS = (
+    "You are an expert at finding meaningful connections between ideas. "
+    "Generate only concrete, specific concepts."
+)
+_VALIDATE_SYS = (
+    "You judge whether a term is a valid, well-defined concept suitable for "
+    'knowledge expansion. Answer only "yes" or "no".'
+)
+
 
 class LLMResponse:
     """Response from LLM service."""
@@ -52,7 +70,13 @@ class LLMService(ABC):
         """Generate a summary of the given text."""
         pass
 
-    @abstractmethod
+    # Cached per model so a model change, or a Redis cache shared across
+    # deploys, never serves another model's answers
+    @cache_method(
+        ttl=settings.CACHE_TTL_SECONDS,
+        prefix=lambda service: service.model,
+        condition=bool,
+    )
     async def generate_connections(self, concept: str, context: str) -> list[str]:
         """
         Generate related concepts and connections.
@@ -64,9 +88,53 @@ class LLMService(ABC):
         Returns:
             List of related concept names
         """
-        pass
+        return await self._generate_connections(concept, context)
 
     @abstractmethod
+    async def _generate_connections(self, concept: str, context: str) -> list[str]:
+        """Ask the model for related concepts (uncached)."""
+        pass
+
+    @staticmethod
+    def _parse_connections(content: str, limit: int = 10) -> list[str]:
+        """
+        Parse a one-concept-per-line reply into at most limit concepts.
+
+        Lines are stripped and blank ones skipped lazily, so parsing stops
+        once limit concepts have been found.
+        """
+        lines = map(str.strip, content.splitlines())
+        return list(islice(filter(None, lines), limit))
+
+    async def generate_connections_batch(
+        self, items: Sequence[Tuple[str, str]], concurrency: int = 8
+    ) -> List[list[str]]:
+        """
+        Generate connections for several concepts concurrently.
+
+        Args:
+            items: (concept, context) pairs
+            concurrency: Maximum requests in flight at once
+
+        Returns:
+            Connection lists in the same order as items
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def generate(concept: str, context: str) -> list[str]:
+            async with semaphore:
+                return await self.generate_connections(concept, context)
+
+        return await asyncio.gather(
+            *(generate(concept, context) for concept, context in items)
+        )
+
+    @cache_method(ttl=settings.CACHE_TTL_SECONDS, prefix=lambda service: service.model)
     async def validate_concept(self, concept: str) -> bool:
         """Validate if a concept is valid and well-formed."""
+        return await self._validate_concept(concept)
+
+    @abstractmethod
+    async def _validate_concept(self, concept: str) -> bool:
+        """Ask the model whether a concept is valid (uncached)."""
         pass
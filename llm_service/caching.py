@@ -0,0 +1,209 @@
+"""
+Response caching for LLM services.
+
+Wraps any LLMService so repeated prompts are answered without a model
+call: exact repeats through the shared cache backend (local or Redis),
+and, for callers that opt in, paraphrases of near-deterministic prompts
+through embedding similarity.
+"""
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cache.cache_manager import get_cache
+from config.settings import settings
+from llm_service.base import LLMService, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+# Sampling above this temperature is too random to reuse; the 0.7 default
+# stays uncached so sampled generations keep varying between calls
+MAX_CACHED_TEMPERATURE = 0.3
+# Only near-deterministic calls may be answered from a paraphrase
+MAX_SEMANTIC_TEMPERATURE = 0.3
+DETERMINISTIC_TTL_SECONDS = 86400
+GENERATIVE_TTL_SECONDS = 3600
+# Prompts remembered per (model, system prompt, max tokens) for semantic hits
+SEMANTIC_CACHE_SIZE = 10000
+
+
+class _SemanticRing:
+    """Unit prompt vectors and their responses, overwriting the oldest when full"""
+    __slots__ = ("_vectors", "_responses", "_next", "_count")
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self._vectors = np.empty((min(capacity, SEMANTIC_CACHE_SIZE), dim), dtype=np.float32)
+        self._responses: List[Optional[LLMResponse]] = [None] * len(self._vectors)
+        self._next = 0
+        self._count = 0
+
+    def add(self, vector: np.ndarray, response: LLMResponse):
+        """Write a prompt in place, growing until SEMANTIC_CACHE_SIZE rows"""
+        capacity = len(self._vectors)
+        if self._count == capacity and capacity < SEMANTIC_CACHE_SIZE:
+            # Only full buffers grow, and their rows are still in insertion order
+            rows = min(capacity * 2, SEMANTIC_CACHE_SIZE)
+            vectors = np.empty((rows, self._vectors.shape[1]), dtype=np.float32)
+            vectors[:capacity] = self._vectors
+            self._vectors = vectors
+            self._responses.extend([None] * (len(vectors) - capacity))
+        self._vectors[self._next] = vector
+        self._responses[self._next] = response
+        self._next = (self._next + 1) % len(self._vectors)
+        self._count = min(self._count + 1, len(self._vectors))
+
+    def nearest(self, vector: np.ndarray) -> Tuple[float, Optional[LLMResponse]]:
+        """Similarity and response of the closest stored prompt"""
+        if not self._count:
+            return -1.0, None
+        scores = self._vectors[:self._count] @ vector
+        best = int(np.argmax(scores))
+        return float(scores[best]), self._responses[best]
+
+
+class CachingLLMService(LLMService):
+    """
+    LLM service decorator adding a two-tier response cache.
+
+    The wrapped service's generate_text is rerouted through the cache, so
+    its own helpers (summaries, connections, validation) benefit as well.
+    """
+
+    def __init__(
+        self,
+        service: LLMService,
+        embedding_service=None,
+        similarity_threshold: Optional[float] = None,
+    ):
+        """
+        Wrap an LLM service.
+
+        Args:
+            service: Service to cache responses for
+            embedding_service: Optional embedding service for semantic hits;
+                created on first use when omitted
+            similarity_threshold: Minimum prompt cosine similarity for a
+                semantic hit (defaults to LLM_SEMANTIC_CACHE_THRESHOLD)
+        """
+        self.service = service
+        self.model = service.model
+        self.similarity_threshold = (
+            similarity_threshold
+            if similarity_threshold is not None
+            else settings.LLM_SEMANTIC_CACHE_THRESHOLD
+        )
+        self._embedding_service = embedding_service
+        # (model, system prompt, max tokens) -> remembered prompts and responses
+        self._semantic: Dict[Tuple[str, str, int], _SemanticRing] = {}
+
+        self._generate_uncached = service.generate_text
+        service.generate_text = self.generate_text
+
+    def _cache_key(
+        self, prompt: str, temperature: float, max_tokens: int, system_prompt: Optional[str]
+    ) -> str:
+        """Exact-match key over everything that shapes the response"""
+        payload = json.dumps(
+            [self.model, system_prompt or "", prompt, temperature, max_tokens]
+        )
+        return f"llm:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """Unit prompt embedding, or None without a real embedding model"""
+        if self._embedding_service is None:
+            from embeddings.service import EmbeddingService
+
+            self._embedding_service = EmbeddingService()
+        if not self._embedding_service.use_sentence_transformers:
+            # Character-frequency fallback vectors cannot tell paraphrases apart
+            return None
+
+        vector = np.ravel(self._embedding_service.encode(prompt)).astype(np.float32)
+        norm = np.sqrt(np.vdot(vector, vector))
+        return vector / norm if norm else None
+
+    def _semantic_lookup(
+        self, bucket: Tuple[str, str, int], vector: np.ndarray
+    ) -> Optional[LLMResponse]:
+        """Cached response for the most similar earlier prompt, if close enough"""
+        ring = self._semantic.get(bucket)
+        if ring is None:
+            return None
+        score, response = ring.nearest(vector)
+        if score < self.similarity_threshold:
+            return None
+        return response
+
+    def _semantic_add(
+        self, bucket: Tuple[str, str, int], vector: np.ndarray, response: LLMResponse
+    ) -> None:
+        """Remember a prompt for later semantic hits, dropping the oldest when full"""
+        ring = self._semantic.get(bucket)
+        if ring is None:
+            ring = self._semantic[bucket] = _SemanticRing(len(vector))
+        ring.add(vector, response)
+
+    async def generate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        system_prompt: Optional[str] = None,
+        semantic: bool = False,
+    ) -> LLMResponse:
+        """
+        Generate text, answering from cache when possible.
+
+        Semantic lookup is opt-in: templated prompts such as the built-in
+        helpers' differ only in a short slot, so their embeddings are
+        dominated by the shared template and a paraphrase match would
+        answer for the wrong concept. Those calls only use exact matches.
+        Calls above MAX_CACHED_TEMPERATURE, including the 0.7 default, always
+        reach the model. Cache hits report zero tokens used.
+
+        Args:
+            semantic: Also answer from a similar earlier free-form prompt
+                (below MAX_SEMANTIC_TEMPERATURE only)
+        """
+        if temperature > MAX_CACHED_TEMPERATURE:
+            return await self._generate_uncached(prompt, temperature, max_tokens, system_prompt)
+
+        cache = get_cache()
+        key = self._cache_key(prompt, temperature, max_tokens, system_prompt)
+        cached = await cache.get(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit: {key}")
+            return LLMResponse(cached["content"], 0, cached["model"])
+
+        vector = None
+        bucket = (self.model, system_prompt or "", max_tokens)
+        if semantic and temperature < MAX_SEMANTIC_TEMPERATURE:
+            vector = self._embed(prompt)
+            if vector is not None:
+                similar = self._semantic_lookup(bucket, vector)
+                if similar is not None:
+                    logger.debug("LLM semantic cache hit")
+                    return LLMResponse(similar.content, 0, similar.model)
+
+        response = await self._generate_uncached(prompt, temperature, max_tokens, system_prompt)
+
+        ttl = DETERMINISTIC_TTL_SECONDS if temperature == 0 else GENERATIVE_TTL_SECONDS
+        await cache.set(key, {"content": response.content, "model": response.model}, ttl)
+        if vector is not None:
+            self._semantic_add(bucket, vector, response)
+        return response
+
+    async def generate_summary(self, text: str, max_length: int = 500) -> str:
+        """Generate a summary of the given text."""
+        return await self.service.generate_summary(text, max_length)
+
+    async def _generate_connections(self, concept: str, context: str) -> List[str]:
+        """Generate related concepts and connections."""
+        return await self.service._generate_connections(concept, context)
+
+    async def _validate_concept(self, concept: str) -> bool:
+        """Validate if a concept is valid and well-formed."""
+        return await self.service._validate_concept(concept)
@@ -3,53 +3,57 @@ Factory for creating LLM service instances.
 
 Selects the appropriate LLM service based on configuration.
 """
+import importlib
 import logging
+from functools import lru_cache
 from typing import Literal
 from llm_service.base import LLMService
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Provider name -> (module, service class, display name)
+_PROVIDERS = {
+    "openai": ("llm_service.openai_service", "OpenAIService", "OpenAI"),
+    "anthropic": ("llm_service.anthropic_service", "AnthropicService", "Anthropic"),
+    "qwen": ("llm_service.qwen_service", "QwenService", "Qwen"),
+    "gemini": ("llm_service.gemini_service", "GeminiService", "Google Gemini"),
+    "gemini-cli": ("llm_service.gemini_cli_service", "GeminiCLIService", "Gemini CLI"),
+}
+
 
 def get_llm_service() -> LLMService:
     """
     Get an LLM service instance based on configuration.
 
+    The service for each provider is created once and reused, so repeat
+    calls skip the SDK import and client setup.
+
     Returns:
         LLMService instance (OpenAI, Anthropic, Qwen, Gemini, or Gemini-CLI)
 
     Raises:
         ValueError: If LLM_PROVIDER is not supported
     """
-    provider = settings.LLM_PROVIDER.lower()
-
-    if provider == "openai":
-        from llm_service.openai_service import OpenAIService
-        logger.info("Using OpenAI LLM service")
-        return OpenAIService()
-
-    elif provider == "anthropic":
-        from llm_service.anthropic_service import AnthropicService
-        logger.info("Using Anthropic LLM service")
-        return AnthropicService()
-
-    elif provider == "qwen":
-        from llm_service.qwen_service import QwenService
-        logger.info("Using Qwen LLM service")
-        return QwenService()
-
-    elif provider == "gemini":
-        from llm_service.gemini_service import GeminiService
-        logger.info("Using Google Gemini LLM service")
-        return GeminiService()
-
-    elif provider == "gemini-cli":
-        from llm_service.gemini_cli_service import GeminiCLIService
-        logger.info("Using Gemini CLI LLM service")
-        return GeminiCLIService()
-
-    else:
+    return _create_llm_service(settings.LLM_PROVIDER.lower())
+
+
+@lru_cache(maxsize=None)
+def _create_llm_service(provider: str) -> LLMService:
+    """Import and instantiate the service for a provider."""
+    if provider not in _PROVIDERS:
         raise ValueError(
             f"Unsupported LLM provider: {provider}. "
             f"Supported providers: openai, anthropic, qwen, gemini, gemini-cli"
         )
+
+    module_name, class_name, display_name = _PROVIDERS[provider]
+    service_class = getattr(importlib.import_module(module_name), class_name)
+    logger.info(f"Using {display_name} LLM service")
+    service = service_class()
+
+    if settings.LLM_RESPONSE_CACHE:
+        from llm_service.caching import CachingLLMService
+        logger.info("LLM response cache enabled")
+        service = CachingLLMService(service)
+    return service
@@ -6,7 +6,13 @@ Provides LLM interactions using the gemini-cli command-line tool.
 import logging
 import subprocess
 from typing import Optional
-from llm_service.base import LLMService, LLMResponse
+from llm_service.base import (
+    LLMService,
+    LLMResponse,
+    _CONNECTIONS_SYS,
+    _SUMMARY_SYS,
+    _VALIDATE_SYS,
+)
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -57,7 +63,8 @@ class GeminiCLIService(LLMService):
             # Prepare the command
             cmd = ["gemini", "generate", "-m", self.model, "--no-stream"]
             
-            # Combine system prompt with user prompt
+            # The CLI has no system prompt option, so the system prompt is
+            # sent first to keep it a stable prefix of the input
             full_prompt = prompt
             if system_prompt:
                 full_prompt = f"{system_prompt}\n\n{full_prompt}"
@@ -99,17 +106,15 @@ Text:
 
 Summary:"""
 
-        system_prompt = "You are a helpful assistant that creates clear, concise summaries."
-
         response = await self.generate_text(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_SUMMARY_SYS,
             max_tokens=max_length // 4,  # Rough estimate: 4 chars per token
         )
 
         return response.content.strip()
 
-    async def generate_connections(self, concept: str, context: str) -> list[str]:
+    async def _generate_connections(self, concept: str, context: str) -> list[str]:
         """
         Generate related concepts and connections.
 
@@ -124,30 +129,22 @@ Summary:"""
 generate a list of 5-10 related concepts or ideas that connect to this concept.
 Return only the concept names, one per line, without numbering or bullets."""
 
-        system_prompt = (
-            "You are an expert at finding meaningful connections between ideas. "
-            "Generate only concrete, specific concepts."
-        )
-
         response = await self.generate_text(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_CONNECTIONS_SYS,
             max_tokens=500,
         )
 
         # Parse the response into a list of concepts
-        connections = [
-            line.strip() for line in response.content.split("\n") if line.strip()
-        ]
-        return connections[:10]  # Limit to 10
+        return self._parse_connections(response.content)
 
-    async def validate_concept(self, concept: str) -> bool:
+    async def _validate_concept(self, concept: str) -> bool:
         """Validate if a concept is valid and well-formed."""
-        prompt = f"""Is "{concept}" a valid, well-defined concept suitable for knowledge expansion?
-Answer only "yes" or "no"."""
+        prompt = f'Is "{concept}" a valid, well-defined concept suitable for knowledge expansion?'
 
         response = await self.generate_text(
             prompt=prompt,
+            system_prompt=_VALIDATE_SYS,
             temperature=0.0,  # Deterministic for validation
             max_tokens=10,
         )
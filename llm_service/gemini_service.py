@@ -4,8 +4,14 @@ Google Gemini LLM Service implementation.
 Provides LLM interactions using Google's Gemini API.
 """
 import logging
-from typing import Optional
-from llm_service.base import LLMService, LLMResponse
+from typing import Dict, Optional
+from llm_service.base import (
+    LLMService,
+    LLMResponse,
+    _CONNECTIONS_SYS,
+    _SUMMARY_SYS,
+    _VALIDATE_SYS,
+)
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -24,16 +30,27 @@ class GeminiService(LLMService):
             from google.generativeai import GenerativeModel
             self.genai = genai
             self.genai.configure(api_key=settings.GEMINI_API_KEY)
-            
-            # Create the generative model instance
-            self.model = GenerativeModel(settings.GEMINI_MODEL)
+            self._GenerativeModel = GenerativeModel
         except ImportError:
             raise ImportError(
                 "google-generativeai package not installed. "
                 "Install with: pip install google-generativeai"
             )
 
-        logger.info(f"Gemini service initialized with model: {settings.GEMINI_MODEL}")
+        self.model = settings.GEMINI_MODEL
+        # Model handles per system instruction, built on first use
+        self._models: Dict[Optional[str], object] = {}
+
+        logger.info(f"Gemini service initialized with model: {self.model}")
+
+    def _model_for(self, system_prompt: Optional[str]):
+        """Get the model handle carrying the given system instruction"""
+        model = self._models.get(system_prompt)
+        if model is None:
+            model = self._models[system_prompt] = self._GenerativeModel(
+                self.model, system_instruction=system_prompt
+            )
+        return model
 
     async def generate_text(
         self,
@@ -55,18 +72,15 @@ class GeminiService(LLMService):
             LLMResponse with generated content
         """
         try:
-            # Combine system prompt with user prompt if system prompt provided
-            final_prompt = prompt
-            if system_prompt:
-                final_prompt = f"{system_prompt}\n\n{prompt}"
-
             generation_config = {
                 "temperature": temperature,
                 "max_output_tokens": max_tokens,
             }
 
-            response = await self.model.generate_content_async(
-                final_prompt,
+            # The system prompt goes in as a system instruction rather than
+            # being pasted into the user turn, keeping it a stable prefix
+            response = await self._model_for(system_prompt).generate_content_async(
+                prompt,
                 generation_config=generation_config
             )
 
@@ -75,10 +89,10 @@ class GeminiService(LLMService):
             tokens_used = len(content.split()) if content else 0
 
             logger.debug(
-                f"Generated text with approximately {tokens_used} tokens using {settings.GEMINI_MODEL}"
+                f"Generated text with approximately {tokens_used} tokens using {self.model}"
             )
 
-            return LLMResponse(content, tokens_used, settings.GEMINI_MODEL)
+            return LLMResponse(content, tokens_used, self.model)
 
         except Exception as e:
             logger.error(f"Error generating text with Gemini: {e}")
@@ -94,17 +108,15 @@ Text:
 
 Summary:"""
 
-        system_prompt = "You are a helpful assistant that creates clear, concise summaries."
-
         response = await self.generate_text(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_SUMMARY_SYS,
             max_tokens=max_length // 4,  # Rough estimate: 4 chars per token
         )
 
         return response.content.strip()
 
-    async def generate_connections(self, concept: str, context: str) -> list[str]:
+    async def _generate_connections(self, concept: str, context: str) -> list[str]:
         """
         Generate related concepts and connections.
 
@@ -119,30 +131,22 @@ Summary:"""
 generate a list of 5-10 related concepts or ideas that connect to this concept.
 Return only the concept names, one per line, without numbering or bullets."""
 
-        system_prompt = (
-            "You are an expert at finding meaningful connections between ideas. "
-            "Generate only concrete, specific concepts."
-        )
-
         response = await self.generate_text(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_CONNECTIONS_SYS,
             max_tokens=500,
         )
 
         # Parse the response into a list of concepts
-        connections = [
-            line.strip() for line in response.content.split("\n") if line.strip()
-        ]
-        return connections[:10]  # Limit to 10
+        return self._parse_connections(response.content)
 
-    async def validate_concept(self, concept: str) -> bool:
+    async def _validate_concept(self, concept: str) -> bool:
         """Validate if a concept is valid and well-formed."""
-        prompt = f"""Is "{concept}" a valid, well-defined concept suitable for knowledge expansion?
-Answer only "yes" or "no"."""
+        prompt = f'Is "{concept}" a valid, well-defined concept suitable for knowledge expansion?'
 
         response = await self.generate_text(
             prompt=prompt,
+            system_prompt=_VALIDATE_SYS,
             temperature=0.0,  # Deterministic for validation
             max_tokens=10,
         )
@@ -5,7 +5,13 @@ Provides LLM interactions using OpenAI's API.
 """
 import logging
 from typing import Optional
-from llm_service.base import LLMService, LLMResponse
+from llm_service.base import (
+    LLMService,
+    LLMResponse,
+    _CONNECTIONS_SYS,
+    _SUMMARY_SYS,
+    _VALIDATE_SYS,
+)
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -88,17 +94,15 @@ Text:
 
 Summary:"""
 
-        system_prompt = "You are a helpful assistant that creates clear, concise summaries."
-
         response = await self.generate_text(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_SUMMARY_SYS,
             max_tokens=max_length // 4,  # Rough estimate: 4 chars per token
         )
 
         return response.content.strip()
 
-    async def generate_connections(self, concept: str, context: str) -> list[str]:
+    async def _generate_connections(self, concept: str, context: str) -> list[str]:
         """
         Generate related concepts and connections.
 
@@ -113,30 +117,22 @@ Summary:"""
 generate a list of 5-10 related concepts or ideas that connect to this concept.
 Return only the concept names, one per line, without numbering or bullets."""
 
-        system_prompt = (
-            "You are an expert at finding meaningful connections between ideas. "
-            "Generate only concrete, specific concepts."
-        )
-
         response = await self.generate_text(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=_CONNECTIONS_SYS,
             max_tokens=500,
         )
 
         # Parse the response into a list of concepts
-        connections = [
-            line.strip() for line in response.content.split("\n") if line.strip()
-        ]
-        return connections[:10]  # Limit to 10
+        return self._parse_connections(response.content)
 
-    async def validate_concept(self, concept: str) -> bool:
+    async def _validate_concept(self, concept: str) -> bool:
         """Validate if a concept is valid and well-formed."""
-        prompt = f"""Is "{concept}" a valid, well-defined concept suitable for knowledge expansion?
-Answer only "yes" or "no"."""
+        prompt = f'Is "{concept}" a valid, well-defined concept suitable for knowledge expansion?'
 
         response = await self.generate_text(
             prompt=prompt,
+            system_prompt=_VALIDATE_SYS,
             temperature=0.0,  # Deterministic for validation
             max_tokens=10,
         )
@@ -1,13 +1,16 @@
 """
 Tests for the Infinite Concept Expansion Engine main components.
 """
+import statistics
+import sys
+
 import pytest
 from core.concept_orchestrator import DefaultConceptOrchestrator, ExplorationTask, ExplorationState
 from agents.base import AgentManager, ResearchAgent, ConnectionAgent
 from knowledge_graph.engine import InMemoryKnowledgeGraphEngine, ConceptNode
 from data_pipeline.ingestion import MockDataIngestionPipeline
 from content_generation.multimodal import MockMultimodalContentGenerator
-from feedback_system.core import SelfImprovingFeedbackSystem
+from feedback_system.core import PerformanceMonitor, SelfImprovingFeedbackSystem
 from datetime import datetime
 
 
@@ -217,6 +220,184 @@ class TestFeedbackSystem:
         assert summary["total_feedback"] == 3
         assert 0.8 <= summary["average_rating"] <= 0.9  # Should be around 0.8
     
+    def test_invalid_ratings_rejected(self):
+        """Test that out-of-range and NaN ratings are not recorded"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        
+        assert feedback_system.record_user_feedback("item1", 1.01) is False
+        assert feedback_system.record_user_feedback("item1", -0.1) is False
+        assert feedback_system.record_system_feedback("quality", "item1", float("nan"), {}) is False
+        assert len(feedback_system.feedback_records) == 0
+    
+    def test_feedback_summary_only_counts_item(self):
+        """Test that summaries only include the requested item's feedback"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        feedback_system.record_user_feedback("item1", 0.9)
+        feedback_system.record_user_feedback("item2", 0.1)
+        feedback_system.record_system_feedback("quality", "item1", 0.5, {})
+        
+        summary = feedback_system.get_feedback_summary("item1")
+        
+        assert summary["total_feedback"] == 2
+        assert summary["average_rating"] == pytest.approx(0.7)
+        assert sorted(summary["feedback_types"]) == ["quality", "user_rating"]
+        assert summary["feedback_type_counts"] == {"user_rating": 1, "quality": 1}
+        assert feedback_system.get_feedback_summary("missing")["total_feedback"] == 0
+    
+    def test_feedback_and_signal_ids_are_unique(self):
+        """Test that generated IDs are unique within and across instances"""
+        first = SelfImprovingFeedbackSystem()
+        second = SelfImprovingFeedbackSystem()
+        for system in (first, second):
+            system.record_user_feedback("item1", 0.9)
+            system.record_user_feedback("item1", 0.1)
+        
+        ids = [f.id for system in (first, second) for f in system.feedback_records]
+        ids += [s.id for system in (first, second) for s in system.learning_signals]
+        
+        assert len(set(ids)) == len(ids) == 8
+    
+    def test_feedback_summary_aggregates(self):
+        """Test the running distribution and recent-feedback window"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        for rating in [0.1, 0.12, 0.5, 0.9, 0.9, 0.88, 0.3]:
+            feedback_system.record_user_feedback("item1", rating)
+        
+        summary = feedback_system.get_feedback_summary("item1")
+        
+        assert summary["rating_distribution"] == {0.1: 2, 0.5: 1, 0.9: 3, 0.3: 1}
+        assert summary["median_rating"] == 0.5
+        
+        feedback_system.record_user_feedback("item1", 0.95)
+        assert feedback_system.get_feedback_summary("item1")["median_rating"] == pytest.approx(0.7)
+        
+        summary = feedback_system.get_feedback_summary("item1")
+        assert [f.rating for f in summary["recent_feedback"]] == [0.9, 0.9, 0.88, 0.3, 0.95]
+    
+    def test_record_batch(self):
+        """Test batch ingestion skips invalid ratings and indexes the rest"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        
+        recorded = feedback_system.record_batch(
+            ["item1", "item2", "item1", "item3"], [0.9, 1.5, 0.1, float("nan")]
+        )
+        
+        assert recorded == 2
+        assert [f.item_id for f in feedback_system.feedback_records] == ["item1", "item1"]
+        assert feedback_system.get_feedback_summary("item1")["average_rating"] == pytest.approx(0.5)
+        assert [s.signal_type for s in feedback_system.get_learning_signals()] == ["positive", "negative"]
+        assert feedback_system.feedback_records[0].metadata == {"feedback_source": "user"}
+    
+    def test_feedback_strings_interned(self):
+        """Test that feedback types and sources share one string object"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        feedback_type = "".join(["eng", "agement"])
+        source = "".join(["mon", "itor"])
+        
+        feedback_system.record_system_feedback(feedback_type, "item1", 0.5, {"feedback_source": source})
+        feedback_system.record_batch(["item2"], [0.5], feedback_type="engagement")
+        
+        first, second = feedback_system.feedback_records
+        assert first.feedback_type is second.feedback_type
+        assert first.metadata["feedback_source"] is sys.intern("monitor")
+    
+    def test_bounded_history_evicts_oldest(self):
+        """Test that evicted feedback drops out of summaries and analyses"""
+        feedback_system = SelfImprovingFeedbackSystem(max_records=3, max_signals=2)
+        feedback_system.record_user_feedback("old", 0.9)
+        feedback_system.record_user_feedback("item1", 0.2)
+        feedback_system.record_user_feedback("item1", 0.6)
+        feedback_system.record_user_feedback("item1", 0.4)
+        
+        assert len(feedback_system.feedback_records) == 3
+        assert len(feedback_system.get_learning_signals()) == 2
+        assert feedback_system.get_feedback_summary("old")["total_feedback"] == 0
+        
+        summary = feedback_system.get_feedback_summary("item1")
+        assert summary["total_feedback"] == 3
+        assert summary["average_rating"] == pytest.approx(0.4)
+        assert summary["median_rating"] == 0.4
+        
+        analysis = feedback_system.analyze_expansion_patterns()
+        assert analysis["common_patterns"] == []
+        assert analysis["most_successful_expansion_types"]["unknown"] == pytest.approx(0.4)
+    
+    def test_analyses_cached_until_new_feedback(self):
+        """Test that analyses are reused between inserts and refreshed after"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        feedback_system.record_user_feedback("item1", 0.2)
+        
+        analysis = feedback_system.analyze_expansion_patterns()
+        recommendations = feedback_system.get_improvement_recommendations()
+        cached_analysis = feedback_system._analysis_cache[1]
+        cached_recommendations = feedback_system._recommendations_cache[1]
+        assert feedback_system.analyze_expansion_patterns() == analysis
+        assert feedback_system.get_improvement_recommendations() == recommendations
+        assert feedback_system._analysis_cache[1] is cached_analysis
+        assert feedback_system._recommendations_cache[1] is cached_recommendations
+        
+        feedback_system.record_user_feedback("item1", 0.9)
+        
+        refreshed = feedback_system.analyze_expansion_patterns()
+        assert feedback_system._analysis_cache[1] is not cached_analysis
+        assert refreshed["most_successful_expansion_types"]["unknown"] == pytest.approx(0.55)
+        feedback_system.get_improvement_recommendations()
+        assert feedback_system._recommendations_cache[1] is not cached_recommendations
+    
+    def test_cached_analyses_not_shared_with_callers(self):
+        """Test that modifying a returned analysis does not change later results"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        feedback_system.record_user_feedback("item1", 0.2)
+        
+        analysis = feedback_system.analyze_expansion_patterns()
+        analysis["most_successful_expansion_types"].clear()
+        feedback_system.get_improvement_recommendations()[0]["priority"] = "low"
+        
+        assert feedback_system.analyze_expansion_patterns()["most_successful_expansion_types"]
+        assert feedback_system.get_improvement_recommendations()[0]["priority"] == "high"
+    
+    def test_improvement_recommendations_from_metrics(self):
+        """Test that low-rated feedback types produce prioritized recommendations"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        feedback_system.record_system_feedback("quality", "a", 0.4, {})
+        feedback_system.record_system_feedback("quality", "b", 0.5, {})
+        feedback_system.record_user_feedback("c", 0.9)
+        
+        recommendations = feedback_system.get_improvement_recommendations()
+        
+        assert feedback_system.performance_metrics["quality"].values().tolist() == [0.4, 0.5]
+        assert [r["target"] for r in recommendations] == ["quality feedback"]
+        assert recommendations[0]["priority"] == "high"
+    
+    def test_improvement_recommendations_follow_window(self):
+        """Test that evicted ratings no longer count towards recommendations"""
+        feedback_system = SelfImprovingFeedbackSystem(max_records=2)
+        feedback_system.record_system_feedback("quality", "a", 0.1, {})
+        feedback_system.record_user_feedback("b", 0.9)
+        feedback_system.record_system_feedback("quality", "c", 0.9, {})
+        
+        assert feedback_system.performance_metrics["quality"].values().tolist() == [0.9]
+        recommendations = feedback_system.get_improvement_recommendations()
+        assert "quality feedback" not in [r["target"] for r in recommendations]
+        
+        feedback_system.record_system_feedback("quality", "d", 0.9, {})
+        assert "user_rating" not in feedback_system.performance_metrics
+    
+    def test_expansion_patterns_by_type(self):
+        """Test that expansion pattern analysis groups ratings by expansion type"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        feedback_system.record_system_feedback("quality", "a", 0.9, {"expansion_type": "deep"})
+        feedback_system.record_system_feedback("quality", "b", 0.7, {"expansion_type": "deep"})
+        feedback_system.record_user_feedback("c", 0.2)
+        
+        analysis = feedback_system.analyze_expansion_patterns()
+        
+        success = analysis["most_successful_expansion_types"]
+        assert success["deep"] == pytest.approx(0.8)
+        assert success["unknown"] == pytest.approx(0.2)
+        assert analysis["common_patterns"][0]["data"]["total_samples"] == 1
+        assert analysis["improvement_opportunities"][0]["data"]["total_samples"] == 1
+    
     def test_learning_signals(self):
         """Test that feedback generates learning signals"""
         feedback_system = SelfImprovingFeedbackSystem()
@@ -252,4 +433,59 @@ def test_integration():
     agent_responses = agent_manager.execute_task(task)
     assert len(agent_responses) > 0
     
-    print("✅ Integration test passed! All components work together.")
\ No newline at end of file
+    print("✅ Integration test passed! All components work together.")
+
+
+class TestFeedbackStatistics:
+    """Tests for feedback statistics on large samples"""
+    
+    def test_large_sample_statistics_match_pure_python(self):
+        """Test that NumPy-computed features match the statistics module"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        ratings = [0.8 + (i % 20) / 100 for i in range(200)]
+        for i, rating in enumerate(ratings):
+            feedback_system.record_user_feedback(f"item{i}", rating)
+        
+        features = feedback_system._extract_common_features(feedback_system.feedback_records)
+        
+        assert features["total_samples"] == 200
+        assert features["average_rating"] == pytest.approx(statistics.mean(ratings))
+        assert features["rating_std_dev"] == pytest.approx(statistics.stdev(ratings))
+        assert features["common_sources"] == "user_rating"
+    
+    def test_common_sources_tracks_bucket_types(self):
+        """Test that the most common feedback type follows inserts and evictions"""
+        feedback_system = SelfImprovingFeedbackSystem(max_records=3)
+        feedback_system.record_system_feedback("quality", "a", 0.9, {})
+        feedback_system.record_system_feedback("quality", "b", 0.9, {})
+        feedback_system.record_user_feedback("c", 0.9)
+        
+        patterns = feedback_system.analyze_expansion_patterns()["common_patterns"]
+        assert patterns[0]["data"]["common_sources"] == "quality"
+        
+        feedback_system.record_user_feedback("d", 0.9)
+        feedback_system.record_user_feedback("e", 0.9)
+        
+        patterns = feedback_system.analyze_expansion_patterns()["common_patterns"]
+        assert patterns[0]["data"]["common_sources"] == "user_rating"
+
+
+class TestPerformanceMonitor:
+    """Tests for the performance monitor"""
+    
+    def test_generate_system_feedback_averages_metrics(self):
+        """Test that logged metrics become averaged system feedback"""
+        feedback_system = SelfImprovingFeedbackSystem()
+        monitor = PerformanceMonitor(feedback_system)
+        for value in [0.2, 0.4, 0.6]:
+            monitor.log_metric("latency_score", value)
+        monitor.log_metric("throughput", 3.0)
+        
+        monitor.generate_system_feedback()
+        
+        records = {f.feedback_type: f for f in feedback_system.feedback_records}
+        assert records["latency_score"].rating == pytest.approx(0.4)
+        assert records["latency_score"].metadata["sample_count"] == 3
+        assert records["throughput"].rating == 1.0  # Clamped
+        assert records["throughput"].timestamp is records["latency_score"].timestamp
+        assert monitor.metrics == {}
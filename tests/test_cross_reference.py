@@ -0,0 +1,192 @@
+"""
+Tests for the cross-referencing and fact verification engine.
+
+This module tests:
+- Concurrent, cached and persisted fact verification
+- Claim extraction
+- Contradiction detection between similar concepts
+- Content relevance scoring
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from core.concept_orchestrator import ConceptNode
+from data_pipeline.real_ingestion import RealDataIngestionResult
+from knowledge_graph.cross_reference_engine import (
+    CrossReferenceEngine,
+    FactCheckStore,
+    FactStatus,
+)
+from knowledge_graph.engine import InMemoryKnowledgeGraphEngine
+
+
+class FakePipeline:
+    """Data pipeline returning one neutral result per source."""
+
+    def __init__(self, content_by_source=None):
+        self.queries = []
+        self.content_by_source = content_by_source or {}
+
+    async def comprehensive_search(self, query, sources=None):
+        self.queries.append(query)
+        await asyncio.sleep(0)
+        return {
+            source: RealDataIngestionResult(
+                success=True,
+                data=[{
+                    "title": query,
+                    "content": self.content_by_source.get(source, "neutral text"),
+                    "url": f"https://{source}/{query}",
+                }],
+                source=source,
+                timestamp=datetime.now(),
+                metadata={}
+            )
+            for source in sources or []
+        }
+
+
+def _node(node_id, concept, content=""):
+    """Build a concept node for tests."""
+    return ConceptNode(
+        id=node_id,
+        concept=concept,
+        content=content,
+        metadata={},
+        created_at=datetime.now(),
+        connections=[]
+    )
+
+
+@pytest.fixture
+def engine():
+    """Cross-reference engine over an empty graph and a fake pipeline."""
+    return CrossReferenceEngine(InMemoryKnowledgeGraphEngine(), FakePipeline())
+
+
+class TestFactVerification:
+    """Tests for fact verification."""
+
+    def test_repeated_claim_served_from_cache(self, engine):
+        """Test that verifying a claim twice searches only once."""
+        first = asyncio.run(engine.verify_fact("Water boils at one hundred degrees"))
+        second = asyncio.run(engine.verify_fact("Water boils at one hundred degrees"))
+
+        assert second is first
+        assert len(engine.data_pipeline.queries) == 1
+
+    def test_concurrent_duplicates_share_one_search(self, engine):
+        """Test that concurrent verifications of one claim are coalesced."""
+        async def verify_many():
+            return await asyncio.gather(
+                *(engine.verify_fact("Light travels very fast") for _ in range(5))
+            )
+
+        results = asyncio.run(verify_many())
+
+        assert all(result is results[0] for result in results)
+        assert len(engine.data_pipeline.queries) == 1
+
+    def test_persisted_fact_check_survives_new_engine(self, tmp_path):
+        """Test that a stored fact check is reused by a fresh engine."""
+        store = FactCheckStore(tmp_path / "fact_checks.db")
+        first_engine = CrossReferenceEngine(InMemoryKnowledgeGraphEngine(), FakePipeline(), store)
+        original = asyncio.run(first_engine.verify_fact("Paris is the capital of France"))
+
+        second_engine = CrossReferenceEngine(InMemoryKnowledgeGraphEngine(), FakePipeline(), store)
+        restored = asyncio.run(second_engine.verify_fact("Paris is the capital of France"))
+
+        assert second_engine.data_pipeline.queries == []
+        assert restored == original
+
+    def test_sources_recorded_by_stance(self):
+        """Test that supporting and contradicting sources are listed by URL."""
+        engine = CrossReferenceEngine(
+            InMemoryKnowledgeGraphEngine(),
+            FakePipeline({"academic": "a study confirms it", "news": "a report refutes it"}),
+        )
+
+        result = asyncio.run(engine.verify_fact("Coffee boosts alertness"))
+
+        assert result.status == FactStatus.DISPUTED
+        assert [s.split("/")[2] for s in result.supporting_sources] == ["academic"]
+        assert [s.split("/")[2] for s in result.contradicting_sources] == ["news"]
+
+    def test_contradicted_claim_debunked(self):
+        """Test that a claim contradicted by more sources than support it is debunked."""
+        engine = CrossReferenceEngine(
+            InMemoryKnowledgeGraphEngine(),
+            FakePipeline({"academic": "a review contradicts it", "news": "a report refutes it"}),
+        )
+
+        result = asyncio.run(engine.verify_fact("Coffee boosts alertness"))
+
+        assert result.status == FactStatus.DEBUNKED
+        assert result.supporting_sources == []
+        assert len(result.contradicting_sources) == 2
+
+    def test_cross_reference_node_verifies_every_claim(self, engine):
+        """Test that all claims of a node are verified."""
+        content = "The sun is a star at the centre. The moon is a natural satellite."
+        engine.knowledge_graph.nodes["n1"] = _node("n1", "Astronomy", content)
+
+        result = asyncio.run(engine.cross_reference_node("n1"))
+
+        assert result["total_claims"] == 2
+        assert engine.fact_checks
+        assert all(fc.status == FactStatus.DISPUTED for fc in engine.fact_checks.values())
+
+
+class TestClaimAnalysis:
+    """Tests for claim extraction and contradiction detection."""
+
+    def test_extract_claims(self, engine):
+        """Test that only long claim-like sentences are extracted."""
+        content = "Short one is. Research shows that sleep improves memory! Hello there friends and family?"
+
+        claims = engine._extract_claims_from_content(content)
+
+        assert claims == ["Research shows that sleep improves memory"]
+
+    def test_detect_contradictions_between_similar_concepts(self, engine):
+        """Test that contradicting claims on similar concepts are reported."""
+        nodes = engine.knowledge_graph.nodes
+        nodes["n1"] = _node("n1", "Quantum computing", "Quantum computers are not faster for every task.")
+        nodes["n2"] = _node("n2", "quantum Computing", "Quantum computers are faster than classical machines.")
+        nodes["n3"] = _node("n3", "Cell biology", "Cells are not the smallest unit of matter at all.")
+
+        contradictions = asyncio.run(engine.detect_contradictions())
+
+        assert len(contradictions) == 1
+        assert (contradictions[0]["node1_id"], contradictions[0]["node2_id"]) == ("n1", "n2")
+        assert contradictions[0]["similarity"] == pytest.approx(1.0)
+
+    def test_contradictory_claims_respect_limit(self, engine):
+        """Test that the contradiction scan stops at the requested limit."""
+        claims1 = ["Cats are not dogs", "Water is not dry", "Nothing here"]
+        claims2 = ["Cats are mammals", "Water is wet"]
+
+        assert len(engine._find_contradictory_claims(claims1, claims2)) == 4
+        assert engine._find_contradictory_claims(claims1, claims2, limit=3) == [
+            ("Cats are not dogs", "Cats are mammals"),
+            ("Cats are not dogs", "Water is wet"),
+            ("Water is not dry", "Cats are mammals"),
+        ]
+
+    def test_content_relevance_uses_full_item_text(self, engine):
+        """Test that relevance counts words from the item title and body."""
+        node = _node("n1", "Cats", "purr loudly")
+        item = {"title": "Cats", "description": "often PURR"}
+
+        assert engine._calculate_content_relevance(node, item) == pytest.approx(2 / 3)
+
+    def test_content_relevance_follows_content_changes(self, engine):
+        """Test that cached node words are rebuilt after content changes."""
+        node = _node("n1", "Cats", "purr loudly")
+        item = {"title": "dogs bark"}
+        engine._calculate_content_relevance(node, item)
+
+        node.content = "dogs bark"
+
+        assert engine._calculate_content_relevance(node, item) == pytest.approx(2 / 3)
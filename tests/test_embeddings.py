@@ -0,0 +1,363 @@
+"""
+Tests for the embedding service.
+
+Covers:
+- Batch encoding order preservation
+- Batch deduplication and cache reuse
+- Persisted, memory-mapped embedding matrices
+- Fallback embeddings
+- Similarity search
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from cache.cache_manager import LocalMemoryCache, get_cache, set_cache
+from config.settings import settings
+from embeddings.service import EmbeddingService
+from embeddings import service as embedding_service_module
+
+
+def _fake_model():
+    """Build a stand-in model whose embedding is the text length."""
+    model = Mock()
+    model.encode.side_effect = lambda texts, **kwargs: np.array(
+        [[float(len(text)), 1.0] for text in texts], dtype=np.float32
+    )
+    return model
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Embedding service running on the fallback path without caching."""
+    monkeypatch.setattr(settings, "ENABLE_CACHING", False)
+    svc = EmbeddingService()
+    svc.model = None
+    svc.use_sentence_transformers = False
+    return svc
+
+
+class TestEncodeBatch:
+    """Tests for batch encoding."""
+
+    def test_model_receives_length_sorted_texts(self, service):
+        """Test that texts are handed to the model shortest first."""
+        service.model = _fake_model()
+        service.use_sentence_transformers = True
+
+        service.encode_batch(["medium text", "a", "the longest text of all"])
+
+        sent = service.model.encode.call_args[0][0]
+        assert sent == ["a", "medium text", "the longest text of all"]
+
+    def test_output_keeps_input_order(self, service):
+        """Test that sorted batches are restored to the caller's order."""
+        service.model = _fake_model()
+        service.use_sentence_transformers = True
+        texts = ["medium text", "a", "the longest text of all"]
+
+        embeddings = service.encode_batch(texts)
+
+        assert embeddings.dtype == np.float32
+        assert embeddings[:, 0].tolist() == [float(len(t)) for t in texts]
+
+    def test_fallback_batch_matches_single_encode(self, service):
+        """Test that fallback batch rows equal per-text fallback embeddings."""
+        texts = ["alpha", "beta gamma", ""]
+
+        embeddings = service.encode_batch(texts)
+
+        assert embeddings.shape == (3, service.embedding_dim)
+        for row, text in zip(embeddings, texts):
+            assert np.array_equal(row, service._generate_fallback_embedding(text))
+
+    def test_duplicates_encoded_once(self, service):
+        """Test that repeated texts reach the model only once."""
+        service.model = _fake_model()
+        service.use_sentence_transformers = True
+
+        embeddings = service.encode_batch(["ab", "abc", "ab", "ab"])
+
+        assert service.model.encode.call_args[0][0] == ["ab", "abc"]
+        assert embeddings[:, 0].tolist() == [2.0, 3.0, 2.0, 2.0]
+
+    def test_empty_batch(self, service):
+        """Test that an empty batch yields an empty matrix."""
+        embeddings = service.encode_batch([])
+
+        assert embeddings.shape == (0, service.embedding_dim)
+
+    def test_cached_texts_skip_model(self, service, monkeypatch):
+        """Test that only cache misses are sent to the model."""
+        original_cache = get_cache()
+        set_cache(LocalMemoryCache())
+        monkeypatch.setattr(settings, "ENABLE_CACHING", True)
+        service.model = _fake_model()
+        service.use_sentence_transformers = True
+
+        try:
+            service.encode_batch(["cached text"])
+            embeddings = service.encode_batch(["cached text", "new"])
+        finally:
+            set_cache(original_cache)
+
+        assert service.model.encode.call_args[0][0] == ["new"]
+        assert embeddings[:, 0].tolist() == [11.0, 3.0]
+
+    def test_cache_key_covers_full_text(self, service):
+        """Test that texts sharing a long prefix get distinct cache keys."""
+        prefix = "x" * 100
+
+        assert service._cache_key(prefix + "a") != service._cache_key(prefix + "b")
+        assert service._cache_key("same") == service._cache_key("same")
+
+
+class TestFallbackEmbedding:
+    """Tests for the character-frequency fallback embedding."""
+
+    def test_ascii_frequencies_in_code_point_order(self, service):
+        """Test that ASCII characters are counted and normalised by the max."""
+        embedding = service._generate_fallback_embedding("Baa c!")
+
+        assert embedding[:3].tolist() == [1.0, 0.5, 0.5]
+        assert embedding[3] == 0.0
+
+    def test_non_ascii_matches_ascii_layout(self, service):
+        """Test that non-ASCII text uses the same frequency layout."""
+        embedding = service._generate_fallback_embedding("ééa")
+
+        assert embedding[:2].tolist() == [0.5, 1.0]
+
+    def test_length_feature(self, service):
+        """Test that the text length is written to its fixed slot."""
+        embedding = service._generate_fallback_embedding("x" * 500)
+
+        start = service.embedding_dim // 4
+        assert np.allclose(embedding[start:start + 10], 0.5)
+        assert embedding[start + 10] == 0.0
+
+
+class TestFindSimilar:
+    """Tests for similarity search."""
+
+    def test_results_sorted_and_thresholded(self, service):
+        """Test that results are ordered by score and respect the threshold."""
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        candidates = np.array(
+            [[0.0, 1.0], [1.0, 0.0], [1.0, 1.0]], dtype=np.float32
+        )
+
+        results = service.find_similar(query, candidates, top_k=5, threshold=0.5)
+
+        assert [idx for idx, _ in results] == [1, 2]
+        assert results[0][1] == pytest.approx(1.0)
+        assert results[1][1] == pytest.approx(np.sqrt(0.5))
+
+    def test_top_k_smaller_than_candidates(self, service):
+        """Test that only the best top_k candidates are returned."""
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        angles = np.linspace(0.0, np.pi / 2, 20)
+        candidates = np.stack([np.cos(angles), np.sin(angles)], axis=1)[::-1]
+
+        results = service.find_similar(query, candidates, top_k=3)
+
+        assert [idx for idx, _ in results] == [19, 18, 17]
+
+    def test_prenormalized_candidates(self, service):
+        """Test that pre-normalized candidates give the same scores."""
+        rng = np.random.default_rng(0)
+        query = rng.random(8, dtype=np.float32)
+        candidates = rng.random((10, 8), dtype=np.float32)
+
+        expected = service.find_similar(query, candidates, top_k=10)
+        results = service.find_similar(
+            query, service.normalize(candidates), top_k=10, normalized=True
+        )
+
+        assert [idx for idx, _ in results] == [idx for idx, _ in expected]
+        assert [score for _, score in results] == pytest.approx(
+            [score for _, score in expected]
+        )
+
+    def test_float64_query_keeps_float32_scan(self, service):
+        """Test that a double-precision query matches a float32 query."""
+        rng = np.random.default_rng(1)
+        candidates = rng.random((10, 8), dtype=np.float32)
+        query = rng.random(8)
+
+        expected = service.find_similar(query.astype(np.float32), candidates, top_k=10)
+        results = service.find_similar(query, candidates, top_k=10)
+
+        assert results == expected
+
+    def test_simsimd_matches_numpy(self, service):
+        """Test that the SimSIMD backend ranks like the NumPy scan."""
+        pytest.importorskip("simsimd")
+        rng = np.random.default_rng(2)
+        query = rng.random(8, dtype=np.float32)
+        candidates = rng.random((10, 8), dtype=np.float32)
+
+        expected = service.find_similar(query, candidates, top_k=10)
+        results = service.find_similar(query, candidates, top_k=10, use_simsimd=True)
+
+        assert [idx for idx, _ in results] == [idx for idx, _ in expected]
+        assert [score for _, score in results] == pytest.approx(
+            [score for _, score in expected], abs=1e-5
+        )
+
+    def test_quantized_rows_keep_direction(self, service):
+        """Test that int8 rows span the int8 range and keep their cosine."""
+        rng = np.random.default_rng(3)
+        candidates = rng.standard_normal((5, 16)).astype(np.float32)
+        candidates[0] = 0.0
+
+        quantized = service.quantize_int8(candidates)
+
+        assert quantized.dtype == np.int8
+        assert not quantized[0].any()
+        assert np.abs(quantized[1:]).max(axis=1).tolist() == [127] * 4
+        for row, original in zip(quantized[1:], candidates[1:]):
+            assert service.similarity(row.astype(np.float32), original) > 0.99
+
+    def test_simsimd_int8_ranking(self, service):
+        """Test that int8 candidates scored by SimSIMD rank like float32."""
+        pytest.importorskip("simsimd")
+        rng = np.random.default_rng(4)
+        query = rng.standard_normal(32).astype(np.float32)
+        candidates = rng.standard_normal((10, 32)).astype(np.float32)
+
+        expected = service.find_similar(query, candidates, top_k=3)
+        results = service.find_similar(
+            query, service.quantize_int8(candidates), top_k=3, use_simsimd=True
+        )
+
+        assert [idx for idx, _ in results] == [idx for idx, _ in expected]
+
+    def test_int8_ranking_without_simsimd(self, service, monkeypatch):
+        """Test that int8 candidates are scored without SimSIMD too."""
+        monkeypatch.setattr(embedding_service_module, "HAS_SIMSIMD", False)
+        rng = np.random.default_rng(4)
+        query = rng.standard_normal(32).astype(np.float32)
+        candidates = rng.standard_normal((10, 32)).astype(np.float32)
+
+        expected = service.find_similar(query, candidates, top_k=3)
+        results = service.find_similar(
+            query, service.quantize_int8(candidates), top_k=3, use_simsimd=True
+        )
+
+        assert [idx for idx, _ in results] == [idx for idx, _ in expected]
+        assert [score for _, score in results] == pytest.approx(
+            [score for _, score in expected], abs=1e-2
+        )
+
+    def test_scores_written_to_buffer(self, service):
+        """Test that a provided score buffer is filled and results unchanged."""
+        rng = np.random.default_rng(5)
+        query = rng.random(8, dtype=np.float32)
+        candidates = service.normalize(rng.random((10, 8), dtype=np.float32))
+        buffer = np.full(10, np.nan, dtype=np.float32)
+
+        expected = service.find_similar(query, candidates, top_k=3, normalized=True)
+        results = service.find_similar(
+            query, candidates, top_k=3, normalized=True, out=buffer
+        )
+
+        assert results == expected
+        assert not np.isnan(buffer).any()
+
+
+class TestSimilarity:
+    """Tests for pairwise cosine similarity."""
+
+    def test_matches_cosine_formula(self, service):
+        """Test that the score equals the textbook cosine."""
+        a = np.array([1.0, 2.0, 3.0], dtype=np.float32)
+        b = np.array([[3.0, 2.0, 1.0]], dtype=np.float32)
+
+        expected = np.dot(a, b[0]) / (np.linalg.norm(a) * np.linalg.norm(b[0]))
+
+        assert service.similarity(a, b) == pytest.approx(expected)
+
+    def test_zero_vector_scores_zero(self, service):
+        """Test that a zero vector is dissimilar to everything."""
+        zero = np.zeros(3, dtype=np.float32)
+
+        assert service.similarity(zero, np.ones(3, dtype=np.float32)) == 0.0
+
+
+class TestDeviceSelection:
+    """Tests for embedding device resolution."""
+
+    def test_cpu_is_honoured(self):
+        """Test that an explicit CPU device is kept."""
+        assert EmbeddingService._resolve_device("cpu") == "cpu"
+
+    def test_cuda_falls_back_without_gpu(self, monkeypatch):
+        """Test that a CUDA request degrades to CPU when no GPU is present."""
+        torch = pytest.importorskip("torch")
+        monkeypatch.setattr(torch.cuda, "is_available", lambda: False)
+
+        assert EmbeddingService._resolve_device("cuda") == "cpu"
+
+
+class TestModelSharing:
+    """Tests for model reuse across service instances."""
+
+    def test_services_share_loaded_model(self):
+        """Test that two services for the same model reuse one instance."""
+        pytest.importorskip("sentence_transformers")
+
+        first = EmbeddingService()
+        second = EmbeddingService()
+
+        assert first.model is second.model
+
+
+class TestPersistence:
+    """Tests for persisted embedding matrices."""
+
+    def test_persist_and_load_round_trip(self, service, tmp_path):
+        """Test that a persisted matrix reloads as a memory map."""
+        texts = ["alpha", "beta", "gamma"]
+
+        embeddings = service.persist(tmp_path / "corpus", texts)
+        loaded, index = service.load(tmp_path / "corpus")
+
+        assert isinstance(loaded, np.memmap)
+        assert np.array_equal(loaded, embeddings)
+        assert index[service.text_key("beta")] == 1
+
+    def test_loaded_matrix_is_searchable(self, service, tmp_path):
+        """Test that find_similar works directly over the memory map."""
+        texts = ["alpha", "beta", "gamma"]
+        service.persist(tmp_path / "corpus", texts)
+        loaded, _ = service.load(tmp_path / "corpus")
+
+        results = service.find_similar(service.encode("beta"), loaded, top_k=1)
+
+        assert results[0][0] == 1
+
+    def test_load_rejects_other_model(self, service, tmp_path):
+        """Test that matrices from another model are refused."""
+        service.persist(tmp_path / "corpus", ["alpha"])
+        service.model_name = "other-model"
+
+        with pytest.raises(ValueError):
+            service.load(tmp_path / "corpus")
+
+    def test_load_rejects_other_backend(self, service, tmp_path):
+        """Test that fallback and model embeddings are not mixed up."""
+        service.persist(tmp_path / "corpus", ["alpha"])
+        service.use_sentence_transformers = not service.use_sentence_transformers
+
+        with pytest.raises(ValueError):
+            service.load(tmp_path / "corpus")
+
+    def test_dotted_base_path_kept(self, service, tmp_path):
+        """Test that a dotted base name is extended, not replaced."""
+        service.persist(tmp_path / "corpus.v2", ["alpha"])
+
+        assert (tmp_path / "corpus.v2.npy").exists()
+        assert (tmp_path / "corpus.v2.json").exists()
+        assert service.load(tmp_path / "corpus.v2")[1] == {service.text_key("alpha"): 0}
@@ -76,6 +76,27 @@ class TestNodeOperations:
         assert result2 is False
         assert graph.get_node_count() == 1
 
+    def test_add_nodes_batch(self):
+        """Test that bulk-added nodes are stored and searchable like single adds."""
+        single = InMemoryKnowledgeGraphEngine()
+        bulk = InMemoryKnowledgeGraphEngine()
+        nodes = [
+            ConceptNode(
+                id=f"node{i}", concept=f"Concept {i}", content=f"content about topic {i}",
+                metadata={}, created_at=datetime.now(), connections=[]
+            )
+            for i in range(4)
+        ]
+        for node in nodes:
+            single.add_node(node)
+
+        added = bulk.add_nodes(nodes + [nodes[0]])
+
+        assert added == [True, True, True, True, False]
+        assert bulk.get_node_count() == 4
+        for node_id, embedding in single.embeddings.items():
+            assert bulk.embeddings[node_id] == pytest.approx(embedding, abs=1e-6)
+
     def test_get_nonexistent_node(self):
         """Test retrieving a non-existent node."""
         graph = InMemoryKnowledgeGraphEngine()
@@ -229,6 +250,31 @@ class TestEdgeOperations:
         assert "node2" in node1_updated.connections
         assert "node1" in node2_updated.connections
 
+    def test_parallel_edges_keep_connections_unique(self):
+        """Test that repeated edges and outside appends never duplicate connections."""
+        graph = InMemoryKnowledgeGraphEngine()
+        for i in range(3):
+            graph.add_node(ConceptNode(
+                id=f"node{i}", concept=f"C{i}", content=f"content{i}",
+                metadata={}, created_at=datetime.now(), connections=[]
+            ))
+
+        for i in range(3):
+            graph.add_edge(GraphEdge(
+                id=f"edge{i}", source_node_id="node0", target_node_id="node1",
+                relationship_type="related_to", weight=0.5,
+                created_at=datetime.now(), metadata={}
+            ))
+        graph.get_node("node0").connections.append("node2")
+        graph.add_edge(GraphEdge(
+            id="edge3", source_node_id="node2", target_node_id="node0",
+            relationship_type="related_to", weight=0.5,
+            created_at=datetime.now(), metadata={}
+        ))
+
+        assert graph.get_node("node0").connections == ["node1", "node2"]
+        assert graph.get_node("node1").connections == ["node0"]
+
 
 class TestNeighborRetrieval:
     """Tests for retrieving neighboring nodes."""
@@ -334,6 +380,57 @@ class TestNeighborRetrieval:
 
         assert len(neighbors) == 0
 
+    def test_get_neighbors_self_loop_and_parallel_edges(self):
+        """Test that a self-loop counts once and parallel edges repeat."""
+        graph = InMemoryKnowledgeGraphEngine()
+
+        for i in range(2):
+            graph.add_node(ConceptNode(
+                id=f"node{i}", concept=f"C{i}", content=f"content{i}",
+                metadata={}, created_at=datetime.now(), connections=[]
+            ))
+
+        for edge_id, source, target in [
+            ("loop", "node0", "node0"),
+            ("first", "node1", "node0"),
+            ("second", "node0", "node1"),
+        ]:
+            graph.add_edge(GraphEdge(
+                id=edge_id, source_node_id=source, target_node_id=target,
+                relationship_type="related_to", weight=0.5,
+                created_at=datetime.now(), metadata={}
+            ))
+
+        assert [n.id for n in graph.get_neighbors("node0")] == ["node0", "node1", "node1"]
+        assert [n.id for n in graph.get_neighbors("node1")] == ["node0", "node0"]
+
+    def test_cached_neighbors_follow_new_edges(self):
+        """Test that repeated lookups are cached and refreshed by add_edge."""
+        graph = InMemoryKnowledgeGraphEngine()
+        for i in range(3):
+            graph.add_node(ConceptNode(
+                id=f"node{i}", concept=f"C{i}", content=f"content{i}",
+                metadata={}, created_at=datetime.now(), connections=[]
+            ))
+        graph.add_edge(GraphEdge(
+            id="edge1", source_node_id="node0", target_node_id="node1",
+            relationship_type="related_to", weight=0.8,
+            created_at=datetime.now(), metadata={}
+        ))
+
+        graph.get_neighbors("node0")
+        graph.get_neighbors("node0").clear()
+        assert "node0" in graph._neighbor_cache
+        assert [n.id for n in graph.get_neighbors("node0")] == ["node1"]
+
+        graph.add_edge(GraphEdge(
+            id="edge2", source_node_id="node2", target_node_id="node0",
+            relationship_type="related_to", weight=0.8,
+            created_at=datetime.now(), metadata={}
+        ))
+
+        assert [n.id for n in graph.get_neighbors("node0")] == ["node1", "node2"]
+
 
 class TestGraphQueries:
     """Tests for graph query operations."""
@@ -375,6 +472,83 @@ class TestGraphQueries:
         assert isinstance(similar, list)
         assert len(similar) > 0
 
+    def test_find_similar_nodes_after_matrix_growth(self, monkeypatch):
+        """Test that similarity search sees nodes added after the matrix grows."""
+        import knowledge_graph.engine as engine_module
+        monkeypatch.setattr(engine_module, "INITIAL_EMBEDDING_CAPACITY", 2)
+        graph = InMemoryKnowledgeGraphEngine()
+
+        for i, word in enumerate(["alpha", "bravo", "charlie", "delta", "echo"]):
+            graph.add_node(ConceptNode(
+                id=f"node{i}", concept=word, content=word * 3,
+                metadata={}, created_at=datetime.now(), connections=[]
+            ))
+
+        similar = graph.find_similar_nodes("echo " + "echo" * 3, limit=2)
+
+        assert len(graph.embeddings) == 5
+        assert similar[0].nodes[0].id == "node4"
+        assert similar[0].score == pytest.approx(1.0, abs=1e-5)
+
+    def test_find_similar_nodes_with_ann_index(self, monkeypatch):
+        """Test that the HNSW index finds the same best match as the exact scan."""
+        pytest.importorskip("hnswlib")
+        import knowledge_graph.engine as engine_module
+        monkeypatch.setattr(engine_module, "INITIAL_EMBEDDING_CAPACITY", 2)
+
+        exact = InMemoryKnowledgeGraphEngine()
+        approximate = InMemoryKnowledgeGraphEngine(use_ann=True)
+        nodes = [
+            ConceptNode(
+                id=f"node{i}", concept=concept, content=f"About {concept}",
+                metadata={}, created_at=datetime.now(), connections=[]
+            )
+            for i, concept in enumerate(["Cats", "Dogs", "Quantum physics", "Jazz music", "Bread"])
+        ]
+        for node in nodes:
+            exact.add_node(node)
+            approximate.add_node(node)
+
+        expected = exact.find_similar_nodes("Quantum physics", limit=1)
+        results = approximate.find_similar_nodes("Quantum physics", limit=1)
+
+        assert results[0].nodes[0].id == expected[0].nodes[0].id
+        assert results[0].score == pytest.approx(expected[0].score, abs=1e-4)
+
+    def test_find_similar_nodes_on_gpu(self, monkeypatch):
+        """Test that GPU scoring ranks nodes like the CPU scan."""
+        torch = pytest.importorskip("torch")
+        if not torch.cuda.is_available():
+            pytest.skip("CUDA not available")
+        import knowledge_graph.engine as engine_module
+        monkeypatch.setattr(engine_module, "GPU_SIMILARITY_MIN_ROWS", 1)
+
+        cpu = InMemoryKnowledgeGraphEngine()
+        gpu = InMemoryKnowledgeGraphEngine(similarity_device="cuda")
+        for i, concept in enumerate(["Cats", "Dogs", "Quantum physics", "Jazz music"]):
+            node = ConceptNode(
+                id=f"node{i}", concept=concept, content=f"About {concept}",
+                metadata={}, created_at=datetime.now(), connections=[]
+            )
+            cpu.add_node(node)
+            gpu.add_node(node)
+
+        expected = cpu.find_similar_nodes("Jazz", limit=3)
+        results = gpu.find_similar_nodes("Jazz", limit=3)
+
+        assert [r.nodes[0].id for r in results] == [r.nodes[0].id for r in expected]
+
+    def test_fallback_embedding_character_frequencies(self):
+        """Test that the fallback embedding counts characters and text length."""
+        graph = InMemoryKnowledgeGraphEngine()
+
+        ascii_embedding = graph._generate_fallback_embedding("Baa c!")
+        unicode_embedding = graph._generate_fallback_embedding("ééa")
+
+        assert ascii_embedding[:4].tolist() == [1.0, 0.5, 0.5, 0.0]
+        assert ascii_embedding[96:106] == pytest.approx([0.006] * 10)
+        assert unicode_embedding[:2].tolist() == [0.5, 1.0]
+
     def test_search_nodes(self):
         """Test searching nodes by content."""
         graph = InMemoryKnowledgeGraphEngine()
@@ -413,6 +587,35 @@ class TestGraphQueries:
 
         assert len(results) == 0
 
+    def test_search_nodes_substring_and_phrase(self):
+        """Test that partial tokens and multi-word phrases both match."""
+        graph = InMemoryKnowledgeGraphEngine()
+
+        for node_id, content in [("node1", "Quantum entanglement"), ("node2", "Classical mechanics")]:
+            graph.add_node(ConceptNode(
+                id=node_id, concept="Physics", content=content,
+                metadata={}, created_at=datetime.now(), connections=[]
+            ))
+
+        assert [r.nodes[0].id for r in graph.search_nodes("TANGLE")] == ["node1"]
+        assert [r.nodes[0].id for r in graph.search_nodes("physics classical")] == []
+        assert [r.nodes[0].id for r in graph.search_nodes("classical mech")] == ["node2"]
+
+    def test_search_nodes_sees_updated_content(self):
+        """Test that edits to a node's content are picked up by search."""
+        graph = InMemoryKnowledgeGraphEngine()
+        node = ConceptNode(
+            id="node1", concept="Test", content="old text",
+            metadata={}, created_at=datetime.now(), connections=[]
+        )
+        graph.add_node(node)
+        graph.search_nodes("old")
+
+        node.content = "new text"
+
+        assert graph.search_nodes("old") == []
+        assert [r.nodes[0].id for r in graph.search_nodes("new")] == ["node1"]
+
 
 class TestSubgraphRetrieval:
     """Tests for subgraph retrieval."""
@@ -0,0 +1,286 @@
+"""
+Tests for the LLM service layer.
+
+This module tests:
+- Shared outbound HTTP connection pool
+- Connection list parsing
+- Fixed system prompts for the helpers
+- Caching of validation and connection results
+- Concurrent batched connection generation
+- Exact and semantic response caching
+- Service factory memoization
+"""
+
+import asyncio
+import pytest
+from cache.cache_manager import LocalMemoryCache, get_cache, set_cache
+from config.settings import settings
+from llm_service import anthropic_service, caching, factory
+from llm_service.base import LLMResponse, _CONNECTIONS_SYS, _VALIDATE_SYS
+from llm_service.caching import CachingLLMService
+from llm_service.openai_service import OpenAIService
+
+
+class CountingOpenAIService(OpenAIService):
+    """OpenAI service answering from a canned reply instead of the API."""
+
+    def __init__(self, reply=""):
+        self.model = "test-model"
+        self.reply = reply
+        self.prompts = []
+        self.system_prompts = []
+
+    async def generate_text(self, prompt, temperature=0.7, max_tokens=2000, system_prompt=None):
+        self.prompts.append(prompt)
+        self.system_prompts.append(system_prompt)
+        await asyncio.sleep(0)
+        return LLMResponse(self.reply, 1, self.model)
+
+
+class TemplateEmbeddings:
+    """Embeddings that see every prompt as the same, like a shared template."""
+
+    use_sentence_transformers = True
+
+    def encode(self, text):
+        return [1.0, 0.0]
+
+
+class WordEmbeddings:
+    """Bag-of-words embeddings standing in for a sentence model."""
+
+    use_sentence_transformers = True
+    vocabulary = ["what", "is", "gravity", "define", "photosynthesis", "explain", "entropy"]
+
+    def encode(self, text):
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(word)) for word in self.vocabulary]
+
+
+@pytest.fixture
+def local_cache():
+    """Install a fresh local cache for the duration of a test."""
+    original = get_cache()
+    set_cache(LocalMemoryCache())
+    yield
+    set_cache(original)
+
+
+class TestAnthropicHttpClient:
+    """Tests for the Anthropic HTTP client pool."""
+
+    def test_http_client_is_shared(self):
+        """Test that every service instance gets the same pooled client."""
+        client = anthropic_service._shared_http_client()
+
+        assert anthropic_service._shared_http_client() is client
+        pool = client._transport._pool
+        assert pool._max_connections == anthropic_service.MAX_CONNECTIONS
+        assert pool._max_keepalive_connections == anthropic_service.MAX_KEEPALIVE_CONNECTIONS
+
+
+class TestConnectionParsing:
+    """Tests for parsing connection replies."""
+
+    def test_parse_strips_blank_lines_and_limits(self):
+        """Test that replies are split per line, stripped and capped."""
+        content = "  Mass \r\n\n Orbit\n" + "\n".join(f"Extra{i}" for i in range(20))
+
+        connections = OpenAIService._parse_connections(content)
+
+        assert connections[:3] == ["Mass", "Orbit", "Extra0"]
+        assert len(connections) == 10
+
+
+class TestSystemPrompts:
+    """Tests for the helpers' system prompts."""
+
+    def test_helpers_send_fixed_system_prompts(self, local_cache):
+        """Test that helper calls share one system prompt string per helper."""
+        service = CountingOpenAIService("yes")
+
+        asyncio.run(service.generate_connections("Gravity", "physics"))
+        asyncio.run(service.generate_connections("Orbit", "astronomy"))
+        asyncio.run(service.validate_concept("Gravity"))
+
+        assert service.system_prompts == [_CONNECTIONS_SYS, _CONNECTIONS_SYS, _VALIDATE_SYS]
+        assert all(_VALIDATE_SYS not in prompt for prompt in service.prompts)
+
+
+class TestGeminiModelHandles:
+    """Tests for Gemini model handles per system instruction."""
+
+    def test_model_handle_carries_system_instruction(self, monkeypatch):
+        """Test that each system prompt gets one reusable model handle."""
+        pytest.importorskip("google.generativeai")
+        from llm_service.gemini_service import GeminiService
+
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+        service = GeminiService()
+
+        model = service._model_for(_VALIDATE_SYS)
+
+        assert service._model_for(_VALIDATE_SYS) is model
+        assert service._model_for(None) is not model
+        assert model._system_instruction.parts[0].text == _VALIDATE_SYS
+
+
+class TestResultCaching:
+    """Tests for cached LLM helper results."""
+
+    def test_validate_concept_cached(self, local_cache):
+        """Test that a repeated validation does not call the model again."""
+        service = CountingOpenAIService("no")
+
+        assert asyncio.run(service.validate_concept("Gravity")) is False
+        assert asyncio.run(service.validate_concept("Gravity")) is False
+        assert len(service.prompts) == 1
+
+    def test_generate_connections_cached_per_context(self, local_cache):
+        """Test that connections are cached per concept and context."""
+        service = CountingOpenAIService("Mass\nOrbit\n")
+
+        first = asyncio.run(service.generate_connections("Gravity", "physics"))
+        again = asyncio.run(service.generate_connections("Gravity", "physics"))
+        asyncio.run(service.generate_connections("Gravity", "history"))
+
+        assert first == again == ["Mass", "Orbit"]
+        assert len(service.prompts) == 2
+
+    def test_model_change_misses_cache(self, local_cache):
+        """Test that results cached for one model are not served for another."""
+        service = CountingOpenAIService("yes")
+        asyncio.run(service.validate_concept("Gravity"))
+
+        service.model = "other-model"
+        asyncio.run(service.validate_concept("Gravity"))
+
+        assert len(service.prompts) == 2
+
+
+class TestBatchedConnections:
+    """Tests for concurrent connection generation."""
+
+    def test_batch_respects_concurrency_and_order(self, local_cache):
+        """Test that batched calls run concurrently, bounded, in input order."""
+        service = CountingOpenAIService("Related")
+        in_flight = []
+        peak = []
+        generate = service.generate_connections
+
+        async def tracked(concept, context):
+            in_flight.append(concept)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(concept)
+            return [concept] + await generate(concept, context)
+
+        service.generate_connections = tracked
+        items = [(f"concept{i}", "ctx") for i in range(6)]
+
+        results = asyncio.run(service.generate_connections_batch(items, concurrency=3))
+
+        assert [r[0] for r in results] == [c for c, _ in items]
+        assert max(peak) == 3
+
+
+class TestResponseCache:
+    """Tests for the response caching wrapper."""
+
+    def test_exact_repeat_served_from_cache(self, local_cache):
+        """Test that an identical prompt is answered without a model call."""
+        inner = CountingOpenAIService("Answer")
+        service = CachingLLMService(inner, WordEmbeddings())
+
+        first = asyncio.run(service.generate_text("What is gravity?", temperature=0.2))
+        again = asyncio.run(service.generate_text("What is gravity?", temperature=0.2))
+
+        assert first.content == again.content == "Answer"
+        assert again.tokens_used == 0
+        assert len(inner.prompts) == 1
+
+    def test_sampled_generations_not_cached(self, local_cache):
+        """Test that calls at the default temperature always reach the model."""
+        inner = CountingOpenAIService("Answer")
+        service = CachingLLMService(inner, WordEmbeddings())
+
+        asyncio.run(service.generate_text("What is gravity?"))
+        asyncio.run(service.generate_text("What is gravity?"))
+        asyncio.run(service.generate_text("What is gravity?", temperature=0.9))
+
+        assert len(inner.prompts) == 3
+
+    def test_paraphrase_hits_only_at_low_temperature(self, local_cache):
+        """Test that similar prompts share a response only when near-deterministic."""
+        inner = CountingOpenAIService("Answer")
+        service = CachingLLMService(inner, WordEmbeddings(), similarity_threshold=0.9)
+
+        asyncio.run(service.generate_text("What is gravity?", temperature=0, semantic=True))
+        asyncio.run(service.generate_text("what is gravity", temperature=0, semantic=True))
+        assert len(inner.prompts) == 1
+
+        asyncio.run(service.generate_text("Define photosynthesis", temperature=0, semantic=True))
+        asyncio.run(service.generate_text("What is gravity?", temperature=0.5, semantic=True))
+        asyncio.run(service.generate_text("what is gravity", temperature=0.5, semantic=True))
+        assert len(inner.prompts) == 4
+
+    def test_templated_prompts_match_exactly_only(self, local_cache):
+        """Test that prompts differing only in the concept never share an answer."""
+        inner = CountingOpenAIService("yes")
+        service = CachingLLMService(inner, TemplateEmbeddings())
+
+        asyncio.run(service.validate_concept("Python"))
+        asyncio.run(service.validate_concept("Java"))
+        asyncio.run(service.generate_text('Is "Python" a valid concept?', temperature=0))
+        asyncio.run(service.generate_text('Is "Java" a valid concept?', temperature=0))
+
+        assert len(inner.prompts) == 4
+
+    def test_wrapped_helpers_use_cache(self, local_cache):
+        """Test that the wrapped service's own helpers go through the cache."""
+        inner = CountingOpenAIService("Mass\nOrbit")
+        service = CachingLLMService(inner, WordEmbeddings())
+
+        asyncio.run(service.validate_concept("Gravity"))
+        asyncio.run(inner.validate_concept("Gravity"))
+
+        assert len(inner.prompts) == 1
+
+    def test_semantic_cache_overwrites_oldest(self, local_cache, monkeypatch):
+        """Test that a full semantic cache forgets its oldest prompt first."""
+        monkeypatch.setattr(caching, "SEMANTIC_CACHE_SIZE", 2)
+        inner = CountingOpenAIService("Answer")
+        service = CachingLLMService(inner, WordEmbeddings(), similarity_threshold=0.9)
+
+        for prompt in ["What is gravity?", "Define photosynthesis", "Explain entropy"]:
+            asyncio.run(service.generate_text(prompt, temperature=0, semantic=True))
+        asyncio.run(service.generate_text("explain entropy", temperature=0, semantic=True))
+        asyncio.run(service.generate_text("what is gravity", temperature=0, semantic=True))
+
+        assert len(inner.prompts) == 4
+
+
+class TestServiceFactory:
+    """Tests for the LLM service factory."""
+
+    def test_service_created_once_per_provider(self, monkeypatch):
+        """Test that repeat lookups reuse the provider's service."""
+        monkeypatch.setitem(
+            factory._PROVIDERS, "counting", (__name__, "CountingOpenAIService", "Counting")
+        )
+        monkeypatch.setattr(settings, "LLM_PROVIDER", "Counting")
+        factory._create_llm_service.cache_clear()
+        try:
+            service = factory.get_llm_service()
+
+            assert isinstance(service, CountingOpenAIService)
+            assert factory.get_llm_service() is service
+        finally:
+            factory._create_llm_service.cache_clear()
+
+    def test_unknown_provider_rejected(self, monkeypatch):
+        """Test that an unsupported provider raises ValueError."""
+        monkeypatch.setattr(settings, "LLM_PROVIDER", "nonexistent")
+
+        with pytest.raises(ValueError, match="Unsupported LLM provider"):
+            factory.get_llm_service()
@@ -0,0 +1,365 @@
+"""
+Tests for the database-backed knowledge graph engine.
+
+This module tests:
+- Node and edge persistence through the repositories
+- Text search fallback when vector search is unavailable
+- PostgreSQL-only search columns and indexes
+"""
+
+import numpy as np
+import pytest
+from datetime import datetime
+from sqlalchemy import create_mock_engine, event, text
+from core.concept_orchestrator import ConceptNode
+from database.database import DatabaseManager
+from config.settings import settings
+from database.models import Base, _embedding_index_ddl
+from database.repositories import _vector_literal
+from embeddings.service import EmbeddingService
+from knowledge_graph.engine import GraphEdge
+from knowledge_graph import persistent_engine
+from knowledge_graph.persistent_engine import PersistentKnowledgeGraphEngine
+from knowledge_graph.postgres_engine import PostgreSQLKnowledgeGraphEngine
+
+
+def _node(node_id, concept, content=""):
+    """Build a concept node for tests."""
+    return ConceptNode(
+        id=node_id,
+        concept=concept,
+        content=content,
+        metadata={},
+        created_at=datetime.now(),
+        connections=[]
+    )
+
+
+def _edge(source_id, target_id, relationship_type="related"):
+    """Build an edge for tests."""
+    return GraphEdge(
+        id=f"{source_id}-{target_id}",
+        source_node_id=source_id,
+        target_node_id=target_id,
+        relationship_type=relationship_type,
+        weight=1.0,
+        metadata={},
+        created_at=datetime.now()
+    )
+
+
+@pytest.fixture
+def session():
+    """Session on a fresh in-memory SQLite database."""
+    manager = DatabaseManager("sqlite:///:memory:")
+    manager.create_all()
+    db = manager.get_session()
+    yield db
+    db.close()
+
+
+class TestPersistentGraph:
+    """Tests for the persistent graph engine."""
+
+    def test_add_and_get_node(self, session):
+        """Test that a stored node is read back."""
+        graph = PersistentKnowledgeGraphEngine(session)
+
+        assert graph.add_node(_node("n1", "Photosynthesis", "Plants convert light"))
+        assert not graph.add_node(_node("n1", "Photosynthesis"))
+
+        node = graph.get_node("n1")
+        assert node.concept == "Photosynthesis"
+        assert node.content == "Plants convert light"
+
+    def test_bulk_add_skips_existing_ids(self, session):
+        """Test that bulk inserts report which nodes and edges were new."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        graph.add_node(_node("a", "A"))
+        nodes = [_node("a", "A"), _node("b", "B"), _node("c", "C"), _node("b", "B")]
+
+        assert graph.add_nodes(nodes) == [False, True, True, False]
+        assert graph.add_edges([_edge("a", "b"), _edge("b", "c"), _edge("a", "b")]) == [True, True, False]
+        assert graph.add_edges([_edge("a", "b")]) == [False]
+        assert graph.node_repo.count() == 3
+        assert sorted(n.id for n in graph.get_neighbors("b")) == ["a", "c"]
+
+    def test_metadata_round_trips_as_json(self, session):
+        """Test that node metadata is stored and read back as a dict."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        node = _node("n1", "Photosynthesis")
+        node.metadata = {"source": "wikipedia", "tags": ["biology"]}
+        graph.add_node(node)
+        session.expunge_all()
+
+        assert graph.get_node("n1").metadata == {"source": "wikipedia", "tags": ["biology"]}
+
+    def test_repeat_get_node_served_from_cache(self, session):
+        """Test that a node fetched once is not queried again."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        graph.add_node(_node("n1", "Photosynthesis"))
+        first = graph.get_node("n1")
+
+        statements = []
+        event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        assert graph.get_node("n1") == first
+        assert statements == []
+
+    def test_cached_node_not_shared_with_callers(self, session):
+        """Test that editing a returned node does not change later results."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        graph.add_node(_node("n1", "Photosynthesis"))
+
+        graph.get_node("n1").metadata["edited"] = True
+
+        assert graph.get_node("n1").metadata == {}
+
+    def test_node_cache_expires_and_follows_writes(self, session, monkeypatch):
+        """Test that cached nodes expire and engine writes invalidate them."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        graph.add_node(_node("n1", "Photosynthesis"))
+        graph.get_node("n1")
+
+        assert graph.delete_node("n1")
+        assert graph.get_node("n1") is None
+
+        graph.add_node(_node("n2", "Gravity"))
+        graph.get_node("n2")
+        graph.node_repo.delete("n2")
+        assert graph.get_node("n2") is not None
+
+        monkeypatch.setattr(persistent_engine, "NODE_CACHE_TTL_SECONDS", -1)
+        graph.add_node(_node("n3", "Orbit"))
+        graph.get_node("n3")
+        graph.node_repo.delete("n3")
+        assert graph.get_node("n3") is None
+
+    def test_similarity_without_pgvector_uses_text_search(self, session):
+        """Test that similarity search falls back to text search off PostgreSQL."""
+        graph = PersistentKnowledgeGraphEngine(session, EmbeddingService())
+        graph.add_node(_node("n1", "Photosynthesis", "Plants convert light"))
+        graph.add_node(_node("n2", "Gravity", "Mass attracts mass"))
+
+        results = graph.find_similar_nodes("photosynthesis")
+
+        assert not graph.use_vector_search
+        assert [r.nodes[0].id for r in results] == ["n1"]
+        assert results[0].score == 1.0
+
+    def test_full_text_search_needs_search_column(self, session):
+        """Test that the search column is detected from the table itself."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        assert not graph.use_full_text_search
+        assert not graph.node_repo.has_search_column()
+
+        session.execute(text("ALTER TABLE concept_nodes ADD COLUMN search_tsv TEXT"))
+        assert graph.node_repo.has_search_column()
+
+    def test_neighbors_joined_in_one_query(self, session):
+        """Test that neighbors in both directions come from a single query."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        for node_id in ("a", "b", "c", "d"):
+            graph.add_node(_node(node_id, node_id.upper()))
+        graph.add_edge(_edge("a", "b"))
+        graph.add_edge(_edge("c", "a", "part_of"))
+        graph.add_edge(_edge("b", "a"))
+        graph.add_edge(_edge("b", "d"))
+
+        statements = []
+        event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        neighbors = graph.get_neighbors("a")
+
+        assert len(statements) == 1
+        assert sorted(n.id for n in neighbors) == ["b", "c"]
+        assert [n.id for n in graph.get_neighbors("a", "part_of")] == ["c"]
+
+    def test_subgraph_traversed_in_one_query(self, session):
+        """Test that the traversal is one recursive query plus one node fetch."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        for node_id in ("a", "b", "c", "d", "e"):
+            graph.add_node(_node(node_id, node_id.upper()))
+        graph.add_edge(_edge("a", "b"))
+        graph.add_edge(_edge("c", "a"))
+        graph.add_edge(_edge("b", "d"))
+        graph.add_edge(_edge("c", "e"))
+
+        statements = []
+        event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        nodes, edges = graph.get_subgraph("a", depth=2)
+
+        # Center node, traversal, then the other nodes
+        assert len(statements) == 3
+        assert sorted(n.id for n in nodes) == ["a", "b", "c", "d", "e"]
+        assert sorted(e.id for e in edges) == ["a-b", "b-d", "c-a", "c-e"]
+
+        statements.clear()
+        nodes, edges = graph.get_subgraph("a", depth=1)
+
+        # Every node is cached now, so only the traversal query remains
+        assert len(statements) == 1
+        assert nodes[0].id == "a"
+        assert sorted(n.id for n in nodes) == ["a", "b", "c"]
+        assert sorted(e.id for e in edges) == ["a-b", "c-a"]
+
+
+class TestConceptNodeRepository:
+    """Tests for concept node queries."""
+
+    def test_get_by_concept_limits_in_sql(self, session):
+        """Test that the concept lookup applies its limit in the query."""
+        graph = PersistentKnowledgeGraphEngine(session)
+        for i in range(5):
+            graph.add_node(_node(f"n{i}", "Gravity"))
+
+        statements = []
+        event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        nodes = graph.node_repo.get_by_concept("Gravity", limit=2)
+
+        assert len(nodes) == 2
+        assert "LIMIT" in statements[0]
+        assert len(graph.node_repo.get_by_concept("Gravity")) == 5
+
+    def test_vector_literal_round_trips_float16(self):
+        """Test that embedding literals carry exactly the float16 values stored."""
+        embedding = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+
+        literal = _vector_literal(embedding)
+        parsed = np.array([float(v) for v in literal[1:-1].split(",")], dtype=np.float16)
+
+        assert np.array_equal(parsed, embedding.astype(np.float16))
+        assert len(literal) < len(",".join(str(float(v)) for v in embedding)) / 2
+
+
+class TestPostgreSQLEngineEdges:
+    """Tests for edge insertion in the PostgreSQL engine."""
+
+    def test_add_edge_is_one_insert(self, session):
+        """Test that adding an edge is a single statement that rejects duplicates."""
+        graph = PostgreSQLKnowledgeGraphEngine(session)
+        graph.add_node(_node("a", "A"))
+        graph.add_node(_node("b", "B"))
+
+        statements = []
+        event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        assert graph.add_edge(_edge("a", "b"))
+        assert len(statements) == 1
+        assert not graph.add_edge(_edge("a", "b"))
+        assert graph.get_edge_count() == 1
+
+    def test_add_edge_to_missing_node_rejected(self, session):
+        """Test that the foreign keys reject an edge to a missing node."""
+        session.execute(text("PRAGMA foreign_keys = ON"))
+        graph = PostgreSQLKnowledgeGraphEngine(session)
+        graph.add_node(_node("a", "A"))
+
+        assert not graph.add_edge(_edge("a", "missing"))
+        assert graph.get_edge_count() == 0
+
+
+class TestPostgreSQLEngineReads:
+    """Tests for reading nodes back through the PostgreSQL engine."""
+
+    def test_get_node(self, session):
+        """Test that a stored node is read back."""
+        graph = PostgreSQLKnowledgeGraphEngine(session)
+        graph.add_node(_node("n1", "Photosynthesis", "Plants convert light"))
+
+        node = graph.get_node("n1")
+        assert node.concept == "Photosynthesis"
+        assert node.content == "Plants convert light"
+        assert graph.get_node("missing") is None
+
+    def test_get_neighbors_listed_once(self, session):
+        """Test that a node connected by several edges is listed once."""
+        graph = PostgreSQLKnowledgeGraphEngine(session)
+        for node_id in ("a", "b", "c"):
+            graph.add_node(_node(node_id, node_id.upper()))
+        graph.add_edge(_edge("a", "b"))
+        graph.add_edge(_edge("b", "a"))
+        graph.add_edge(_edge("c", "a", "part_of"))
+
+        assert sorted(n.id for n in graph.get_neighbors("a")) == ["b", "c"]
+        assert [n.id for n in graph.get_neighbors("a", "part_of")] == ["c"]
+
+    def test_get_subgraph(self, session):
+        """Test that the subgraph covers nodes within depth hops."""
+        graph = PostgreSQLKnowledgeGraphEngine(session)
+        for node_id in ("a", "b", "c", "d"):
+            graph.add_node(_node(node_id, node_id.upper()))
+        graph.add_edge(_edge("a", "b"))
+        graph.add_edge(_edge("c", "a"))
+        graph.add_edge(_edge("b", "d"))
+
+        nodes, edges = graph.get_subgraph("a", depth=1)
+        assert nodes[0].id == "a"
+        assert sorted(n.id for n in nodes) == ["a", "b", "c"]
+
+        nodes, edges = graph.get_subgraph("a", depth=2)
+        assert sorted(n.id for n in nodes) == ["a", "b", "c", "d"]
+        assert sorted(e.id for e in edges) == ["a-b", "b-d", "c-a"]
+
+    def test_search_nodes_falls_back_to_substring_match(self, session):
+        """Test that nodes are found by substring without the search column."""
+        graph = PostgreSQLKnowledgeGraphEngine(session)
+        graph.add_node(_node("n1", "Photosynthesis", "Plants convert light"))
+        graph.add_node(_node("n2", "Gravity", "Mass attracts mass"))
+
+        results = graph.search_nodes("convert")
+
+        assert not graph.use_full_text_search
+        assert [r.nodes[0].id for r in results] == ["n1"]
+
+    def test_find_similar_nodes_limited(self, session):
+        """Test that concept matches are returned up to the limit without pgvector."""
+        graph = PostgreSQLKnowledgeGraphEngine(session, EmbeddingService())
+        assert not graph.use_vector_search
+        for i in range(3):
+            graph.add_node(_node(f"n{i}", "Gravity"))
+        graph.add_node(_node("other", "Orbit"))
+
+        results = graph.find_similar_nodes("Gravity", limit=2)
+
+        assert len(results) == 2
+        assert all(r.nodes[0].concept == "Gravity" for r in results)
+
+
+def _postgres_ddl():
+    """Collect the DDL emitted when creating all tables on PostgreSQL."""
+    statements = []
+    engine = create_mock_engine(
+        "postgresql://",
+        lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect))),
+    )
+    Base.metadata.create_all(engine, checkfirst=False)
+    return statements
+
+
+class TestPostgresSchema:
+    """Tests for PostgreSQL-specific schema additions."""
+
+    def test_full_text_column_and_gin_index(self):
+        """Test that nodes get a generated tsvector column with a GIN index."""
+        ddl = _postgres_ddl()
+
+        assert any("search_tsv tsvector GENERATED ALWAYS" in sql for sql in ddl)
+        assert any("USING GIN (search_tsv)" in sql for sql in ddl)
+
+    def test_edge_indexes_cover_relationship_type(self):
+        """Test that edge endpoints are indexed together with the relationship type."""
+        ddl = " ".join(_postgres_ddl())
+
+        assert "ix_graph_edges_source_rel ON graph_edges (source_id, relationship_type)" in ddl
+        assert "ix_graph_edges_target_rel ON graph_edges (target_id, relationship_type)" in ddl
+
+    def test_embedding_index_type_follows_settings(self, monkeypatch):
+        """Test that the pgvector index can be HNSW or IVFFlat."""
+        assert "USING hnsw (embedding_vector halfvec_cosine_ops)" in _embedding_index_ddl()
+
+        monkeypatch.setattr(settings, "PGVECTOR_INDEX", "ivfflat")
+        monkeypatch.setattr(settings, "PGVECTOR_IVFFLAT_LISTS", 250)
+
+        ddl = _embedding_index_ddl()
+        assert "USING ivfflat (embedding_vector halfvec_cosine_ops)" in ddl
+        assert "WITH (lists = 250)" in ddl